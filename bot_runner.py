@@ -10,7 +10,7 @@ import threading
 import signal
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import uvicorn
 
 # Add the project root directory to the Python path
@@ -68,6 +68,24 @@ async def health_check():
             status_code=503
         )
 
+# The health server runs on its own thread and event loop, so it leaves the cache
+# manager (bound to the bot's loop) alone; queue stats are fetched on the bot's loop
+metrics_exporter = None
+
+@health_app.get('/metrics')
+async def metrics():
+    """Prometheus scrape endpoint"""
+    global metrics_exporter
+    try:
+        from monitoring.prometheus_exporter import CONTENT_TYPE, PrometheusExporter
+        if metrics_exporter is None:
+            from database.connection import db_manager
+            metrics_exporter = PrometheusExporter(db_manager=db_manager, resolve_cache_manager=False)
+        return Response(content=await metrics_exporter.render(), media_type=CONTENT_TYPE)
+    except Exception as e:
+        logger.error(f"Metrics error: {e}")
+        return JSONResponse(content={'error': str(e)}, status_code=500)
+
 @health_app.get('/')
 async def home():
     """Root endpoint with bot information"""
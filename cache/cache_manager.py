@@ -4,6 +4,7 @@ import asyncio
 import json
 import pickle
 import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Union, Callable, TypeVar, Generic
 from dataclasses import dataclass, field
@@ -11,6 +12,8 @@ from enum import Enum
 from collections import OrderedDict
 import hashlib
 import logging
+import math
+import zlib
 from functools import wraps
 
 try:
@@ -20,6 +23,41 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+    lz4_frame = None
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+    xxhash = None
+
 from config import BotConfig
 
 logger = logging.getLogger(__name__)
@@ -39,6 +77,16 @@ class SerializationMethod(Enum):
     JSON = "json"
     PICKLE = "pickle"
     STRING = "string"
+    ORJSON = "orjson"
+    MSGPACK = "msgpack"
+
+
+class CompressionMethod(Enum):
+    """Compression methods for serialized cache values"""
+    NONE = "none"
+    ZLIB = "zlib"
+    ZSTD = "zstd"
+    LZ4 = "lz4"
 
 
 @dataclass
@@ -73,6 +121,200 @@ class CacheStats:
         return (self.hits / total * 100) if total > 0 else 0.0
 
 
+class _NegativeCacheEntry:
+    """Marker cached in place of a value that is known not to exist"""
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+    
+    def __reduce__(self):
+        # Pickle by reference so the singleton survives a Redis round trip
+        return 'NEGATIVE_CACHE_ENTRY'
+    
+    def __bool__(self) -> bool:
+        return False
+    
+    def __repr__(self) -> str:
+        return 'NEGATIVE_CACHE_ENTRY'
+
+
+NEGATIVE_CACHE_ENTRY = _NegativeCacheEntry()
+
+
+# Header byte layout: low nibble is the codec, high nibble the compression
+_CODEC_IDS = {
+    SerializationMethod.JSON: 1,
+    SerializationMethod.PICKLE: 2,
+    SerializationMethod.STRING: 3,
+    SerializationMethod.ORJSON: 4,
+    SerializationMethod.MSGPACK: 5,
+}
+_CODECS_BY_ID = {codec_id: method for method, codec_id in _CODEC_IDS.items()}
+
+_COMPRESSION_IDS = {
+    CompressionMethod.NONE: 0,
+    CompressionMethod.ZLIB: 1,
+    CompressionMethod.ZSTD: 2,
+    CompressionMethod.LZ4: 3,
+}
+_COMPRESSIONS_BY_ID = {compression_id: method for method, compression_id in _COMPRESSION_IDS.items()}
+
+_PLAIN_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_plain_data(value: Any, depth: int = 0) -> bool:
+    """Check that a value round-trips losslessly through JSON-like codecs"""
+    if depth > 32:
+        return False
+    
+    value_type = type(value)
+    if value_type is float:
+        return math.isfinite(value)
+    if value_type in _PLAIN_SCALARS:
+        return True
+    if value_type is list:
+        return all(_is_plain_data(item, depth + 1) for item in value)
+    if value_type is dict:
+        return all(
+            type(k) is str and _is_plain_data(v, depth + 1)
+            for k, v in value.items()
+        )
+    return False
+
+
+def _default_compression() -> CompressionMethod:
+    """Pick the fastest compression library that is installed"""
+    if LZ4_AVAILABLE:
+        return CompressionMethod.LZ4
+    if ZSTD_AVAILABLE:
+        return CompressionMethod.ZSTD
+    return CompressionMethod.ZLIB
+
+
+class CacheSerializer:
+    """Encode cache values with a tagged codec and optional compression
+    
+    With ``method=None`` the codec is chosen per value: plain dict/list data
+    uses orjson or msgpack (falling back to json), everything else is pickled.
+    Payloads larger than ``compression_threshold`` bytes are compressed when
+    that makes them smaller. The first byte of every payload records the codec
+    and compression so reads never have to guess.
+    """
+    
+    def __init__(self, method: Optional[SerializationMethod] = None,
+                 compression: Optional[CompressionMethod] = None,
+                 compression_threshold: Optional[int] = 1024):
+        self.method = method
+        self.compression = compression or _default_compression()
+        self.compression_threshold = compression_threshold
+        self._zstd_compressor = zstandard.ZstdCompressor() if ZSTD_AVAILABLE else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+    
+    def _choose_method(self, value: Any) -> SerializationMethod:
+        """Choose the codec for a value"""
+        if self.method is not None:
+            return self.method
+        if type(value) is str:
+            return SerializationMethod.STRING
+        if _is_plain_data(value):
+            if ORJSON_AVAILABLE:
+                return SerializationMethod.ORJSON
+            if MSGPACK_AVAILABLE:
+                return SerializationMethod.MSGPACK
+            return SerializationMethod.JSON
+        return SerializationMethod.PICKLE
+    
+    def _encode(self, value: Any, method: SerializationMethod) -> bytes:
+        """Encode value with a specific codec"""
+        if method == SerializationMethod.ORJSON:
+            return orjson.dumps(value)
+        if method == SerializationMethod.MSGPACK:
+            return msgpack.packb(value, use_bin_type=True)
+        if method == SerializationMethod.JSON:
+            return json.dumps(value, separators=(',', ':')).encode('utf-8')
+        if method == SerializationMethod.STRING:
+            return str(value).encode('utf-8')
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def _decode(self, data: bytes, method: SerializationMethod) -> Any:
+        """Decode data with a specific codec"""
+        if method == SerializationMethod.ORJSON:
+            return orjson.loads(data)
+        if method == SerializationMethod.MSGPACK:
+            return msgpack.unpackb(data, raw=False)
+        if method == SerializationMethod.JSON:
+            return json.loads(data)
+        if method == SerializationMethod.STRING:
+            return data.decode('utf-8')
+        return pickle.loads(data)
+    
+    def _compress(self, data: bytes, compression: CompressionMethod) -> bytes:
+        """Compress data"""
+        if compression == CompressionMethod.LZ4:
+            return lz4_frame.compress(data)
+        if compression == CompressionMethod.ZSTD:
+            return self._zstd_compressor.compress(data)
+        return zlib.compress(data, 6)
+    
+    def _decompress(self, data: bytes, compression: CompressionMethod) -> bytes:
+        """Decompress data"""
+        if compression == CompressionMethod.LZ4:
+            return lz4_frame.decompress(data)
+        if compression == CompressionMethod.ZSTD:
+            return self._zstd_decompressor.decompress(data)
+        return zlib.decompress(data)
+    
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value into a tagged payload"""
+        method = self._choose_method(value)
+        try:
+            data = self._encode(value, method)
+        except (TypeError, ValueError, OverflowError):
+            # e.g. integers beyond 64 bits for orjson/msgpack
+            method = SerializationMethod.PICKLE
+            data = self._encode(value, method)
+        
+        compression = CompressionMethod.NONE
+        if (self.compression_threshold is not None
+                and self.compression != CompressionMethod.NONE
+                and len(data) > self.compression_threshold):
+            compressed = self._compress(data, self.compression)
+            if len(compressed) < len(data):
+                data = compressed
+                compression = self.compression
+        
+        header = _CODEC_IDS[method] | (_COMPRESSION_IDS[compression] << 4)
+        return bytes((header,)) + data
+    
+    def loads(self, data: bytes) -> Any:
+        """Deserialize a tagged payload, accepting untagged legacy values"""
+        if data:
+            method = _CODECS_BY_ID.get(data[0] & 0x0F)
+            compression = _COMPRESSIONS_BY_ID.get(data[0] >> 4)
+            if method is not None and compression is not None:
+                body = data[1:]
+                if compression != CompressionMethod.NONE:
+                    body = self._decompress(body, compression)
+                return self._decode(body, method)
+        
+        return self._loads_legacy(data)
+    
+    @staticmethod
+    def _loads_legacy(data: bytes) -> Any:
+        """Decode values written before payloads were tagged"""
+        try:
+            return pickle.loads(data)
+        except Exception:
+            try:
+                return json.loads(data.decode('utf-8'))
+            except Exception:
+                return data.decode('utf-8')
+
+
 class LRUCache(Generic[T]):
     """Thread-safe LRU cache implementation"""
     
@@ -156,6 +398,23 @@ class LRUCache(Generic[T]):
                 return True
             return False
     
+    async def delete_many(self, keys: List[str]) -> int:
+        """Delete multiple values from cache"""
+        async with self._lock:
+            count = 0
+            for key in keys:
+                entry = self.cache.pop(key, None)
+                if entry is not None:
+                    self.stats.deletes += 1
+                    self.stats.entry_count -= 1
+                    self.stats.total_size_bytes -= entry.size_bytes
+                    count += 1
+            return count
+    
+    async def delete_by_pattern(self, pattern: str) -> int:
+        """Delete all keys matching pattern"""
+        return await self.delete_many(await self.get_keys_by_pattern(pattern))
+    
     async def clear(self) -> None:
         """Clear all cache entries"""
         async with self._lock:
@@ -210,13 +469,21 @@ class RedisCache:
     """Redis-based cache implementation"""
     
     def __init__(self, redis_url: str = "redis://localhost:6379", 
-                 key_prefix: str = "optrixtrades:", max_connections: int = 10):
+                 key_prefix: str = "optrixtrades:", max_connections: int = 10,
+                 scan_batch_size: int = 500, stats_refresh_seconds: int = 60,
+                 serializer: Optional[CacheSerializer] = None,
+                 namespace_serializers: Optional[Dict[str, CacheSerializer]] = None):
         self.redis_url = redis_url
         self.key_prefix = key_prefix
         self.max_connections = max_connections
+        self.serializer = serializer or CacheSerializer()
+        self.namespace_serializers: Dict[str, CacheSerializer] = dict(namespace_serializers or {})
+        self.scan_batch_size = scan_batch_size
+        self.stats_refresh_seconds = stats_refresh_seconds
         self.redis_client: Optional[redis.Redis] = None
         self.stats = CacheStats()
         self.connected = False
+        self._entry_count_refreshed_at = 0.0
     
     async def connect(self) -> bool:
         """Connect to Redis"""
@@ -255,6 +522,47 @@ class RedisCache:
         """Create prefixed key"""
         return f"{self.key_prefix}{key}"
     
+    def set_namespace_serializer(self, namespace: str, serializer: CacheSerializer) -> None:
+        """Use a specific serializer for keys starting with namespace"""
+        self.namespace_serializers[namespace] = serializer
+    
+    def _get_serializer(self, key: str) -> CacheSerializer:
+        """Get the serializer for a key based on its namespace"""
+        for namespace, serializer in self.namespace_serializers.items():
+            if key.startswith(namespace):
+                return serializer
+        return self.serializer
+    
+    def _strip_key(self, redis_key: Union[str, bytes]) -> str:
+        """Remove prefix from a raw Redis key"""
+        if isinstance(redis_key, bytes):
+            redis_key = redis_key.decode('utf-8')
+        return redis_key.replace(self.key_prefix, '', 1)
+    
+    async def _scan_batches(self, pattern: str):
+        """Yield batches of raw keys matching pattern using cursor-based SCAN"""
+        cursor = 0
+        while True:
+            cursor, keys = await self.redis_client.scan(
+                cursor=cursor, match=pattern, count=self.scan_batch_size
+            )
+            if keys:
+                yield keys
+            if cursor == 0:
+                break
+    
+    async def _unlink_keys(self, redis_keys: List[Union[str, bytes]]) -> int:
+        """Unlink raw keys in pipelined chunks, returning the number removed"""
+        if not redis_keys:
+            return 0
+        
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for i in range(0, len(redis_keys), self.scan_batch_size):
+                pipe.unlink(*redis_keys[i:i + self.scan_batch_size])
+            results = await pipe.execute()
+        
+        return sum(results)
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get value from Redis cache"""
         if not self.connected or not self.redis_client:
@@ -269,21 +577,9 @@ class RedisCache:
                 self.stats.misses += 1
                 return None
             
-            # Deserialize
-            try:
-                value = pickle.loads(data)
-                self.stats.hits += 1
-                return value
-            except Exception:
-                # Fallback to JSON
-                try:
-                    value = json.loads(data.decode('utf-8'))
-                    self.stats.hits += 1
-                    return value
-                except Exception:
-                    # Fallback to string
-                    self.stats.hits += 1
-                    return data.decode('utf-8')
+            value = self._get_serializer(key).loads(data)
+            self.stats.hits += 1
+            return value
                     
         except Exception as e:
             logger.error(f"Redis get error for key {key}: {e}")
@@ -299,28 +595,22 @@ class RedisCache:
         try:
             redis_key = self._make_key(key)
             
-            # Serialize value
-            try:
-                data = pickle.dumps(value)
-            except Exception:
-                try:
-                    data = json.dumps(value).encode('utf-8')
-                except Exception:
-                    data = str(value).encode('utf-8')
+            data = self._get_serializer(key).dumps(value)
             
-            # Set in Redis
-            if ttl_seconds:
-                await self.redis_client.setex(redis_key, ttl_seconds, data)
-            else:
-                await self.redis_client.set(redis_key, data)
-            
-            # Store tags if provided
-            if tags:
-                for tag in tags:
+            # Set value and tag memberships in a single round-trip
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                if ttl_seconds:
+                    pipe.setex(redis_key, ttl_seconds, data)
+                else:
+                    pipe.set(redis_key, data)
+                
+                for tag in tags or []:
                     tag_key = self._make_key(f"tag:{tag}")
-                    await self.redis_client.sadd(tag_key, redis_key)
+                    pipe.sadd(tag_key, redis_key)
                     if ttl_seconds:
-                        await self.redis_client.expire(tag_key, ttl_seconds)
+                        pipe.expire(tag_key, ttl_seconds)
+                
+                await pipe.execute()
             
             self.stats.sets += 1
             return True
@@ -347,49 +637,74 @@ class RedisCache:
             logger.error(f"Redis delete error for key {key}: {e}")
             return False
     
-    async def clear(self) -> None:
-        """Clear all cache entries with prefix"""
-        if not self.connected or not self.redis_client:
-            return
+    async def delete_many(self, keys: List[str]) -> int:
+        """Delete multiple values from Redis cache in batched round-trips"""
+        if not self.connected or not self.redis_client or not keys:
+            return 0
         
         try:
-            pattern = f"{self.key_prefix}*"
-            keys = await self.redis_client.keys(pattern)
+            count = await self._unlink_keys([self._make_key(key) for key in keys])
+            self.stats.deletes += count
+            return count
             
-            if keys:
-                await self.redis_client.delete(*keys)
-                self.stats.deletes += len(keys)
-                
         except Exception as e:
-            logger.error(f"Redis clear error: {e}")
+            logger.error(f"Redis delete many error: {e}")
+            return 0
     
-    async def clear_by_tags(self, tags: List[str]) -> int:
-        """Clear cache entries by tags"""
+    async def delete_by_pattern(self, pattern: str) -> int:
+        """Delete all keys matching pattern, one SCAN batch at a time"""
         if not self.connected or not self.redis_client:
             return 0
         
         try:
-            keys_to_delete = set()
+            count = 0
+            async for keys in self._scan_batches(self._make_key(pattern)):
+                count += await self._unlink_keys(keys)
+            
+            self.stats.deletes += count
+            return count
             
-            for tag in tags:
-                tag_key = self._make_key(f"tag:{tag}")
-                tagged_keys = await self.redis_client.smembers(tag_key)
+        except Exception as e:
+            logger.error(f"Redis delete by pattern error: {e}")
+            return 0
+    
+    async def clear(self) -> None:
+        """Clear all cache entries with prefix"""
+        await self.delete_by_pattern("*")
+        self.stats.entry_count = 0
+    
+    async def pop_tagged_keys(self, tags: List[str]) -> List[str]:
+        """Delete entries carrying any of the tags and return their keys"""
+        if not self.connected or not self.redis_client or not tags:
+            return []
+        
+        try:
+            tag_keys = [self._make_key(f"tag:{tag}") for tag in tags]
+            
+            # Fetch all tag sets in one round-trip
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+            
+            keys_to_delete = set()
+            for tagged_keys in members:
                 keys_to_delete.update(tagged_keys)
-                # Delete tag set
-                await self.redis_client.delete(tag_key)
             
+            # Drop the tagged entries and the tag sets themselves
             if keys_to_delete:
-                # Convert bytes to strings if needed
-                keys_list = [key.decode('utf-8') if isinstance(key, bytes) else key for key in keys_to_delete]
-                await self.redis_client.delete(*keys_list)
-                self.stats.deletes += len(keys_list)
-                return len(keys_list)
+                self.stats.deletes += await self._unlink_keys(list(keys_to_delete))
+            await self._unlink_keys(tag_keys)
             
-            return 0
+            return [self._strip_key(key) for key in keys_to_delete]
             
         except Exception as e:
             logger.error(f"Redis clear by tags error: {e}")
-            return 0
+            return []
+    
+    async def clear_by_tags(self, tags: List[str]) -> int:
+        """Clear cache entries by tags"""
+        return len(await self.pop_tagged_keys(tags))
     
     async def get_keys_by_pattern(self, pattern: str) -> List[str]:
         """Get keys matching pattern"""
@@ -397,10 +712,10 @@ class RedisCache:
             return []
         
         try:
-            redis_pattern = self._make_key(pattern)
-            keys = await self.redis_client.keys(redis_pattern)
-            # Remove prefix and convert bytes to strings
-            return [key.decode('utf-8').replace(self.key_prefix, '', 1) if isinstance(key, bytes) else key.replace(self.key_prefix, '', 1) for key in keys]
+            keys = []
+            async for batch in self._scan_batches(self._make_key(pattern)):
+                keys.extend(self._strip_key(key) for key in batch)
+            return keys
             
         except Exception as e:
             logger.error(f"Redis keys pattern error: {e}")
@@ -413,10 +728,14 @@ class RedisCache:
                 info = await self.redis_client.info('memory')
                 self.stats.total_size_bytes = info.get('used_memory', 0)
                 
-                # Count keys with our prefix
-                pattern = f"{self.key_prefix}*"
-                keys = await self.redis_client.keys(pattern)
-                self.stats.entry_count = len(keys)
+                # Counting prefixed keys walks the keyspace, so only refresh it periodically
+                now = time.monotonic()
+                if now - self._entry_count_refreshed_at >= self.stats_refresh_seconds:
+                    entry_count = 0
+                    async for keys in self._scan_batches(f"{self.key_prefix}*"):
+                        entry_count += len(keys)
+                    self.stats.entry_count = entry_count
+                    self._entry_count_refreshed_at = now
                 
             except Exception as e:
                 logger.error(f"Redis stats error: {e}")
@@ -425,24 +744,106 @@ class RedisCache:
 
 
 class HybridCache:
-    """Hybrid cache using both Redis and in-memory cache"""
+    """Hybrid cache using both Redis and in-memory cache
+    
+    Writes, deletes and tag clears are broadcast on a Redis pub/sub channel so
+    every replica evicts its in-memory copy of the affected keys.
+    """
     
     def __init__(self, redis_url: str = "redis://localhost:6379", 
-                 memory_max_size: int = 1000, memory_max_size_bytes: int = 50 * 1024 * 1024):
+                 memory_max_size: int = 1000, memory_max_size_bytes: int = 50 * 1024 * 1024,
+                 near_cache_ttl_seconds: int = 60,
+                 invalidation_channel: str = "optrixtrades:cache:invalidate"):
         self.redis_cache = RedisCache(redis_url)
         self.memory_cache = LRUCache(memory_max_size, memory_max_size_bytes)
         self.use_redis = False
+        self.near_cache_ttl_seconds = near_cache_ttl_seconds
+        self.invalidation_channel = invalidation_channel
+        self.instance_id = uuid.uuid4().hex
+        self._pubsub = None
+        self._invalidation_task: Optional[asyncio.Task] = None
     
     async def connect(self) -> None:
         """Connect to Redis (fallback to memory if fails)"""
         self.use_redis = await self.redis_cache.connect()
         if not self.use_redis:
             logger.info("Using memory cache only")
+            return
+        
+        self._invalidation_task = asyncio.create_task(self._invalidation_loop())
     
     async def disconnect(self) -> None:
         """Disconnect from Redis"""
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+        
         await self.redis_cache.disconnect()
     
+    async def _invalidation_loop(self) -> None:
+        """Listen for invalidations from other replicas and evict near-cache copies"""
+        while self.use_redis:
+            try:
+                self._pubsub = self.redis_cache.redis_client.pubsub(ignore_subscribe_messages=True)
+                await self._pubsub.subscribe(self.invalidation_channel)
+                logger.info(f"Subscribed to cache invalidation channel {self.invalidation_channel}")
+                
+                async for message in self._pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._apply_invalidation(message["data"])
+                        
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+                # Invalidations may have been missed while disconnected
+                await self.memory_cache.clear()
+                await asyncio.sleep(1)
+            finally:
+                if self._pubsub is not None:
+                    try:
+                        await self._pubsub.close()
+                    except Exception:
+                        pass
+                    self._pubsub = None
+    
+    async def _apply_invalidation(self, data: Union[str, bytes]) -> None:
+        """Evict near-cache entries named by an invalidation message"""
+        try:
+            event = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed cache invalidation: {data!r}")
+            return
+        
+        if event.get("origin") == self.instance_id:
+            return
+        
+        if event.get("clear"):
+            await self.memory_cache.clear()
+            return
+        
+        if event.get("keys"):
+            await self.memory_cache.delete_many(event["keys"])
+        if event.get("tags"):
+            await self.memory_cache.clear_by_tags(event["tags"])
+        if event.get("pattern"):
+            await self.memory_cache.delete_by_pattern(event["pattern"])
+    
+    async def _publish_invalidation(self, **event: Any) -> None:
+        """Tell other replicas to drop their near-cache copies"""
+        if not self.use_redis or not self.redis_cache.redis_client:
+            return
+        
+        try:
+            event["origin"] = self.instance_id
+            await self.redis_cache.redis_client.publish(self.invalidation_channel, json.dumps(event))
+        except Exception as e:
+            logger.error(f"Failed to publish cache invalidation: {e}")
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache (memory first, then Redis)"""
         # Try memory cache first
@@ -454,8 +855,8 @@ class HybridCache:
         if self.use_redis:
             value = await self.redis_cache.get(key)
             if value is not None:
-                # Store in memory cache for faster access
-                await self.memory_cache.set(key, value)
+                # Store in memory cache for faster access, bounded in case an invalidation is lost
+                await self.memory_cache.set(key, value, self.near_cache_ttl_seconds)
                 return value
         
         return None
@@ -463,12 +864,17 @@ class HybridCache:
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None, 
                  tags: Optional[List[str]] = None) -> bool:
         """Set value in both caches"""
-        # Always set in memory cache
-        await self.memory_cache.set(key, value, ttl_seconds, tags)
+        # Always set in memory cache; with Redis behind it the copy is bounded like the get path's
+        memory_ttl = ttl_seconds
+        if self.use_redis:
+            memory_ttl = min(ttl_seconds or self.near_cache_ttl_seconds, self.near_cache_ttl_seconds)
+        await self.memory_cache.set(key, value, memory_ttl, tags)
         
         # Set in Redis if available
         if self.use_redis:
-            return await self.redis_cache.set(key, value, ttl_seconds, tags)
+            result = await self.redis_cache.set(key, value, ttl_seconds, tags)
+            await self._publish_invalidation(keys=[key])
+            return result
         
         return True
     
@@ -479,14 +885,27 @@ class HybridCache:
         
         if self.use_redis:
             redis_result = await self.redis_cache.delete(key)
+            await self._publish_invalidation(keys=[key])
         
         return memory_result or redis_result
     
+    async def delete_by_pattern(self, pattern: str) -> int:
+        """Delete keys matching pattern from both caches"""
+        memory_count = await self.memory_cache.delete_by_pattern(pattern)
+        redis_count = 0
+        
+        if self.use_redis:
+            redis_count = await self.redis_cache.delete_by_pattern(pattern)
+            await self._publish_invalidation(pattern=pattern)
+        
+        return max(memory_count, redis_count)
+    
     async def clear(self) -> None:
         """Clear both caches"""
         await self.memory_cache.clear()
         if self.use_redis:
             await self.redis_cache.clear()
+            await self._publish_invalidation(clear=True)
     
     async def clear_by_tags(self, tags: List[str]) -> int:
         """Clear cache entries by tags from both caches"""
@@ -494,7 +913,11 @@ class HybridCache:
         redis_count = 0
         
         if self.use_redis:
-            redis_count = await self.redis_cache.clear_by_tags(tags)
+            # Near-cache copies of Redis hits carry no tags, so broadcast the keys too
+            redis_keys = await self.redis_cache.pop_tagged_keys(tags)
+            redis_count = len(redis_keys)
+            await self.memory_cache.delete_many(redis_keys)
+            await self._publish_invalidation(tags=tags, keys=redis_keys)
         
         return memory_count + redis_count
     
@@ -525,6 +948,7 @@ class CacheManager:
             self.cache = HybridCache(self.redis_url)
         
         self.default_ttl = 3600  # 1 hour
+        self.negative_ttl = 60  # Known-missing entries expire quickly
         self.namespace_ttls = {
             "user:": 1800,      # 30 minutes
             "session:": 900,    # 15 minutes
@@ -532,6 +956,16 @@ class CacheManager:
             "config:": 7200,    # 2 hours
             "static:": 86400,   # 24 hours
         }
+        self.namespace_serializers = {
+            "user:": CacheSerializer(compression_threshold=512),
+            "session:": CacheSerializer(compression_threshold=512),
+            "temp:": CacheSerializer(compression=CompressionMethod.NONE),
+        }
+        
+        redis_cache = self._get_redis_cache()
+        if redis_cache:
+            for namespace, serializer in self.namespace_serializers.items():
+                redis_cache.set_namespace_serializer(namespace, serializer)
     
     async def initialize(self) -> None:
         """Initialize cache manager"""
@@ -545,6 +979,21 @@ class CacheManager:
             await self.cache.disconnect()
         logger.info("Cache manager shutdown")
     
+    def _get_redis_cache(self) -> Optional[RedisCache]:
+        """Get the Redis tier of the active backend, if any"""
+        if isinstance(self.cache, RedisCache):
+            return self.cache
+        if isinstance(self.cache, HybridCache):
+            return self.cache.redis_cache
+        return None
+    
+    def set_namespace_serializer(self, namespace: str, serializer: CacheSerializer) -> None:
+        """Configure how values in a namespace are encoded in Redis"""
+        self.namespace_serializers[namespace] = serializer
+        redis_cache = self._get_redis_cache()
+        if redis_cache:
+            redis_cache.set_namespace_serializer(namespace, serializer)
+    
     def _get_ttl_for_key(self, key: str) -> int:
         """Get TTL based on key namespace"""
         for namespace, ttl in self.namespace_ttls.items():
@@ -552,9 +1001,16 @@ class CacheManager:
                 return ttl
         return self.default_ttl
     
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        return await self.cache.get(key)
+    async def get(self, key: str, include_negative: bool = False) -> Optional[Any]:
+        """Get value from cache
+        
+        Keys cached as known-missing read as None, or as NEGATIVE_CACHE_ENTRY
+        when include_negative is set.
+        """
+        value = await self.cache.get(key)
+        if value is NEGATIVE_CACHE_ENTRY and not include_negative:
+            return None
+        return value
     
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None, 
                  tags: Optional[List[str]] = None) -> bool:
@@ -564,12 +1020,22 @@ class CacheManager:
         
         return await self.cache.set(key, value, ttl_seconds, tags)
     
+    async def set_negative(self, key: str, ttl_seconds: Optional[int] = None,
+                           tags: Optional[List[str]] = None) -> bool:
+        """Cache that a key has no value, using the short negative TTL"""
+        if ttl_seconds is None:
+            ttl_seconds = self.negative_ttl
+        
+        return await self.cache.set(key, NEGATIVE_CACHE_ENTRY, ttl_seconds, tags)
+    
     async def delete(self, key: str) -> bool:
         """Delete value from cache"""
         return await self.cache.delete(key)
     
     async def clear_namespace(self, namespace: str) -> int:
         """Clear all keys in a namespace"""
+        if hasattr(self.cache, 'delete_by_pattern'):
+            return await self.cache.delete_by_pattern(f"{namespace}*")
         if hasattr(self.cache, 'get_keys_by_pattern'):
             keys = await self.cache.get_keys_by_pattern(f"{namespace}*")
             count = 0
@@ -585,9 +1051,16 @@ class CacheManager:
     
     async def get_or_set(self, key: str, factory: Callable[[], Any], 
                         ttl_seconds: Optional[int] = None, 
-                        tags: Optional[List[str]] = None) -> Any:
-        """Get value from cache or set it using factory function"""
-        value = await self.get(key)
+                        tags: Optional[List[str]] = None,
+                        cache_missing: bool = False) -> Any:
+        """Get value from cache or set it using factory function
+        
+        With cache_missing, a factory result of None is cached as a negative
+        entry so repeated misses skip the factory.
+        """
+        value = await self.get(key, include_negative=True)
+        if value is NEGATIVE_CACHE_ENTRY:
+            return None
         if value is not None:
             return value
         
@@ -598,7 +1071,11 @@ class CacheManager:
             value = factory()
         
         # Cache the value
-        await self.set(key, value, ttl_seconds, tags)
+        if value is None:
+            if cache_missing:
+                await self.set_negative(key, tags=tags)
+        else:
+            await self.set(key, value, ttl_seconds, tags)
         return value
     
     async def get_stats(self) -> Dict[str, Any]:
@@ -639,11 +1116,21 @@ class CacheManager:
         key = f"user:{user_id}"
         return await self.set(key, data, tags=["user_data"])
     
+    async def cache_user_missing(self, user_id: int) -> bool:
+        """Cache that a user does not exist"""
+        key = f"user:{user_id}"
+        return await self.set_negative(key, tags=["user_data"])
+    
     async def get_user_data(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get cached user data"""
         key = f"user:{user_id}"
         return await self.get(key)
     
+    async def is_user_missing(self, user_id: int) -> bool:
+        """Check whether a user is cached as not existing"""
+        key = f"user:{user_id}"
+        return await self.get(key, include_negative=True) is NEGATIVE_CACHE_ENTRY
+    
     async def cache_session_data(self, session_id: str, data: Dict[str, Any]) -> bool:
         """Cache session data"""
         key = f"session:{session_id}"
@@ -667,6 +1154,8 @@ class CacheManager:
     async def invalidate_user_cache(self, user_id: int) -> bool:
         """Invalidate all cache entries for a user"""
         pattern = f"user:{user_id}*"
+        if hasattr(self.cache, 'delete_by_pattern'):
+            return await self.cache.delete_by_pattern(pattern) > 0
         if hasattr(self.cache, 'get_keys_by_pattern'):
             keys = await self.cache.get_keys_by_pattern(pattern)
             for key in keys:
@@ -675,37 +1164,102 @@ class CacheManager:
         return False
 
 
+# Global cache manager instance
+cache_manager: Optional[CacheManager] = None
+
+
+@dataclass
+class FunctionCacheStats:
+    """Per-function statistics for cache_result"""
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+    hit_time_ms: float = 0.0
+    miss_time_ms: float = 0.0
+    
+    @property
+    def hit_rate(self) -> float:
+        """Calculate cache hit rate"""
+        total = self.hits + self.misses
+        return (self.hits / total * 100) if total > 0 else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for reporting"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": self.hit_rate,
+            "avg_hit_ms": self.hit_time_ms / self.hits if self.hits else 0.0,
+            "avg_miss_ms": self.miss_time_ms / self.misses if self.misses else 0.0
+        }
+
+
+# Functions decorated with cache_result, keyed by qualified name
+_cached_functions: Dict[str, Callable] = {}
+
+def _hash_key_bytes(data: bytes) -> str:
+    """Hash encoded key material with the fastest available hash"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _encode_key_part(value: Any) -> bytes:
+    """Encode an argument canonically so equal values give equal keys"""
+    if _is_plain_data(value):
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+        return json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    # Type-qualified repr for everything else (tuples, dates, objects)
+    return f"{type(value).__qualname__}:{value!r}".encode('utf-8')
+
+
+def make_cache_key(key_prefix: str, func_name: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Build a cache key from a function name and its arguments"""
+    parts = [_encode_key_part(arg) for arg in args]
+    parts.extend(k.encode('utf-8') + b'=' + _encode_key_part(v) for k, v in sorted(kwargs.items()))
+    digest = _hash_key_bytes(b'\x1f'.join(parts))
+    return ":".join(filter(None, [key_prefix, func_name, digest]))
+
+
 def cache_result(ttl_seconds: int = 3600, key_prefix: str = "", 
                 tags: Optional[List[str]] = None):
-    """Decorator to cache function results"""
+    """Decorator to cache function results
+    
+    Decorated functions are registered so initialize_cache_manager can wire
+    them to the active CacheManager; until then they run uncached. Each
+    wrapper exposes its own statistics as ``wrapper.cache_stats``.
+    """
     def decorator(func: Callable) -> Callable:
+        func_name = f"{func.__module__}.{func.__qualname__}"
+        stats = FunctionCacheStats()
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Generate cache key
-            key_parts = [key_prefix, func.__name__]
-            
-            # Add args to key
-            for arg in args:
-                if isinstance(arg, (int, str, float, bool)):
-                    key_parts.append(str(arg))
-                else:
-                    # Hash complex objects
-                    key_parts.append(hashlib.md5(str(arg).encode()).hexdigest()[:8])
-            
-            # Add kwargs to key
-            for k, v in sorted(kwargs.items()):
-                if isinstance(v, (int, str, float, bool)):
-                    key_parts.append(f"{k}:{v}")
-                else:
-                    key_parts.append(f"{k}:{hashlib.md5(str(v).encode()).hexdigest()[:8]}")
-            
-            cache_key = ":".join(filter(None, key_parts))
+            manager = wrapper._cache_manager
+            cache_key = None
+            start_time = time.perf_counter()
             
             # Try to get from cache
-            if hasattr(wrapper, '_cache_manager'):
-                cached_result = await wrapper._cache_manager.get(cache_key)
-                if cached_result is not None:
-                    return cached_result
+            if manager is not None:
+                try:
+                    cache_key = make_cache_key(key_prefix, func_name, args, kwargs)
+                    cached_result = await manager.get(cache_key, include_negative=True)
+                    if cached_result is NEGATIVE_CACHE_ENTRY:
+                        cached_result = None
+                        found = True
+                    else:
+                        found = cached_result is not None
+                    
+                    if found:
+                        stats.hits += 1
+                        stats.hit_time_ms += (time.perf_counter() - start_time) * 1000
+                        return cached_result
+                except Exception as e:
+                    stats.errors += 1
+                    cache_key = None
+                    logger.error(f"Cache lookup failed for {func_name}: {e}")
             
             # Execute function
             if asyncio.iscoroutinefunction(func):
@@ -714,17 +1268,36 @@ def cache_result(ttl_seconds: int = 3600, key_prefix: str = "",
                 result = func(*args, **kwargs)
             
             # Cache result
-            if hasattr(wrapper, '_cache_manager'):
-                await wrapper._cache_manager.set(cache_key, result, ttl_seconds, tags)
+            if cache_key is not None:
+                stats.misses += 1
+                try:
+                    if result is None:
+                        await manager.set_negative(cache_key, tags=tags)
+                    else:
+                        await manager.set(cache_key, result, ttl_seconds, tags)
+                except Exception as e:
+                    stats.errors += 1
+                    logger.error(f"Cache store failed for {func_name}: {e}")
+                stats.miss_time_ms += (time.perf_counter() - start_time) * 1000
             
             return result
         
+        wrapper._cache_manager = cache_manager
+        wrapper.cache_stats = stats
+        _cached_functions[func_name] = wrapper
         return wrapper
     return decorator
 
 
-# Global cache manager instance
-cache_manager: Optional[CacheManager] = None
+def get_cache_result_stats() -> Dict[str, Dict[str, Any]]:
+    """Get statistics for every function decorated with cache_result"""
+    return {name: func.cache_stats.to_dict() for name, func in _cached_functions.items()}
+
+
+def _bind_cached_functions(manager: Optional['CacheManager']) -> None:
+    """Point every registered cache_result wrapper at a cache manager"""
+    for func in _cached_functions.values():
+        func._cache_manager = manager
 
 
 async def initialize_cache_manager(backend: CacheBackend = CacheBackend.HYBRID, 
@@ -735,12 +1308,7 @@ async def initialize_cache_manager(backend: CacheBackend = CacheBackend.HYBRID,
     await cache_manager.initialize()
     
     # Set cache manager for decorated functions
-    import sys
-    current_module = sys.modules[__name__]
-    for name in dir(current_module):
-        obj = getattr(current_module, name)
-        if callable(obj) and hasattr(obj, '_cache_manager'):
-            obj._cache_manager = cache_manager
+    _bind_cached_functions(cache_manager)
     
     return cache_manager
 
@@ -755,4 +1323,5 @@ async def shutdown_cache_manager() -> None:
     global cache_manager
     if cache_manager:
         await cache_manager.shutdown()
-        cache_manager = None
\ No newline at end of file
+        cache_manager = None
+        _bind_cached_functions(None)
\ No newline at end of file
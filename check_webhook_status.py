@@ -11,12 +11,13 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import BotConfig
+from monitoring.telegram_request import InstrumentedRequest
 from telegram import Bot
 
 async def check_webhook_status():
     """Check current webhook configuration"""
     try:
-        bot = Bot(BotConfig.BOT_TOKEN)
+        bot = Bot(BotConfig.BOT_TOKEN, request=InstrumentedRequest())
         
         print("🔍 Checking webhook status...")
         info = await bot.get_webhook_info()
@@ -112,6 +112,7 @@ class BotConfig:
     ANALYTICS_ENABLED: bool = os.getenv('ANALYTICS_ENABLED', 'false').lower() == 'true'
     SENTRY_DSN: str = os.getenv('SENTRY_DSN', '')
     MONITORING_WEBHOOK: str = os.getenv('MONITORING_WEBHOOK', '')
+    LOOP_STALL_THRESHOLD_MS: float = float(os.getenv('LOOP_STALL_THRESHOLD_MS', '250'))  # 0 disables stall reports
     
     @classmethod
     def validate_config(cls) -> Dict[str, Any]:
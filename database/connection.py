@@ -12,6 +12,7 @@ from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 
 from config import BotConfig
+from cache.cache_manager import get_cache_manager
 
 # Database imports
 try:
@@ -524,13 +525,23 @@ class DatabaseManager:
 # Database operation functions
 async def get_user_data(user_id: int) -> Optional[Dict[str, Any]]:
     """Get user data from database"""
+    cache = get_cache_manager()
+    
     try:
+        # Repeated lookups for unregistered users are answered from the shared
+        # cache; create_user invalidates the entry on every replica
+        if cache and await cache.is_user_missing(user_id):
+            return None
+        
         if db_manager.db_type == 'postgresql':
             query = 'SELECT * FROM users WHERE user_id = $1'
         else:
             query = 'SELECT * FROM users WHERE user_id = ?'
         
-        return await db_manager.execute(query, user_id, fetch='one')
+        user_data = await db_manager.execute(query, user_id, fetch='one')
+        if user_data is None and cache:
+            await cache.cache_user_missing(user_id)
+        return user_data
     except Exception as e:
         logger.error(f"Error getting user data: {e}")
         return None
@@ -578,6 +589,10 @@ async def create_user(user_id: int, username: str, first_name: str) -> bool:
             '''
         
         await db_manager.execute(query, user_id, username, first_name, now, now, now, now)
+        
+        cache = get_cache_manager()
+        if cache:
+            await cache.delete(f"user:{user_id}")
         return True
     except Exception as e:
         logger.error(f"Error creating user: {e}")
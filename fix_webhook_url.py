@@ -6,11 +6,12 @@ Fix webhook URL to include the correct path with bot token
 import asyncio
 from telegram import Bot
 from config import config
+from monitoring.telegram_request import InstrumentedRequest
 
 async def fix_webhook_url():
     """Fix the webhook URL to include the bot token in the path"""
     try:
-        bot = Bot(token=config.BOT_TOKEN)
+        bot = Bot(token=config.BOT_TOKEN, request=InstrumentedRequest())
         
         # Current webhook URL
         current_info = await bot.get_webhook_info()
@@ -2,10 +2,14 @@
 
 import asyncio
 import json
+import math
 import psutil
+import sys
+import threading
 import time
+import traceback
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, deque
@@ -19,6 +23,12 @@ from database.connection import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Sorted (label, value) pairs identifying one series of a metric
+LabelSet = Tuple[Tuple[str, str], ...]
+
+# Series that new label sets are folded into once a metric hits its cardinality cap
+OVERFLOW_LABELS: LabelSet = (("overflow", "true"),)
+
 
 class HealthStatus(Enum):
     """Health status levels"""
@@ -81,40 +91,309 @@ class Alert:
     resolved_at: Optional[datetime] = None
 
 
+class QuantileSketch:
+    """Fixed-accuracy streaming quantile sketch
+    
+    Values are counted in logarithmic buckets so any quantile is reported
+    within relative_accuracy of the true value. Recording is O(1), memory
+    grows with the value range rather than the sample count (and is capped
+    by max_buckets), and sketches with the same accuracy can be merged.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Dict[int, int] = defaultdict(int)
+        self.negative: Dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+    
+    def _value(self, index: int) -> float:
+        """Representative value of a bucket"""
+        return 2 * self._gamma ** index / (self._gamma + 1)
+    
+    def add(self, value: float) -> None:
+        """Record a value"""
+        if value > 1e-9:
+            self.positive[self._index(value)] += 1
+            if len(self.positive) > self.max_buckets:
+                self._collapse(self.positive)
+        elif value < -1e-9:
+            self.negative[self._index(-value)] += 1
+            if len(self.negative) > self.max_buckets:
+                self._collapse(self.negative)
+        else:
+            self.zero_count += 1
+        
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    @staticmethod
+    def _collapse(buckets: Dict[int, int]) -> None:
+        """Fold the smallest-magnitude bucket into its neighbour"""
+        smallest, following = sorted(buckets)[:2]
+        buckets[following] += buckets.pop(smallest)
+    
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Add another sketch's values into this one"""
+        if other.count == 0:
+            return
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, bucket_count in other_buckets.items():
+                buckets[index] += bucket_count
+            while len(buckets) > self.max_buckets:
+                self._collapse(buckets)
+        
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1)"""
+        if self.count == 0:
+            return None
+        
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return max(-self._value(index), self.min)
+        
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return min(self._value(index), self.max)
+        return self.max
+    
+    def count_at_or_below(self, bounds: List[float]) -> List[int]:
+        """Cumulative counts for ascending bucket bounds, as in a Prometheus histogram"""
+        values = [(-self._value(index), self.negative[index]) for index in sorted(self.negative, reverse=True)]
+        values.append((0.0, self.zero_count))
+        values.extend((self._value(index), self.positive[index]) for index in sorted(self.positive))
+        
+        counts = []
+        seen = 0
+        position = 0
+        for bound in bounds:
+            while position < len(values) and values[position][0] <= bound:
+                seen += values[position][1]
+                position += 1
+            counts.append(seen)
+        return counts
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Summary statistics in the shape of MetricsCollector.get_histogram_stats"""
+        if self.count == 0:
+            return {}
+        
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+
+class WindowedSketch:
+    """Quantile sketch over a sliding time window
+    
+    The window is split into slices with a sketch each; expired slices are
+    dropped and a snapshot merges the live ones. A lifetime sketch keeps the
+    cumulative distribution for exporters that need monotonic counts.
+    """
+    
+    def __init__(self, window_seconds: float = 300, slices: int = 5, relative_accuracy: float = 0.01):
+        self.window_seconds = window_seconds
+        self.relative_accuracy = relative_accuracy
+        self.lifetime = QuantileSketch(relative_accuracy)
+        self._slice_seconds = window_seconds / slices
+        self._slices: deque = deque(maxlen=slices)
+    
+    def add(self, value: float) -> None:
+        """Record a value in the current slice"""
+        self.lifetime.add(value)
+        slot = int(time.monotonic() // self._slice_seconds)
+        if not self._slices or self._slices[-1][0] != slot:
+            self._slices.append((slot, QuantileSketch(self.relative_accuracy)))
+        self._slices[-1][1].add(value)
+    
+    def snapshot(self) -> QuantileSketch:
+        """Merged sketch of the values recorded within the window"""
+        oldest_slot = int(time.monotonic() // self._slice_seconds) - self._slices.maxlen + 1
+        sketch = QuantileSketch(self.relative_accuracy)
+        for slot, slice_sketch in self._slices:
+            if slot >= oldest_slot:
+                sketch.merge(slice_sketch)
+        return sketch
+
+
+@dataclass
+class SystemSnapshot:
+    """One set of system and process readings"""
+    timestamp: datetime
+    cpu_percent: float
+    memory_percent: float
+    memory_available_bytes: int
+    memory_total_bytes: int
+    disk_total_bytes: int
+    disk_used_bytes: int
+    disk_free_bytes: int
+    process_rss_bytes: int
+    process_vms_bytes: int
+    process_memory_percent: float
+    process_threads: int
+    process_fds: Optional[int] = None
+
+
+class SystemSampler:
+    """Take psutil readings without blocking the event loop
+    
+    Probes run in the default thread executor and a snapshot is reused for
+    max_age_seconds, so health checks and metrics collection share one set
+    of syscalls. CPU usage is measured since the previous sample rather
+    than by sleeping through an interval.
+    """
+    
+    def __init__(self, max_age_seconds: float = 5.0, disk_path: str = '/'):
+        self.max_age_seconds = max_age_seconds
+        self.disk_path = disk_path
+        self._process = psutil.Process()
+        self._snapshot: Optional[SystemSnapshot] = None
+        self._sampled_at = 0.0
+        self._lock = asyncio.Lock()
+        self.boot_time = psutil.boot_time()
+        # Start the CPU measurement window; the first call always reports 0
+        psutil.cpu_percent(interval=None)
+    
+    def _probe(self) -> SystemSnapshot:
+        """Read everything in one pass; runs on an executor thread"""
+        memory = psutil.virtual_memory()
+        disk_usage = psutil.disk_usage(self.disk_path)
+        with self._process.oneshot():
+            memory_info = self._process.memory_info()
+            return SystemSnapshot(
+                timestamp=datetime.now(),
+                cpu_percent=psutil.cpu_percent(interval=None),
+                memory_percent=memory.percent,
+                memory_available_bytes=memory.available,
+                memory_total_bytes=memory.total,
+                disk_total_bytes=disk_usage.total,
+                disk_used_bytes=disk_usage.used,
+                disk_free_bytes=disk_usage.free,
+                process_rss_bytes=memory_info.rss,
+                process_vms_bytes=memory_info.vms,
+                process_memory_percent=self._process.memory_percent(),
+                process_threads=self._process.num_threads(),
+                process_fds=self._process.num_fds() if hasattr(self._process, 'num_fds') else None
+            )
+    
+    async def sample(self) -> SystemSnapshot:
+        """Get a snapshot no older than max_age_seconds"""
+        async with self._lock:
+            if self._snapshot is None or time.monotonic() - self._sampled_at >= self.max_age_seconds:
+                self._snapshot = await asyncio.get_running_loop().run_in_executor(None, self._probe)
+                self._sampled_at = time.monotonic()
+            return self._snapshot
+
+
 class MetricsCollector:
-    """Collect and store performance metrics"""
+    """Collect and store performance metrics
     
-    def __init__(self, max_metrics: int = 10000):
+    Every metric keeps an unlabeled aggregate by name. Values recorded with
+    tags also go to a series keyed by (name, sorted labels); each metric
+    holds at most max_series_per_metric label sets, after which new ones
+    share the OVERFLOW_LABELS series.
+    """
+    
+    def __init__(self, max_metrics: int = 10000, histogram_window_seconds: float = 300,
+                 histogram_accuracy: float = 0.01, max_series_per_metric: int = 100):
         self.metrics: deque = deque(maxlen=max_metrics)
         self.counters: Dict[str, float] = defaultdict(float)
         self.gauges: Dict[str, float] = {}
-        self.histograms: Dict[str, List[float]] = defaultdict(list)
-        self.timers: Dict[str, List[float]] = defaultdict(list)
+        self.histogram_window_seconds = histogram_window_seconds
+        self.histogram_accuracy = histogram_accuracy
+        self.histograms: Dict[str, WindowedSketch] = defaultdict(self._new_sketch)
+        self.timers: Dict[str, WindowedSketch] = defaultdict(self._new_sketch)
+        
+        self.max_series_per_metric = max_series_per_metric
+        self.labeled_counters: Dict[Tuple[str, LabelSet], float] = defaultdict(float)
+        self.labeled_gauges: Dict[Tuple[str, LabelSet], float] = {}
+        self.labeled_histograms: Dict[Tuple[str, LabelSet], WindowedSketch] = defaultdict(self._new_sketch)
+        self.labeled_timers: Dict[Tuple[str, LabelSet], WindowedSketch] = defaultdict(self._new_sketch)
+        self.label_sets: Dict[str, Set[LabelSet]] = defaultdict(set)
+        self._overflowed: Set[str] = set()
+    
+    def _new_sketch(self) -> WindowedSketch:
+        return WindowedSketch(self.histogram_window_seconds, relative_accuracy=self.histogram_accuracy)
+    
+    @staticmethod
+    def _labels(tags: Dict[str, str]) -> LabelSet:
+        return tuple(sorted((str(key), str(value)) for key, value in tags.items()))
+    
+    def _series_key(self, name: str, tags: Dict[str, str]) -> Tuple[str, LabelSet]:
+        """Series key for a metric's labels, enforcing the cardinality cap"""
+        labels = self._labels(tags)
+        known = self.label_sets[name]
+        if labels not in known:
+            if len(known) >= self.max_series_per_metric:
+                if name not in self._overflowed:
+                    self._overflowed.add(name)
+                    logger.warning(f"Metric {name} reached {self.max_series_per_metric} label sets, "
+                                   f"recording new ones in the overflow series")
+                return name, OVERFLOW_LABELS
+            known.add(labels)
+        return name, labels
     
     def increment_counter(self, name: str, value: float = 1.0, tags: Optional[Dict[str, str]] = None) -> None:
         """Increment a counter metric"""
         self.counters[name] += value
+        if tags:
+            self.labeled_counters[self._series_key(name, tags)] += value
         self._add_metric(name, MetricType.COUNTER, value, tags or {})
     
     def set_gauge(self, name: str, value: float, tags: Optional[Dict[str, str]] = None) -> None:
         """Set a gauge metric"""
         self.gauges[name] = value
+        if tags:
+            self.labeled_gauges[self._series_key(name, tags)] = value
         self._add_metric(name, MetricType.GAUGE, value, tags or {})
     
     def add_histogram_value(self, name: str, value: float, tags: Optional[Dict[str, str]] = None) -> None:
         """Add value to histogram"""
-        self.histograms[name].append(value)
-        # Keep only last 1000 values
-        if len(self.histograms[name]) > 1000:
-            self.histograms[name] = self.histograms[name][-1000:]
+        self.histograms[name].add(value)
+        if tags:
+            self.labeled_histograms[self._series_key(name, tags)].add(value)
         self._add_metric(name, MetricType.HISTOGRAM, value, tags or {})
     
     def record_timer(self, name: str, duration_ms: float, tags: Optional[Dict[str, str]] = None) -> None:
         """Record timer duration"""
-        self.timers[name].append(duration_ms)
-        # Keep only last 1000 values
-        if len(self.timers[name]) > 1000:
-            self.timers[name] = self.timers[name][-1000:]
+        self.timers[name].add(duration_ms)
+        if tags:
+            self.labeled_timers[self._series_key(name, tags)].add(duration_ms)
         self._add_metric(name, MetricType.TIMER, duration_ms, tags or {})
     
     def _add_metric(self, name: str, metric_type: MetricType, value: float, tags: Dict[str, str]) -> None:
@@ -128,59 +407,92 @@ class MetricsCollector:
         )
         self.metrics.append(metric)
     
-    def get_counter_value(self, name: str) -> float:
-        """Get current counter value"""
+    def get_counter_value(self, name: str, tags: Optional[Dict[str, str]] = None) -> float:
+        """Get current counter value, for one series if tags are given"""
+        if tags:
+            return self.labeled_counters.get((name, self._labels(tags)), 0.0)
         return self.counters.get(name, 0.0)
     
-    def get_gauge_value(self, name: str) -> Optional[float]:
-        """Get current gauge value"""
+    def get_gauge_value(self, name: str, tags: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """Get current gauge value, for one series if tags are given"""
+        if tags:
+            return self.labeled_gauges.get((name, self._labels(tags)))
         return self.gauges.get(name)
     
-    def get_histogram_stats(self, name: str) -> Dict[str, float]:
-        """Get histogram statistics"""
-        values = self.histograms.get(name, [])
-        if not values:
-            return {}
-        
-        sorted_values = sorted(values)
-        count = len(sorted_values)
-        
-        return {
-            "count": count,
-            "min": min(sorted_values),
-            "max": max(sorted_values),
-            "mean": sum(sorted_values) / count,
-            "p50": sorted_values[int(count * 0.5)],
-            "p90": sorted_values[int(count * 0.9)],
-            "p95": sorted_values[int(count * 0.95)],
-            "p99": sorted_values[int(count * 0.99)] if count >= 100 else sorted_values[-1]
-        }
+    def get_histogram_snapshot(self, name: str, tags: Optional[Dict[str, str]] = None) -> Optional[QuantileSketch]:
+        """Get a mergeable sketch of a histogram's recent values"""
+        if tags:
+            sketch = self.labeled_histograms.get((name, self._labels(tags)))
+        else:
+            sketch = self.histograms.get(name)
+        return sketch.snapshot() if sketch else None
+    
+    def get_timer_snapshot(self, name: str, tags: Optional[Dict[str, str]] = None) -> Optional[QuantileSketch]:
+        """Get a mergeable sketch of a timer's recent durations"""
+        if tags:
+            sketch = self.labeled_timers.get((name, self._labels(tags)))
+        else:
+            sketch = self.timers.get(name)
+        return sketch.snapshot() if sketch else None
+    
+    def get_histogram_stats(self, name: str, tags: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """Get histogram statistics over the histogram window"""
+        snapshot = self.get_histogram_snapshot(name, tags)
+        return snapshot.get_stats() if snapshot else {}
     
-    def get_timer_stats(self, name: str) -> Dict[str, float]:
-        """Get timer statistics"""
-        return self.get_histogram_stats(name)  # Same calculation
+    def get_timer_stats(self, name: str, tags: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """Get timer statistics over the histogram window"""
+        snapshot = self.get_timer_snapshot(name, tags)
+        return snapshot.get_stats() if snapshot else {}
+    
+    def get_labeled_summary(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Get every labeled series, grouped by metric type and name"""
+        summary: Dict[str, Dict[str, List[Dict[str, Any]]]] = {
+            "counters": defaultdict(list), "gauges": defaultdict(list),
+            "histograms": defaultdict(list), "timers": defaultdict(list)
+        }
+        for (name, labels), value in list(self.labeled_counters.items()):
+            summary["counters"][name].append({"labels": dict(labels), "value": value})
+        for (name, labels), value in list(self.labeled_gauges.items()):
+            summary["gauges"][name].append({"labels": dict(labels), "value": value})
+        for (name, labels), sketch in list(self.labeled_histograms.items()):
+            summary["histograms"][name].append({"labels": dict(labels), **sketch.snapshot().get_stats()})
+        for (name, labels), sketch in list(self.labeled_timers.items()):
+            summary["timers"][name].append({"labels": dict(labels), **sketch.snapshot().get_stats()})
+        return {metric_type: dict(series) for metric_type, series in summary.items()}
     
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Get comprehensive metrics summary"""
         return {
             "counters": dict(self.counters),
             "gauges": dict(self.gauges),
-            "histograms": {name: self.get_histogram_stats(name) for name in self.histograms.keys()},
-            "timers": {name: self.get_timer_stats(name) for name in self.timers.keys()},
+            "histograms": {name: self.get_histogram_stats(name) for name in list(self.histograms)},
+            "timers": {name: self.get_timer_stats(name) for name in list(self.timers)},
+            "labeled": self.get_labeled_summary(),
             "total_metrics": len(self.metrics),
             "collection_time": datetime.now().isoformat()
         }
 
 
 class SystemHealthChecker:
-    """System health monitoring"""
+    """System health monitoring
     
-    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+    Due checks run concurrently, each under its own timeout and all under
+    check_budget_seconds. Results are kept for the check's interval, so the
+    health summary can be served without running any probes.
+    """
+    
+    def __init__(self, db_manager: Optional[DatabaseManager] = None,
+                 sampler: Optional[SystemSampler] = None, check_budget_seconds: float = 30):
         self.db_manager = db_manager
+        self.sampler = sampler or SystemSampler()
+        self.check_budget_seconds = check_budget_seconds
         self.health_checks: Dict[str, HealthCheck] = {}
         self.check_results: Dict[str, List[HealthCheckResult]] = defaultdict(list)
         self.failure_counts: Dict[str, int] = defaultdict(int)
         self.last_check_times: Dict[str, datetime] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
         
         # Register default health checks
         self._register_default_checks()
@@ -223,10 +535,25 @@ class SystemHealthChecker:
         logger.info(f"Registered health check: {health_check.name}")
     
     async def run_check(self, check_name: str) -> HealthCheckResult:
-        """Run a specific health check"""
+        """Run a specific health check, joining a run already in progress"""
         if check_name not in self.health_checks:
             raise ValueError(f"Health check '{check_name}' not found")
         
+        task = self._in_flight.get(check_name)
+        if task is None:
+            task = asyncio.ensure_future(self._execute_check(check_name))
+            self._in_flight[check_name] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(check_name, None))
+        return await asyncio.shield(task)
+    
+    def _failure_status(self, check_name: str) -> HealthStatus:
+        """Status for a failed check based on consecutive failures"""
+        if self.failure_counts[check_name] >= self.health_checks[check_name].critical_threshold:
+            return HealthStatus.CRITICAL
+        return HealthStatus.WARNING
+    
+    async def _execute_check(self, check_name: str) -> HealthCheckResult:
+        """Run a health check function and store its result"""
         check = self.health_checks[check_name]
         start_time = time.time()
         
@@ -267,76 +594,109 @@ class SystemHealthChecker:
             response_time = (time.time() - start_time) * 1000
             self.failure_counts[check_name] += 1
             
-            # Determine status based on failure count
-            if self.failure_counts[check_name] >= check.critical_threshold:
-                status = HealthStatus.CRITICAL
-            else:
-                status = HealthStatus.WARNING
-            
             check_result = HealthCheckResult(
                 name=check_name,
-                status=status,
+                status=self._failure_status(check_name),
                 message=f"Health check failed: {str(e)}",
                 response_time_ms=response_time,
                 timestamp=datetime.now(),
                 details={"error": str(e), "failure_count": self.failure_counts[check_name]}
             )
         
-        # Store result
+        self._store_result(check_result)
+        return check_result
+    
+    def _store_result(self, check_result: HealthCheckResult) -> None:
+        """Keep a check result as the latest known state"""
+        check_name = check_result.name
         self.check_results[check_name].append(check_result)
         # Keep only last 100 results per check
         if len(self.check_results[check_name]) > 100:
             self.check_results[check_name] = self.check_results[check_name][-100:]
         
         self.last_check_times[check_name] = datetime.now()
-        
-        return check_result
     
-    async def run_all_checks(self) -> Dict[str, HealthCheckResult]:
-        """Run all enabled health checks"""
-        results = {}
-        
+    def _due_checks(self) -> List[str]:
+        """Enabled checks whose last result is older than their interval"""
+        now = datetime.now()
+        due = []
         for check_name, check in self.health_checks.items():
             if not check.enabled:
                 continue
-            
-            # Check if it's time to run this check
             last_check = self.last_check_times.get(check_name)
-            if last_check:
-                time_since_last = (datetime.now() - last_check).total_seconds()
-                if time_since_last < check.interval_seconds:
-                    continue
-            
-            try:
-                result = await self.run_check(check_name)
+            if last_check and (now - last_check).total_seconds() < check.interval_seconds:
+                continue
+            due.append(check_name)
+        return due
+    
+    async def run_all_checks(self) -> Dict[str, HealthCheckResult]:
+        """Run all due health checks concurrently within the check budget"""
+        tasks = {check_name: asyncio.ensure_future(self.run_check(check_name))
+                 for check_name in self._due_checks()}
+        if not tasks:
+            return {}
+        
+        start_time = time.time()
+        await asyncio.wait(tasks.values(), timeout=self.check_budget_seconds)
+        
+        results = {}
+        cancelled = []
+        for check_name, task in tasks.items():
+            if not task.done():
+                # Over budget: stop the probe and record it as a failure
+                task.cancel()
+                in_flight = self._in_flight.get(check_name)
+                if in_flight:
+                    in_flight.cancel()
+                    cancelled.append(in_flight)
+                self.failure_counts[check_name] += 1
+                result = HealthCheckResult(
+                    name=check_name,
+                    status=self._failure_status(check_name),
+                    message=f"Health check exceeded the {self.check_budget_seconds}s check budget",
+                    response_time_ms=(time.time() - start_time) * 1000,
+                    timestamp=datetime.now(),
+                    details={"failure_count": self.failure_counts[check_name]}
+                )
+                self._store_result(result)
                 results[check_name] = result
-            except Exception as e:
-                logger.error(f"Failed to run health check {check_name}: {e}")
+            elif task.exception():
+                logger.error(f"Failed to run health check {check_name}: {task.exception()}")
+            else:
+                results[check_name] = task.result()
         
+        if cancelled:
+            await asyncio.wait(cancelled, timeout=1)
         return results
     
+    def refresh_in_background(self) -> None:
+        """Start running due checks without waiting for them"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.run_all_checks())
+    
     async def _check_system_resources(self) -> Dict[str, Any]:
         """Check system resource usage"""
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
+        snapshot = await self.sampler.sample()
+        cpu_percent = snapshot.cpu_percent
+        memory_percent = snapshot.memory_percent
         
         details = {
             "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "memory_available_gb": round(memory.available / (1024**3), 2),
-            "memory_total_gb": round(memory.total / (1024**3), 2)
+            "memory_percent": memory_percent,
+            "memory_available_gb": round(snapshot.memory_available_bytes / (1024**3), 2),
+            "memory_total_gb": round(snapshot.memory_total_bytes / (1024**3), 2)
         }
         
         # Determine status
-        if cpu_percent > 90 or memory.percent > 90:
+        if cpu_percent > 90 or memory_percent > 90:
             status = HealthStatus.CRITICAL
-            message = f"High resource usage: CPU {cpu_percent}%, Memory {memory.percent}%"
-        elif cpu_percent > 70 or memory.percent > 70:
+            message = f"High resource usage: CPU {cpu_percent}%, Memory {memory_percent}%"
+        elif cpu_percent > 70 or memory_percent > 70:
             status = HealthStatus.WARNING
-            message = f"Moderate resource usage: CPU {cpu_percent}%, Memory {memory.percent}%"
+            message = f"Moderate resource usage: CPU {cpu_percent}%, Memory {memory_percent}%"
         else:
             status = HealthStatus.HEALTHY
-            message = f"Resource usage normal: CPU {cpu_percent}%, Memory {memory.percent}%"
+            message = f"Resource usage normal: CPU {cpu_percent}%, Memory {memory_percent}%"
         
         return {
             "status": status,
@@ -384,13 +744,13 @@ class SystemHealthChecker:
     async def _check_disk_space(self) -> Dict[str, Any]:
         """Check available disk space"""
         try:
-            disk_usage = psutil.disk_usage('/')
-            free_percent = (disk_usage.free / disk_usage.total) * 100
+            snapshot = await self.sampler.sample()
+            free_percent = (snapshot.disk_free_bytes / snapshot.disk_total_bytes) * 100
             
             details = {
-                "total_gb": round(disk_usage.total / (1024**3), 2),
-                "used_gb": round(disk_usage.used / (1024**3), 2),
-                "free_gb": round(disk_usage.free / (1024**3), 2),
+                "total_gb": round(snapshot.disk_total_bytes / (1024**3), 2),
+                "used_gb": round(snapshot.disk_used_bytes / (1024**3), 2),
+                "free_gb": round(snapshot.disk_free_bytes / (1024**3), 2),
                 "free_percent": round(free_percent, 2)
             }
             
@@ -420,16 +780,15 @@ class SystemHealthChecker:
     async def _check_memory_usage(self) -> Dict[str, Any]:
         """Check detailed memory usage"""
         try:
-            process = psutil.Process()
-            memory_info = process.memory_info()
-            memory_percent = process.memory_percent()
+            snapshot = await self.sampler.sample()
+            memory_percent = snapshot.process_memory_percent
             
             details = {
-                "rss_mb": round(memory_info.rss / (1024**2), 2),
-                "vms_mb": round(memory_info.vms / (1024**2), 2),
+                "rss_mb": round(snapshot.process_rss_bytes / (1024**2), 2),
+                "vms_mb": round(snapshot.process_vms_bytes / (1024**2), 2),
                 "percent": round(memory_percent, 2),
-                "num_threads": process.num_threads(),
-                "num_fds": process.num_fds() if hasattr(process, 'num_fds') else 'N/A'
+                "num_threads": snapshot.process_threads,
+                "num_fds": snapshot.process_fds if snapshot.process_fds is not None else 'N/A'
             }
             
             if memory_percent > 80:
@@ -527,6 +886,7 @@ class SystemHealthChecker:
                     "message": latest_result.message,
                     "response_time_ms": round(latest_result.response_time_ms, 2),
                     "timestamp": latest_result.timestamp.isoformat(),
+                    "age_seconds": round((datetime.now() - latest_result.timestamp).total_seconds(), 1),
                     "failure_count": self.failure_counts.get(check_name, 0)
                 }
         
@@ -544,10 +904,15 @@ class SystemHealthChecker:
 class AlertManager:
     """Manage system alerts and notifications"""
     
-    def __init__(self, max_alerts: int = 1000):
+    def __init__(self, max_alerts: int = 1000,
+                 loop_lag_threshold_ms: float = BotConfig.LOOP_STALL_THRESHOLD_MS,
+                 stall_alert_seconds: float = 300):
         self.alerts: deque = deque(maxlen=max_alerts)
         self.active_alerts: Dict[str, Alert] = {}
         self.alert_rules: List[Callable] = []
+        self.loop_lag_threshold_ms = loop_lag_threshold_ms
+        self.stall_alert_seconds = stall_alert_seconds  # how long a stall alert stays active
+        self.last_stall_at: Optional[float] = None  # monotonic time of the last event loop stall
         
         # Register default alert rules
         self._register_default_rules()
@@ -557,7 +922,8 @@ class AlertManager:
         self.alert_rules.extend([
             self._check_health_status_alerts,
             self._check_resource_alerts,
-            self._check_error_rate_alerts
+            self._check_error_rate_alerts,
+            self._check_event_loop_alerts
         ])
     
     def create_alert(self, alert_id: str, severity: HealthStatus, title: str, 
@@ -684,6 +1050,34 @@ class AlertManager:
         
         return alerts
     
+    def _check_event_loop_alerts(self, health_summary: Dict[str, Any], 
+                                 metrics_summary: Dict[str, Any]) -> List[Alert]:
+        """Check for event loop lag alerts"""
+        alerts = []
+        
+        lag_stats = metrics_summary.get("timers", {}).get("event_loop.lag_ms", {})
+        lag_p99 = lag_stats.get("p99", 0)
+        
+        if self.loop_lag_threshold_ms and lag_p99 > self.loop_lag_threshold_ms:
+            alert_id = "event_loop_lag"
+            if alert_id not in self.active_alerts:
+                alert = self.create_alert(
+                    alert_id=alert_id,
+                    severity=HealthStatus.WARNING,
+                    title="Event Loop Lag",
+                    message=f"Event loop p99 lag is {lag_p99:.0f}ms",
+                    source="event_loop_monitor"
+                )
+                alerts.append(alert)
+        else:
+            self.resolve_alert("event_loop_lag")
+        
+        # A single stall barely moves p99, so stall alerts expire on their own clock
+        if self.last_stall_at is None or time.monotonic() - self.last_stall_at >= self.stall_alert_seconds:
+            self.resolve_alert("event_loop_stall")
+        
+        return alerts
+    
     def get_active_alerts(self) -> List[Dict[str, Any]]:
         """Get all active alerts"""
         return [
@@ -717,13 +1111,120 @@ class AlertManager:
         }
 
 
+class EventLoopMonitor:
+    """Measure event loop lag and report stalls
+    
+    A sampler task sleeps for interval_seconds and records how late it woke
+    up in the event_loop.lag_ms timer. With stall_threshold_ms set, a
+    watchdog thread notices when the loop has not woken the sampler for
+    that long and captures the running task and the loop thread's stack
+    while it is still blocked.
+    """
+    
+    def __init__(self, metrics_collector: MetricsCollector, alert_manager: Optional['AlertManager'] = None,
+                 interval_seconds: float = 0.5, stall_threshold_ms: Optional[float] = None):
+        self.metrics_collector = metrics_collector
+        self.alert_manager = alert_manager
+        self.interval_seconds = interval_seconds
+        self.stall_threshold_ms = stall_threshold_ms
+        self.last_stall: Optional[Dict[str, Any]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._stall_reported = False
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+    
+    def start(self) -> None:
+        """Start sampling the running loop"""
+        if self._task and not self._task.done():
+            return
+        
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._sample_loop())
+        
+        if self.stall_threshold_ms:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+            self._watchdog.start()
+    
+    async def stop(self) -> None:
+        """Stop sampling"""
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _sample_loop(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            self._heartbeat = now
+            self._stall_reported = False
+            self.metrics_collector.record_timer("event_loop.lag_ms", max(0.0, (now - expected) * 1000))
+    
+    def _watch(self) -> None:
+        """Watchdog thread body"""
+        threshold = self.stall_threshold_ms / 1000
+        while not self._stopped.wait(min(threshold / 2, self.interval_seconds)):
+            blocked = time.monotonic() - self._heartbeat - self.interval_seconds
+            if blocked >= threshold and not self._stall_reported:
+                self._stall_reported = True
+                self._report_stall(blocked * 1000)
+    
+    def _report_stall(self, blocked_ms: float) -> None:
+        """Capture what the loop thread is running; called from the watchdog thread"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        task = asyncio.current_task(self._loop)
+        if task:
+            task_name = getattr(task.get_coro(), "__qualname__", task.get_name())
+        else:
+            task_name = "callback"
+        
+        logger.warning(f"Event loop blocked for {blocked_ms:.0f}ms in {task_name}:\n{stack}")
+        self.last_stall = {
+            "task": task_name,
+            "blocked_ms": round(blocked_ms, 1),
+            "stack": stack,
+            "timestamp": datetime.now().isoformat()
+        }
+        # Metrics and alerts are not thread-safe; record them once the loop is free
+        self._loop.call_soon_threadsafe(self._record_stall, task_name, blocked_ms)
+    
+    def _record_stall(self, task_name: str, blocked_ms: float) -> None:
+        self.metrics_collector.increment_counter("event_loop.stalls_total", tags={"task": task_name})
+        if self.alert_manager:
+            self.alert_manager.last_stall_at = time.monotonic()
+        if self.alert_manager and "event_loop_stall" not in self.alert_manager.active_alerts:
+            self.alert_manager.create_alert(
+                alert_id="event_loop_stall",
+                severity=HealthStatus.WARNING,
+                title="Event Loop Stalled",
+                message=f"Event loop blocked for at least {blocked_ms:.0f}ms in {task_name}",
+                source="event_loop_monitor"
+            )
+
+
 class HealthMonitor:
     """Main health monitoring coordinator"""
     
-    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+    def __init__(self, db_manager: Optional[DatabaseManager] = None,
+                 loop_stall_threshold_ms: Optional[float] = BotConfig.LOOP_STALL_THRESHOLD_MS):
         self.metrics_collector = MetricsCollector()
-        self.health_checker = SystemHealthChecker(db_manager)
-        self.alert_manager = AlertManager()
+        self.sampler = SystemSampler()
+        self.health_checker = SystemHealthChecker(db_manager, self.sampler)
+        self.alert_manager = AlertManager(loop_lag_threshold_ms=loop_stall_threshold_ms or 0)
+        self.loop_monitor = EventLoopMonitor(self.metrics_collector, self.alert_manager,
+                                             stall_threshold_ms=loop_stall_threshold_ms)
         self.monitoring_active = False
         self.monitoring_task: Optional[asyncio.Task] = None
         self.monitoring_interval = 30  # seconds
@@ -735,12 +1236,14 @@ class HealthMonitor:
             return
         
         self.monitoring_active = True
+        self.loop_monitor.start()
         self.monitoring_task = asyncio.create_task(self._monitoring_loop())
         logger.info("Health monitoring started")
     
     async def stop_monitoring(self) -> None:
         """Stop continuous monitoring"""
         self.monitoring_active = False
+        await self.loop_monitor.stop()
         
         if self.monitoring_task:
             self.monitoring_task.cancel()
@@ -779,23 +1282,21 @@ class HealthMonitor:
     async def _collect_system_metrics(self) -> None:
         """Collect system-level metrics"""
         try:
-            # CPU and memory metrics
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
+            snapshot = await self.sampler.sample()
             
-            self.metrics_collector.set_gauge("system.cpu.percent", cpu_percent)
-            self.metrics_collector.set_gauge("system.memory.percent", memory.percent)
-            self.metrics_collector.set_gauge("system.memory.available_gb", memory.available / (1024**3))
+            # CPU and memory metrics
+            self.metrics_collector.set_gauge("system.cpu.percent", snapshot.cpu_percent)
+            self.metrics_collector.set_gauge("system.memory.percent", snapshot.memory_percent)
+            self.metrics_collector.set_gauge("system.memory.available_gb", snapshot.memory_available_bytes / (1024**3))
             
             # Process metrics
-            process = psutil.Process()
-            self.metrics_collector.set_gauge("process.memory.rss_mb", process.memory_info().rss / (1024**2))
-            self.metrics_collector.set_gauge("process.memory.percent", process.memory_percent())
-            self.metrics_collector.set_gauge("process.threads", process.num_threads())
+            self.metrics_collector.set_gauge("process.memory.rss_mb", snapshot.process_rss_bytes / (1024**2))
+            self.metrics_collector.set_gauge("process.memory.percent", snapshot.process_memory_percent)
+            self.metrics_collector.set_gauge("process.threads", snapshot.process_threads)
             
             # Disk metrics
-            disk_usage = psutil.disk_usage('/')
-            self.metrics_collector.set_gauge("system.disk.free_percent", (disk_usage.free / disk_usage.total) * 100)
+            self.metrics_collector.set_gauge("system.disk.free_percent",
+                                             (snapshot.disk_free_bytes / snapshot.disk_total_bytes) * 100)
             
         except Exception as e:
             logger.error(f"Failed to collect system metrics: {e}")
@@ -812,13 +1313,14 @@ class HealthMonitor:
             "health": health_summary,
             "metrics": metrics_summary,
             "alerts": alert_summary,
+            "last_event_loop_stall": self.loop_monitor.last_stall,
             "uptime_hours": self._get_uptime_hours()
         }
     
     def _get_uptime_hours(self) -> float:
         """Get system uptime in hours"""
         try:
-            boot_time = datetime.fromtimestamp(psutil.boot_time())
+            boot_time = datetime.fromtimestamp(self.sampler.boot_time)
             uptime = datetime.now() - boot_time
             return round(uptime.total_seconds() / 3600, 2)
         except Exception:
@@ -850,10 +1352,11 @@ class HealthMonitor:
 health_monitor: Optional[HealthMonitor] = None
 
 
-def initialize_health_monitor(db_manager: Optional[DatabaseManager] = None) -> HealthMonitor:
+def initialize_health_monitor(db_manager: Optional[DatabaseManager] = None,
+                              loop_stall_threshold_ms: Optional[float] = BotConfig.LOOP_STALL_THRESHOLD_MS) -> HealthMonitor:
     """Initialize global health monitor"""
     global health_monitor
-    health_monitor = HealthMonitor(db_manager)
+    health_monitor = HealthMonitor(db_manager, loop_stall_threshold_ms=loop_stall_threshold_ms)
     return health_monitor
 
 
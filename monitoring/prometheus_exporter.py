@@ -0,0 +1,270 @@
+"""Prometheus text exposition of bot metrics"""
+
+import asyncio
+import logging
+import re
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import psutil
+
+from monitoring.health_monitor import LabelSet, MetricsCollector, WindowedSketch, get_health_monitor
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket bounds for histograms and timers; timers are recorded in milliseconds
+DEFAULT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusExporter:
+    """Render MetricsCollector, cache, queue and database stats for scraping
+    
+    The health monitor and, with resolve_cache_manager and
+    resolve_queue_manager, the cache and queue managers fall back to their
+    globals at scrape time; the database is exported only when given. The
+    queue package can't be imported by name next to the standard library
+    queue module, so its global is read from the "message_queue" module
+    once something has loaded it from its file. Queue stats are collected
+    on the loop the queue manager was initialized on.
+    
+    Rendered histogram series are cached and reused until the series
+    records a new value, so scrapes cost little when most series are idle.
+    """
+    
+    def __init__(self, health_monitor=None, cache_manager=None, queue_manager=None,
+                 db_manager=None, namespace: str = "optrixtrades",
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, resolve_cache_manager: bool = True,
+                 resolve_queue_manager: bool = True):
+        self.health_monitor = health_monitor
+        self.cache_manager = cache_manager
+        self.queue_manager = queue_manager
+        self.db_manager = db_manager
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self.resolve_cache_manager = resolve_cache_manager
+        self.resolve_queue_manager = resolve_queue_manager
+        self._names: Dict[str, str] = {}
+        self._label_strings: Dict[LabelSet, str] = {}
+        self._histogram_cache: Dict[Tuple[str, LabelSet], Tuple[Any, int, List[str]]] = {}
+    
+    def _name(self, name: str) -> str:
+        """Metric name with namespace and invalid characters replaced"""
+        metric_name = self._names.get(name)
+        if metric_name is None:
+            metric_name = _INVALID_NAME_CHARS.sub("_", f"{self.namespace}_{name}")
+            self._names[name] = metric_name
+        return metric_name
+    
+    def _label_string(self, labels: LabelSet) -> str:
+        label_string = self._label_strings.get(labels)
+        if label_string is None:
+            label_string = ",".join(
+                f'{_INVALID_NAME_CHARS.sub("_", key)}="{_escape(value)}"' for key, value in labels
+            )
+            self._label_strings[labels] = label_string
+        return label_string
+    
+    def _sample(self, name: str, labels: LabelSet, value: float, extra: str = "") -> str:
+        label_string = self._label_string(labels)
+        if extra:
+            label_string = f"{label_string},{extra}" if label_string else extra
+        if label_string:
+            return f"{name}{{{label_string}}} {_format_value(value)}"
+        return f"{name} {_format_value(value)}"
+    
+    @staticmethod
+    def _series(aggregates: Dict[str, Any], labeled: Dict[Tuple[str, LabelSet], Any]) -> Dict[str, List[Tuple[LabelSet, Any]]]:
+        """Series to export per metric: the labeled ones if any, else the unlabeled aggregate"""
+        series: Dict[str, List[Tuple[LabelSet, Any]]] = {}
+        for (name, labels), value in list(labeled.items()):
+            series.setdefault(name, []).append((labels, value))
+        for name, value in list(aggregates.items()):
+            series.setdefault(name, [((), value)])
+        return series
+    
+    def _render_simple(self, lines: List[str], metric_type: str,
+                       series: Dict[str, List[Tuple[LabelSet, float]]]) -> None:
+        for name, samples in series.items():
+            metric_name = self._name(name)
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+            for labels, value in samples:
+                lines.append(self._sample(metric_name, labels, value))
+    
+    def _render_histogram(self, name: str, labels: LabelSet, sketch: WindowedSketch) -> List[str]:
+        """Bucket, sum and count samples for one series, reused while it is unchanged"""
+        lifetime = sketch.lifetime
+        cache_key = (name, labels)
+        cached = self._histogram_cache.get(cache_key)
+        if cached and cached[0] is lifetime and cached[1] == lifetime.count:
+            return cached[2]
+        
+        lines = []
+        for bound, count in zip(self.buckets, lifetime.count_at_or_below(list(self.buckets))):
+            lines.append(self._sample(f"{name}_bucket", labels, count, f'le="{_format_value(float(bound))}"'))
+        lines.append(self._sample(f"{name}_bucket", labels, lifetime.count, 'le="+Inf"'))
+        lines.append(self._sample(f"{name}_sum", labels, lifetime.total))
+        lines.append(self._sample(f"{name}_count", labels, lifetime.count))
+        self._histogram_cache[cache_key] = (lifetime, lifetime.count, lines)
+        return lines
+    
+    def render_collector(self, collector: MetricsCollector) -> List[str]:
+        """Render every metric held by a collector"""
+        lines: List[str] = []
+        self._render_simple(lines, "counter", self._series(collector.counters, collector.labeled_counters))
+        self._render_simple(lines, "gauge", self._series(collector.gauges, collector.labeled_gauges))
+        
+        for aggregates, labeled in ((collector.histograms, collector.labeled_histograms),
+                                    (collector.timers, collector.labeled_timers)):
+            for name, samples in self._series(aggregates, labeled).items():
+                metric_name = self._name(name)
+                lines.append(f"# TYPE {metric_name} histogram")
+                for labels, sketch in samples:
+                    lines.extend(self._render_histogram(metric_name, labels, sketch))
+        return lines
+    
+    def render_process(self) -> List[str]:
+        """Standard process metrics"""
+        lines: List[str] = []
+        try:
+            process = psutil.Process()
+            with process.oneshot():
+                cpu_times = process.cpu_times()
+                lines.extend([
+                    "# TYPE process_cpu_seconds_total counter",
+                    f"process_cpu_seconds_total {cpu_times.user + cpu_times.system}",
+                    "# TYPE process_resident_memory_bytes gauge",
+                    f"process_resident_memory_bytes {process.memory_info().rss}",
+                    "# TYPE process_start_time_seconds gauge",
+                    f"process_start_time_seconds {process.create_time()}",
+                    "# TYPE process_threads gauge",
+                    f"process_threads {process.num_threads()}",
+                ])
+                if hasattr(process, "num_fds"):
+                    lines.extend(["# TYPE process_open_fds gauge", f"process_open_fds {process.num_fds()}"])
+        except Exception as e:
+            logger.error(f"Failed to collect process metrics: {e}")
+        return lines
+    
+    async def render_cache(self, cache_manager) -> List[str]:
+        """Cache hit, miss and size metrics per cache tier"""
+        try:
+            stats = await cache_manager.get_stats()
+        except Exception as e:
+            logger.error(f"Failed to collect cache metrics: {e}")
+            return []
+        
+        if "memory" in stats:
+            tiers = {tier: stats[tier] for tier in ("memory", "redis") if stats.get(tier)}
+        else:
+            tiers = {stats.get("backend", "cache"): stats}
+        
+        lines: List[str] = []
+        for field_name, metric_type in (("hits", "counter"), ("misses", "counter"),
+                                        ("entries", "gauge"), ("size_bytes", "gauge")):
+            metric_name = self._name(f"cache_{field_name}_total" if metric_type == "counter" else f"cache_{field_name}")
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+            for tier, tier_stats in tiers.items():
+                lines.append(self._sample(metric_name, (("tier", tier),), tier_stats.get(field_name, 0)))
+        return lines
+    
+    async def render_queues(self, queue_manager) -> List[str]:
+        """Per-queue message counts and processing time"""
+        try:
+            loop = getattr(queue_manager, "loop", None)
+            if loop is not None and loop is not asyncio.get_running_loop() and loop.is_running():
+                # Backends are bound to their loop, e.g. when scraped from the health server thread
+                all_stats = await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(queue_manager.get_all_queue_stats(), loop))
+            else:
+                all_stats = await queue_manager.get_all_queue_stats()
+        except Exception as e:
+            logger.error(f"Failed to collect queue metrics: {e}")
+            return []
+        
+        fields = (
+            ("total_messages", "queue_messages_total", "counter"),
+            ("completed_messages", "queue_completed_total", "counter"),
+            ("failed_messages", "queue_failed_total", "counter"),
+            ("pending_messages", "queue_pending_messages", "gauge"),
+            ("processing_messages", "queue_processing_messages", "gauge"),
+            ("dead_letter_messages", "queue_dead_letter_messages", "gauge"),
+            ("average_processing_time", "queue_average_processing_seconds", "gauge"),
+        )
+        lines: List[str] = []
+        for field_name, name, metric_type in fields:
+            metric_name = self._name(name)
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+            for queue_name, stats in all_stats.items():
+                lines.append(self._sample(metric_name, (("queue", queue_name),), getattr(stats, field_name)))
+        return lines
+    
+    def render_database(self, db_manager) -> List[str]:
+        """Database availability and connection pool usage"""
+        pool = getattr(db_manager, "pool", None)
+        up_name = self._name("db_up")
+        lines = [f"# TYPE {up_name} gauge", f"{up_name} {1 if getattr(db_manager, 'is_initialized', False) and pool else 0}"]
+        
+        # asyncpg pools report their size; SQLite uses a single connection
+        if pool is not None and hasattr(pool, "get_size"):
+            size = pool.get_size()
+            idle = pool.get_idle_size()
+            pool_name = self._name("db_pool_connections")
+            max_name = self._name("db_pool_max_connections")
+            lines.extend([
+                f"# TYPE {pool_name} gauge",
+                self._sample(pool_name, (("state", "idle"),), idle),
+                self._sample(pool_name, (("state", "in_use"),), size - idle),
+                f"# TYPE {max_name} gauge",
+                f"{max_name} {pool.get_max_size()}",
+            ])
+        return lines
+    
+    async def render(self) -> str:
+        """Render all sources in the text exposition format"""
+        start_time = time.perf_counter()
+        lines = await asyncio.get_running_loop().run_in_executor(None, self.render_process)
+        
+        health_monitor = self.health_monitor or get_health_monitor()
+        if health_monitor:
+            lines.extend(self.render_collector(health_monitor.metrics_collector))
+        
+        cache_manager = self.cache_manager
+        if cache_manager is None and self.resolve_cache_manager:
+            try:
+                from cache import cache_manager as cache_module
+                cache_manager = cache_module.cache_manager
+            except ImportError:
+                cache_manager = None
+        if cache_manager:
+            lines.extend(await self.render_cache(cache_manager))
+        
+        queue_manager = self.queue_manager
+        if queue_manager is None and self.resolve_queue_manager:
+            queue_module = sys.modules.get("message_queue")
+            queue_manager = queue_module.get_queue_manager() if queue_module else None
+        if queue_manager:
+            lines.extend(await self.render_queues(queue_manager))
+        
+        if self.db_manager:
+            lines.extend(self.render_database(self.db_manager))
+        
+        scrape_name = self._name("scrape_duration_seconds")
+        lines.extend([f"# TYPE {scrape_name} gauge", f"{scrape_name} {time.perf_counter() - start_time}"])
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,84 @@
+"""Bot API request instrumentation"""
+
+import logging
+import time
+from http import HTTPStatus
+from typing import Optional, Tuple
+
+from telegram.error import TelegramError
+from telegram.request import HTTPXRequest, RequestData
+
+from monitoring.health_monitor import MetricsCollector, get_health_monitor
+
+logger = logging.getLogger(__name__)
+
+
+def _api_method(url: str) -> str:
+    """Bot API method name from a request URL; file downloads share one name"""
+    if "/file/bot" in url:
+        return "file_download"
+    return url.rsplit("/", 1)[-1] or "unknown"
+
+
+def _request_size(request_data: Optional[RequestData]) -> int:
+    """Approximate size of the request body in bytes"""
+    if request_data is None:
+        return 0
+    size = sum(len(key) + len(value) + 2 for key, value in request_data.json_parameters.items())
+    if request_data.contains_files:
+        for _, content, _ in request_data.multipart_data.values():
+            if isinstance(content, (bytes, bytearray)):
+                size += len(content)
+    return size
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest that records Bot API call metrics
+
+    Every call records, tagged by API method, a telegram_api.duration_ms
+    timer, telegram_api.responses_total by status code (or exception name
+    when no response arrived), bytes sent and received, and for 429
+    responses the retry_after Telegram asked for. Metrics go to the given
+    collector, or the global health monitor's when none is given.
+    """
+
+    def __init__(self, *args, metrics_collector: Optional[MetricsCollector] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics_collector = metrics_collector
+
+    def _collector(self) -> Optional[MetricsCollector]:
+        if self.metrics_collector is not None:
+            return self.metrics_collector
+        monitor = get_health_monitor()
+        return monitor.metrics_collector if monitor else None
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None,
+                         **kwargs) -> Tuple[int, bytes]:
+        collector = self._collector()
+        if collector is None:
+            return await super().do_request(url, method, request_data, **kwargs)
+
+        tags = {"method": _api_method(url)}
+        start_time = time.perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, request_data, **kwargs)
+        except Exception as e:
+            collector.record_timer("telegram_api.duration_ms", (time.perf_counter() - start_time) * 1000, tags)
+            collector.increment_counter("telegram_api.responses_total", tags={**tags, "status": type(e).__name__})
+            raise
+
+        collector.record_timer("telegram_api.duration_ms", (time.perf_counter() - start_time) * 1000, tags)
+        collector.increment_counter("telegram_api.responses_total", tags={**tags, "status": str(code)})
+        collector.increment_counter("telegram_api.bytes_sent_total", _request_size(request_data), tags)
+        collector.increment_counter("telegram_api.bytes_received_total", len(payload), tags)
+
+        if code == HTTPStatus.TOO_MANY_REQUESTS:
+            collector.increment_counter("telegram_api.retry_after_total", tags=tags)
+            try:
+                retry_after = (self.parse_json_payload(payload).get("parameters") or {}).get("retry_after")
+            except TelegramError:
+                retry_after = None
+            if retry_after:
+                collector.add_histogram_value("telegram_api.retry_after_seconds", float(retry_after), tags)
+
+        return code, payload
@@ -1,17 +1,24 @@
 """Message queuing system for high-volume operations"""
 
 import asyncio
+import heapq
+import itertools
 import json
+import math
+import os
 import pickle
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Callable, Union, TypeVar, Generic
+from typing import Any, Dict, List, Optional, Callable, Union, TypeVar, Generic, Tuple
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import logging
 from functools import wraps
+from contextlib import asynccontextmanager
 import traceback
 
 try:
@@ -21,12 +28,201 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
+try:
+    import aiosqlite
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+    aiosqlite = None
+
 from config import BotConfig
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Cap on pending wake-up tokens per Redis queue; a claim that finds nothing
+# ready clears the rest, so extra tokens would only cause spurious wakeups.
+_WAKEUP_BACKLOG = 1024
+
+# Lua helpers for fair queuing. A fair ring list per priority holds the
+# fairness keys in round-robin order; each key has its own FIFO list named
+# '<ring>:<key>', and messages without a key share the flow of the empty
+# key. Flow lists are derived from the ring key, so these scripts
+# assume a single Redis node rather than a cluster.
+_FAIR_LUA = """
+local function push_fair(ring, key, id)
+    if redis.call('LPUSH', ring .. ':' .. key, id) == 1 then
+        redis.call('RPUSH', ring, key)
+    end
+end
+
+-- Deficit round-robin: the key at the head of the ring may take up to
+-- quantum messages before it moves to the back
+local function pop_fair(ring, deficits_key, quantum)
+    local key = redis.call('LINDEX', ring, 0)
+    if not key then
+        return nil
+    end
+    local flow = ring .. ':' .. key
+    local id = redis.call('RPOP', flow)
+    local deficit = tonumber(redis.call('HGET', deficits_key, flow)) or 0
+    if deficit <= 0 then
+        deficit = quantum
+    end
+    deficit = deficit - 1
+    if redis.call('LLEN', flow) == 0 then
+        redis.call('LPOP', ring)
+        redis.call('HDEL', deficits_key, flow)
+    elseif deficit <= 0 then
+        redis.call('RPUSH', ring, redis.call('LPOP', ring))
+        redis.call('HDEL', deficits_key, flow)
+    else
+        redis.call('HSET', deficits_key, flow, deficit)
+    end
+    return id
+end
+"""
+
+# KEYS: fair ring list
+# ARGV: fairness key, message id
+_FAIR_PUSH_SCRIPT = _FAIR_LUA + """
+push_fair(KEYS[1], ARGV[1], ARGV[2])
+return 1
+"""
+
+# Promote a batch of due delayed messages, then atomically pop up to a limit
+# of message ids in priority order and move them into the processing hash,
+# so a crashed worker can never lose a claimed message. Within a priority,
+# whole-message entries left in the plain list by older versions are served
+# first, then the fair flows in round-robin order. Each claim gets a
+# visibility deadline for the reaper. Returns {id, body, id, body, ...}, or
+# {next due timestamp} when only delayed messages are waiting.
+# KEYS: priority lists (highest first)..., fair rings (same order)..., messages hash,
+#       processing hash, stats hash, delayed zset, deadlines zset, fair deficits hash,
+#       wake-up list, message index hash
+# ARGV: claim timestamp, promotion batch size, claim limit, visibility grace,
+#       fair quantum, queue name, priority value of each list...
+_CLAIM_SCRIPT = _FAIR_LUA + """
+local count = (#KEYS - 8) / 2
+local messages_key = KEYS[2 * count + 1]
+local processing_key = KEYS[2 * count + 2]
+local stats_key = KEYS[2 * count + 3]
+local delayed_key = KEYS[2 * count + 4]
+local deadlines_key = KEYS[2 * count + 5]
+local deficits_key = KEYS[2 * count + 6]
+local wakeup_key = KEYS[2 * count + 7]
+local index_key = KEYS[2 * count + 8]
+local quantum = tonumber(ARGV[5])
+local due = redis.call('ZRANGEBYSCORE', delayed_key, '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #due > 0 then
+    local lists = {}
+    local rings = {}
+    for i = 1, count do
+        lists[ARGV[i + 6]] = KEYS[i]
+        rings[ARGV[i + 6]] = KEYS[count + i]
+    end
+    -- Delayed members are '<priority>|<id>' or '<priority>|<id>|<fairness key>'
+    for _, member in ipairs(due) do
+        local sep = string.find(member, '|', 1, true)
+        local priority = string.sub(member, 1, sep - 1)
+        local rest = string.sub(member, sep + 1)
+        local key_sep = string.find(rest, '|', 1, true)
+        if key_sep then
+            push_fair(rings[priority], string.sub(rest, key_sep + 1), string.sub(rest, 1, key_sep - 1))
+        else
+            push_fair(rings[priority], '', rest)
+        end
+    end
+    redis.call('ZREM', delayed_key, unpack(due))
+end
+local limit = tonumber(ARGV[3])
+local claimed = {}
+for i = 1, count do
+    while #claimed < 2 * limit do
+        local id = redis.call('RPOP', KEYS[i])
+        if not id then
+            id = pop_fair(KEYS[count + i], deficits_key, quantum)
+        end
+        if not id then
+            -- A stale ring entry was dropped; stop once the ring is empty too
+            if redis.call('LLEN', KEYS[count + i]) == 0 then
+                break
+            end
+        else
+            local body = redis.call('HGET', messages_key, id)
+            if not body and string.sub(id, 1, 1) == '{' then
+                -- Entries queued by older versions hold the whole message
+                body = id
+                id = cjson.decode(body)['id']
+                redis.call('HSET', messages_key, id, body)
+                redis.call('HSET', index_key, id, ARGV[6])
+            end
+            if body then
+                local timeout = tonumber(cjson.decode(body)['timeout_seconds']) or 300
+                redis.call('HSET', processing_key, id, ARGV[1])
+                redis.call('ZADD', deadlines_key, tonumber(ARGV[1]) + timeout + tonumber(ARGV[4]), id)
+                table.insert(claimed, id)
+                table.insert(claimed, body)
+            end
+        end
+    end
+end
+if #claimed > 0 then
+    redis.call('HINCRBY', stats_key, 'pending_messages', -#claimed / 2)
+    redis.call('HINCRBY', stats_key, 'processing_messages', #claimed / 2)
+    return claimed
+end
+-- Nothing is ready, so any wake-up tokens left are stale
+redis.call('DEL', wakeup_key)
+local next_due = redis.call('ZRANGE', delayed_key, 0, 0, 'WITHSCORES')
+if #next_due > 0 then
+    return {next_due[2]}
+end
+return false
+"""
+
+# KEYS: processing hash, messages hash, stats hash, message index hash, deadlines zset
+# ARGV: message id, completion timestamp
+_ACK_SCRIPT = """
+local claimed_at = redis.call('HGET', KEYS[1], ARGV[1])
+if not claimed_at then
+    return 0
+end
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('ZREM', KEYS[5], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('HINCRBY', KEYS[3], 'processing_messages', -1)
+redis.call('HINCRBY', KEYS[3], 'completed_messages', 1)
+redis.call('HINCRBYFLOAT', KEYS[3], 'total_processing_time', tonumber(ARGV[2]) - tonumber(claimed_at))
+return 1
+"""
+
+# KEYS: processing hash, messages hash, stats hash, delayed zset or dead letter list,
+#       message index hash, deadlines zset
+# ARGV: message id, updated message, '1' to retry or '0' to dead letter,
+#       retry due timestamp, delayed member
+_NACK_SCRIPT = """
+redis.call('ZREM', KEYS[6], ARGV[1])
+if redis.call('HDEL', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HINCRBY', KEYS[3], 'processing_messages', -1)
+redis.call('HINCRBY', KEYS[3], 'failed_messages', 1)
+if ARGV[3] == '1' then
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+    redis.call('ZADD', KEYS[4], ARGV[4], ARGV[5])
+    redis.call('HINCRBY', KEYS[3], 'pending_messages', 1)
+else
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('HDEL', KEYS[5], ARGV[1])
+    redis.call('LPUSH', KEYS[4], ARGV[2])
+    redis.call('HINCRBY', KEYS[3], 'dead_letter_messages', 1)
+end
+return 1
+"""
+
 
 class MessagePriority(Enum):
     """Message priority levels"""
@@ -51,6 +247,7 @@ class QueueBackend(Enum):
     REDIS = "redis"
     MEMORY = "memory"
     HYBRID = "hybrid"
+    SQLITE = "sqlite"
 
 
 @dataclass
@@ -70,6 +267,7 @@ class QueueMessage:
     completed_at: Optional[datetime] = None
     tags: List[str] = field(default_factory=list)
     timeout_seconds: int = 300  # 5 minutes default
+    fairness_key: Optional[str] = None  # messages sharing a key are scheduled round-robin against other keys
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
@@ -118,10 +316,28 @@ class QueueStats:
 class MessageHandler:
     """Base class for message handlers"""
     
+    # Workers hand up to this many messages at once to handle_batch
+    batch_size: int = 1
+    
     async def handle(self, message: QueueMessage) -> bool:
         """Handle a message. Return True if successful, False otherwise."""
         raise NotImplementedError
     
+    async def handle_batch(self, messages: List[QueueMessage]) -> List[bool]:
+        """Handle several messages. Return one success flag per message.
+        
+        Used when batch_size is greater than 1; each message is acked or
+        nacked according to its flag. Handles messages one by one by default.
+        """
+        results = []
+        for message in messages:
+            try:
+                results.append(await self.handle(message))
+            except Exception as e:
+                await self.on_error(message, e)
+                results.append(False)
+        return results
+    
     async def on_error(self, message: QueueMessage, error: Exception) -> None:
         """Called when message handling fails"""
         logger.error(f"Error handling message {message.id}: {error}")
@@ -131,194 +347,626 @@ class MessageHandler:
         return message.attempts < message.max_attempts
 
 
+async def _process_batch(queue, handler: MessageHandler, messages: List[QueueMessage]) -> None:
+    """Run claimed messages through handle_batch and ack or nack each one
+    
+    Visibility deadlines come from each message's own timeout, so messages
+    with different timeouts are never batched together: each timeout gets
+    its own handle_batch call and the calls run concurrently.
+    """
+    groups: Dict[int, List[QueueMessage]] = {}
+    for message in messages:
+        groups.setdefault(message.timeout_seconds, []).append(message)
+    await asyncio.gather(*(_process_batch_group(queue, handler, group) for group in groups.values()))
+
+
+async def _process_batch_group(queue, handler: MessageHandler, messages: List[QueueMessage]) -> None:
+    """Run messages sharing a timeout through handle_batch under that timeout"""
+    timeout = messages[0].timeout_seconds
+    try:
+        results = await asyncio.wait_for(handler.handle_batch(messages), timeout=timeout)
+    except asyncio.TimeoutError:
+        for message in messages:
+            await queue.nack_message(message.id, "Processing timeout")
+        logger.warning(f"Batch of {len(messages)} messages timed out after {timeout}s")
+        return
+    except Exception as e:
+        for message in messages:
+            await queue.nack_message(message.id, str(e))
+            await handler.on_error(message, e)
+        logger.error(f"Error processing batch of {len(messages)} messages: {e}")
+        return
+    
+    results = list(results)
+    for i, message in enumerate(messages):
+        if i < len(results) and results[i]:
+            await queue.ack_message(message.id)
+        else:
+            await queue.nack_message(message.id, "Handler returned False")
+
+
+def _run_in_process(handler: MessageHandler, message: QueueMessage) -> bool:
+    """Run a handler inside a pool process"""
+    return asyncio.run(handler.handle(message))
+
+
+def _run_batch_in_process(handler: MessageHandler, messages: List[QueueMessage]) -> List[bool]:
+    """Run a batch handler inside a pool process"""
+    return asyncio.run(handler.handle_batch(messages))
+
+
+class CPULane:
+    """Process pool that runs CPU-bound handlers off the event loop
+    
+    Handlers and messages are pickled into the pool, so both must be
+    picklable and handlers can't rely on state shared with the bot process.
+    At most max_concurrency calls run at once; further workers wait here
+    rather than queueing inside the pool. A call keeps its slot until the
+    pool job finishes, even when the caller stops waiting for it (e.g. on a
+    handler timeout), since the process goes on running it.
+    """
+    
+    def __init__(self, name: str, max_workers: Optional[int] = None,
+                 max_concurrency: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def _release_slot(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Free a concurrency slot from the pool's callback thread"""
+        try:
+            loop.call_soon_threadsafe(self._semaphore.release)
+        except RuntimeError:
+            # The loop is closed; nobody is left waiting for a slot
+            pass
+    
+    async def run(self, func: Callable, *args) -> Any:
+        """Run a picklable function in the pool"""
+        await self._semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            executor = self._executor
+            future = executor.submit(func, *args)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self._release_slot(loop))
+        
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A pool process died; start a fresh pool for the next call
+            logger.error(f"Process pool for CPU lane {self.name} broke, restarting it")
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the pool down"""
+        if self._executor:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+class _CPUBoundHandler(MessageHandler):
+    """Adapter that runs another handler in a CPU lane"""
+    
+    def __init__(self, handler: MessageHandler, lane: CPULane):
+        self.handler = handler
+        self.lane = lane
+        self.batch_size = handler.batch_size
+    
+    async def handle(self, message: QueueMessage) -> bool:
+        return await self.lane.run(_run_in_process, self.handler, message)
+    
+    async def handle_batch(self, messages: List[QueueMessage]) -> List[bool]:
+        return await self.lane.run(_run_batch_in_process, self.handler, messages)
+    
+    async def on_error(self, message: QueueMessage, error: Exception) -> None:
+        await self.handler.on_error(message, error)
+    
+    async def on_retry(self, message: QueueMessage) -> bool:
+        return await self.handler.on_retry(message)
+
+
+def _due_timestamp(message: QueueMessage) -> float:
+    """Time a message became (or becomes) available for processing"""
+    return (message.scheduled_at or message.created_at).timestamp()
+
+
+def _resize_workers(workers: List[asyncio.Task], worker_count: int, busy: set,
+                    start_worker: Callable[[int], Any]) -> Tuple[List[asyncio.Task], int, int]:
+    """Start or stop worker tasks to approach worker_count, stopping only idle ones
+    
+    Returns the new task list and how many workers were started and stopped.
+    """
+    workers = list(workers)
+    started = stopped = 0
+    if worker_count > len(workers):
+        first_id = len(workers)
+        for worker_id in range(first_id, worker_count):
+            workers.append(asyncio.create_task(start_worker(worker_id)))
+            started += 1
+    elif worker_count < len(workers):
+        for task in [task for task in workers if task not in busy][:len(workers) - worker_count]:
+            task.cancel()
+            workers.remove(task)
+            stopped += 1
+    return workers, started, stopped
+
+
+class _FairQueue:
+    """Deficit round-robin over per-key FIFOs within each priority level
+    
+    Each fairness key gets up to quantum messages per round, so one noisy
+    key cannot hold back messages queued under other keys. Messages without
+    a fairness key share one more flow (key None) in the same round.
+    """
+    
+    def __init__(self, quantum: int = 1):
+        self.quantum = quantum
+        self.flows: Dict[int, Dict[str, deque]] = {}  # priority -> key -> messages
+        self.active: Dict[int, deque] = {}  # priority -> round-robin order of keys
+        self.deficits: Dict[Tuple[int, str], int] = {}
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def messages(self) -> List[QueueMessage]:
+        """All queued messages, in no particular order"""
+        return [message for flows in self.flows.values() for flow in flows.values() for message in flow]
+    
+    def push(self, message: QueueMessage) -> None:
+        priority = message.priority.value
+        flows = self.flows.setdefault(priority, {})
+        flow = flows.get(message.fairness_key)
+        if flow is None:
+            flow = flows[message.fairness_key] = deque()
+            self.active.setdefault(priority, deque()).append(message.fairness_key)
+        flow.append(message)
+        self.size += 1
+    
+    def top_priority(self) -> Optional[int]:
+        """Highest priority level with queued messages"""
+        return max((priority for priority, keys in self.active.items() if keys), default=None)
+    
+    def pop(self) -> Optional[QueueMessage]:
+        priority = self.top_priority()
+        if priority is None:
+            return None
+        
+        active = self.active[priority]
+        key = active[0]
+        deficit = self.deficits.get((priority, key), 0)
+        if deficit <= 0:
+            deficit = self.quantum
+        
+        flow = self.flows[priority][key]
+        message = flow.popleft()
+        self.size -= 1
+        deficit -= 1
+        
+        if not flow:
+            # Flow drained: drop it and its deficit
+            del self.flows[priority][key]
+            active.popleft()
+            self.deficits.pop((priority, key), None)
+        elif deficit <= 0:
+            # Quantum used up: move to the back of the round
+            active.rotate(-1)
+            self.deficits.pop((priority, key), None)
+        else:
+            self.deficits[(priority, key)] = deficit
+        return message
+    
+    def clear(self) -> None:
+        self.flows.clear()
+        self.active.clear()
+        self.deficits.clear()
+        self.size = 0
+
+
+class _MemoryQueueState:
+    """State of a single in-memory queue, guarded by its own lock"""
+    
+    def __init__(self, name: str, fair_quantum: int = 1):
+        self.name = name
+        self.ready = _FairQueue(fair_quantum)  # due messages, one flow per fairness key
+        self.delayed: List[tuple] = []  # (due timestamp, sequence, message)
+        self.processing: Dict[str, QueueMessage] = {}
+        self.dead_letter: List[QueueMessage] = []
+        self.stats = QueueStats()
+        self.lock = asyncio.Lock()
+        self.condition = asyncio.Condition(self.lock)
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.workers: List[asyncio.Task] = []
+    
+    def __len__(self) -> int:
+        return len(self.ready) + len(self.delayed)
+    
+    def __bool__(self) -> bool:
+        # A queue with nothing waiting still has in-flight messages and stats
+        return True
+    
+    def ready_count(self) -> int:
+        return len(self.ready)
+
+
 class MemoryQueue:
-    """In-memory queue implementation"""
+    """In-memory queue implementation
     
-    def __init__(self, max_size: int = 10000):
+    Each queue keeps ready messages in per-priority FIFO flows and a delay
+    heap ordered by scheduled time, so enqueue and dequeue stay cheap no
+    matter how many retries are waiting. Idle workers sleep on a condition
+    that is notified by enqueues and by one timer armed for the earliest
+    delayed message. Queues have independent locks, so unrelated queues
+    never contend.
+    
+    While workers run, a reaper requeues in-flight messages whose worker
+    has not acked them within their timeout plus visibility_grace seconds,
+    e.g. because the worker task was cancelled mid-handle.
+    
+    Ready messages are scheduled by deficit round-robin across fairness
+    keys within their priority level, fair_quantum messages per key per
+    round; messages without a fairness_key take turns as one more key.
+    """
+    
+    def __init__(self, max_size: int = 10000, visibility_grace: float = 30,
+                 reap_interval: float = 10, fair_quantum: int = 1):
         self.max_size = max_size
-        self.queues: Dict[str, deque] = {}
-        self.processing: Dict[str, QueueMessage] = {}
-        self.dead_letter: Dict[str, List[QueueMessage]] = {}
-        self.stats: Dict[str, QueueStats] = {}
-        self._lock = asyncio.Lock()
+        self.fair_quantum = fair_quantum
+        self.visibility_grace = visibility_grace
+        self.reap_interval = reap_interval
+        self.queues: Dict[str, _MemoryQueueState] = {}
+        self._message_queues: Dict[str, str] = {}  # in-flight message id -> queue name
+        self._sequence = itertools.count()
         self._handlers: Dict[str, MessageHandler] = {}
-        self._workers: Dict[str, List[asyncio.Task]] = {}
+        self._busy_workers: set = set()  # worker tasks currently handling messages
+        self._reaper: Optional[asyncio.Task] = None
         self._running = False
     
+    def _get_queue(self, queue_name: str) -> _MemoryQueueState:
+        """Get a queue's state, creating it if needed
+        
+        Runs without awaiting, so concurrent callers on the event loop can
+        never create the same queue twice and no lock is needed.
+        """
+        state = self.queues.get(queue_name)
+        if state is None:
+            state = self.queues.setdefault(queue_name, _MemoryQueueState(queue_name, self.fair_quantum))
+            logger.info(f"Created memory queue: {queue_name}")
+        return state
+    
     async def create_queue(self, queue_name: str, max_workers: int = 1) -> None:
         """Create a new queue"""
-        async with self._lock:
-            if queue_name not in self.queues:
-                self.queues[queue_name] = deque()
-                self.dead_letter[queue_name] = []
-                self.stats[queue_name] = QueueStats()
-                self._workers[queue_name] = []
-                logger.info(f"Created memory queue: {queue_name}")
+        self._get_queue(queue_name)
     
     async def delete_queue(self, queue_name: str) -> None:
         """Delete a queue"""
-        async with self._lock:
-            if queue_name in self.queues:
-                # Stop workers
-                for task in self._workers.get(queue_name, []):
-                    task.cancel()
-                
-                # Clean up
-                del self.queues[queue_name]
-                del self.dead_letter[queue_name]
-                del self.stats[queue_name]
-                if queue_name in self._workers:
-                    del self._workers[queue_name]
-                if queue_name in self._handlers:
-                    del self._handlers[queue_name]
-                
-                logger.info(f"Deleted memory queue: {queue_name}")
+        # Stop workers
+        await self.stop_workers(queue_name)
+        
+        state = self.queues.pop(queue_name, None)
+        if state is None:
+            return
+        
+        # Clean up
+        async with state.lock:
+            if state.timer:
+                state.timer.cancel()
+            for message_id in state.processing:
+                self._message_queues.pop(message_id, None)
+        self._handlers.pop(queue_name, None)
+        
+        logger.info(f"Deleted memory queue: {queue_name}")
+    
+    def _push(self, state: _MemoryQueueState, message: QueueMessage, now: Optional[float] = None) -> None:
+        """Push message onto the ready flows, or the delay heap if not yet due
+        
+        Must be called with the queue lock held; wakes one waiting worker.
+        """
+        if now is None:
+            now = time.time()
+        
+        sequence = next(self._sequence)
+        if message.scheduled_at is not None:
+            due_at = message.scheduled_at.timestamp()
+            if due_at > now:
+                heapq.heappush(state.delayed, (due_at, sequence, message))
+                self._arm_timer(state)
+                return
+        
+        self._push_ready(state, message)
+        state.condition.notify(1)
+    
+    @staticmethod
+    def _push_ready(state: _MemoryQueueState, message: QueueMessage) -> None:
+        """Make a due message available to workers"""
+        state.ready.push(message)
+    
+    def _arm_timer(self, state: _MemoryQueueState) -> None:
+        """Schedule a single wakeup for the earliest delayed message in a queue"""
+        if not state.delayed:
+            return
+        
+        loop = asyncio.get_running_loop()
+        when = loop.time() + max(0.0, state.delayed[0][0] - time.time())
+        
+        if state.timer is not None and not state.timer.cancelled() and state.timer.when() <= when:
+            return
+        if state.timer is not None:
+            state.timer.cancel()
+        state.timer = loop.call_at(when, self._on_timer, state)
+    
+    def _on_timer(self, state: _MemoryQueueState) -> None:
+        """Timer callback: wake workers for messages that just became due"""
+        state.timer = None
+        if self.queues.get(state.name) is state:
+            asyncio.ensure_future(self._wake_due(state))
+    
+    async def _wake_due(self, state: _MemoryQueueState) -> None:
+        """Promote due messages and notify a worker for each"""
+        async with state.condition:
+            self._promote_due(state, time.time())
+            state.condition.notify(state.ready_count())
+            self._arm_timer(state)
+    
+    def _promote_due(self, state: _MemoryQueueState, now: float) -> None:
+        """Move delayed messages that are now due onto the ready flows"""
+        while state.delayed and state.delayed[0][0] <= now:
+            _, _, message = heapq.heappop(state.delayed)
+            self._push_ready(state, message)
     
     async def enqueue(self, message: QueueMessage) -> bool:
         """Add message to queue"""
-        async with self._lock:
-            if message.queue_name not in self.queues:
-                await self.create_queue(message.queue_name)
-            
-            queue = self.queues[message.queue_name]
-            
-            # Check size limit
-            if len(queue) >= self.max_size:
-                logger.warning(f"Queue {message.queue_name} is full")
-                return False
-            
-            # Insert based on priority
-            inserted = False
-            for i, existing_msg in enumerate(queue):
-                if message.priority.value > existing_msg.priority.value:
-                    queue.insert(i, message)
-                    inserted = True
-                    break
-            
-            if not inserted:
-                queue.append(message)
-            
-            self.stats[message.queue_name].total_messages += 1
-            self.stats[message.queue_name].pending_messages += 1
-            
-            return True
+        return (await self.enqueue_many([message]))[0]
     
-    async def dequeue(self, queue_name: str) -> Optional[QueueMessage]:
-        """Get next message from queue"""
-        async with self._lock:
-            if queue_name not in self.queues or not self.queues[queue_name]:
-                return None
-            
-            # Check for scheduled messages
-            now = datetime.now()
-            queue = self.queues[queue_name]
-            
-            for i, message in enumerate(queue):
-                if message.scheduled_at is None or message.scheduled_at <= now:
-                    # Remove from queue
-                    del queue[i]
-                    
-                    # Mark as processing
-                    message.status = MessageStatus.PROCESSING
-                    message.processing_started_at = now
-                    self.processing[message.id] = message
+    async def enqueue_many(self, messages: List[QueueMessage]) -> List[bool]:
+        """Add several messages, taking each queue's lock once
+        
+        Returns one flag per message; messages beyond a full queue's limit
+        are rejected.
+        """
+        results = [False] * len(messages)
+        by_queue: Dict[str, List[int]] = {}
+        for i, message in enumerate(messages):
+            by_queue.setdefault(message.queue_name, []).append(i)
+        
+        now = time.time()
+        for queue_name, indexes in by_queue.items():
+            state = self._get_queue(queue_name)
+            async with state.lock:
+                for i in indexes:
+                    # Check size limit
+                    if len(state) >= self.max_size:
+                        logger.warning(f"Queue {queue_name} is full")
+                        break
                     
-                    # Update stats
-                    self.stats[queue_name].pending_messages -= 1
-                    self.stats[queue_name].processing_messages += 1
+                    self._push(state, messages[i], now)
                     
+                    state.stats.total_messages += 1
+                    state.stats.pending_messages += 1
+                    results[i] = True
+        
+        return results
+    
+    def _pop_ready(self, state: _MemoryQueueState) -> Optional[QueueMessage]:
+        """Pop the next due message and mark it processing (lock must be held)"""
+        self._promote_due(state, time.time())
+        
+        message = state.ready.pop()
+        if message is None:
+            return None
+        
+        # Mark as processing
+        message.status = MessageStatus.PROCESSING
+        message.processing_started_at = datetime.now()
+        state.processing[message.id] = message
+        self._message_queues[message.id] = state.name
+        
+        # Update stats
+        state.stats.pending_messages -= 1
+        state.stats.processing_messages += 1
+        
+        return message
+    
+    async def dequeue(self, queue_name: str) -> Optional[QueueMessage]:
+        """Get next message from queue"""
+        state = self.queues.get(queue_name)
+        if state is None:
+            return None
+        
+        async with state.lock:
+            return self._pop_ready(state)
+    
+    async def dequeue_batch(self, queue_name: str, max_messages: int) -> List[QueueMessage]:
+        """Get up to max_messages due messages in priority order"""
+        state = self.queues.get(queue_name)
+        if state is None:
+            return []
+        
+        messages = []
+        async with state.lock:
+            while len(messages) < max_messages:
+                message = self._pop_ready(state)
+                if message is None:
+                    break
+                messages.append(message)
+        return messages
+    
+    async def wait_for_message(self, queue_name: str) -> QueueMessage:
+        """Block until a message is available, without polling"""
+        state = self._get_queue(queue_name)
+        async with state.condition:
+            while True:
+                message = self._pop_ready(state)
+                if message is not None:
                     return message
-            
+                self._arm_timer(state)
+                await state.condition.wait()
+    
+    def _processing_state(self, message_id: str) -> Optional[_MemoryQueueState]:
+        """Find the queue currently processing a message"""
+        queue_name = self._message_queues.get(message_id)
+        if queue_name is None:
             return None
+        return self.queues.get(queue_name)
     
     async def ack_message(self, message_id: str) -> bool:
         """Acknowledge successful message processing"""
-        async with self._lock:
-            if message_id in self.processing:
-                message = self.processing[message_id]
-                message.status = MessageStatus.COMPLETED
-                message.completed_at = datetime.now()
-                
-                # Update stats
-                queue_name = message.queue_name
-                self.stats[queue_name].processing_messages -= 1
-                self.stats[queue_name].completed_messages += 1
-                
-                # Calculate processing time
-                if message.processing_started_at:
-                    processing_time = (message.completed_at - message.processing_started_at).total_seconds()
-                    current_avg = self.stats[queue_name].average_processing_time
-                    completed = self.stats[queue_name].completed_messages
-                    self.stats[queue_name].average_processing_time = (
-                        (current_avg * (completed - 1) + processing_time) / completed
-                    )
-                
-                del self.processing[message_id]
-                return True
-            
+        state = self._processing_state(message_id)
+        if state is None:
             return False
+        
+        async with state.lock:
+            message = state.processing.pop(message_id, None)
+            if message is None:
+                return False
+            self._message_queues.pop(message_id, None)
+            
+            message.status = MessageStatus.COMPLETED
+            message.completed_at = datetime.now()
+            
+            # Update stats
+            stats = state.stats
+            stats.processing_messages -= 1
+            stats.completed_messages += 1
+            
+            # Calculate processing time
+            if message.processing_started_at:
+                processing_time = (message.completed_at - message.processing_started_at).total_seconds()
+                stats.average_processing_time = (
+                    (stats.average_processing_time * (stats.completed_messages - 1) + processing_time)
+                    / stats.completed_messages
+                )
+            
+            return True
     
     async def nack_message(self, message_id: str, error_message: str = "") -> bool:
         """Negative acknowledge - message processing failed"""
-        async with self._lock:
-            if message_id in self.processing:
-                message = self.processing[message_id]
-                message.attempts += 1
-                message.error_message = error_message
-                
-                # Check if should retry
-                if message.attempts < message.max_attempts:
-                    message.status = MessageStatus.RETRYING
-                    # Re-queue with delay
-                    delay_seconds = min(60 * (2 ** (message.attempts - 1)), 3600)  # Exponential backoff, max 1 hour
-                    message.scheduled_at = datetime.now() + timedelta(seconds=delay_seconds)
-                    
-                    # Add back to queue
-                    self.queues[message.queue_name].appendleft(message)
-                    self.stats[message.queue_name].pending_messages += 1
-                else:
-                    # Send to dead letter
-                    message.status = MessageStatus.DEAD_LETTER
-                    self.dead_letter[message.queue_name].append(message)
-                    self.stats[message.queue_name].dead_letter_messages += 1
-                
-                # Update stats
-                self.stats[message.queue_name].processing_messages -= 1
-                self.stats[message.queue_name].failed_messages += 1
-                
-                del self.processing[message_id]
-                return True
-            
+        state = self._processing_state(message_id)
+        if state is None:
             return False
+        
+        async with state.lock:
+            message = state.processing.pop(message_id, None)
+            if message is None:
+                return False
+            self._message_queues.pop(message_id, None)
+            
+            self._fail(state, message, error_message)
+            return True
+    
+    def _fail(self, state: _MemoryQueueState, message: QueueMessage, error_message: str) -> None:
+        """Retry a message taken out of processing, or dead-letter it (lock must be held)"""
+        message.attempts += 1
+        message.error_message = error_message
+        
+        # Check if should retry
+        if message.attempts < message.max_attempts:
+            message.status = MessageStatus.RETRYING
+            # Re-queue with delay
+            delay_seconds = min(60 * (2 ** (message.attempts - 1)), 3600)  # Exponential backoff, max 1 hour
+            message.scheduled_at = datetime.now() + timedelta(seconds=delay_seconds)
+            
+            # Add back to queue
+            self._push(state, message)
+            state.stats.pending_messages += 1
+        else:
+            # Send to dead letter
+            message.status = MessageStatus.DEAD_LETTER
+            state.dead_letter.append(message)
+            state.stats.dead_letter_messages += 1
+        
+        # Update stats
+        state.stats.processing_messages -= 1
+        state.stats.failed_messages += 1
+    
+    async def reap_expired(self) -> int:
+        """Requeue in-flight messages whose visibility deadline has passed
+        
+        Returns the number of messages reaped.
+        """
+        reaped = 0
+        now = datetime.now()
+        for state in list(self.queues.values()):
+            async with state.lock:
+                expired = [
+                    message for message in state.processing.values()
+                    if message.processing_started_at is None
+                    or (now - message.processing_started_at).total_seconds()
+                    > message.timeout_seconds + self.visibility_grace
+                ]
+                for message in expired:
+                    del state.processing[message.id]
+                    self._message_queues.pop(message.id, None)
+                    self._fail(state, message, "Visibility timeout expired")
+            
+            if expired:
+                logger.warning(f"Requeued {len(expired)} expired messages in queue {state.name}")
+                reaped += len(expired)
+        return reaped
+    
+    async def _reaper_loop(self) -> None:
+        """Periodically reap expired in-flight messages"""
+        while True:
+            try:
+                await asyncio.sleep(self.reap_interval)
+                await self.reap_expired()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Memory queue reaper error: {e}")
     
     async def get_queue_size(self, queue_name: str) -> int:
         """Get queue size"""
-        async with self._lock:
-            return len(self.queues.get(queue_name, []))
+        state = self.queues.get(queue_name)
+        return len(state) if state is not None else 0
+    
+    async def _get_queue_names(self) -> List[str]:
+        """Get list of queue names"""
+        return list(self.queues)
     
     async def get_stats(self, queue_name: str) -> QueueStats:
         """Get queue statistics"""
-        return self.stats.get(queue_name, QueueStats())
+        state = self.queues.get(queue_name)
+        return state.stats if state is not None else QueueStats()
     
     async def purge_queue(self, queue_name: str) -> int:
         """Remove all messages from queue"""
-        async with self._lock:
-            if queue_name in self.queues:
-                count = len(self.queues[queue_name])
-                self.queues[queue_name].clear()
-                self.stats[queue_name].pending_messages = 0
-                return count
+        state = self.queues.get(queue_name)
+        if state is None:
             return 0
+        
+        async with state.lock:
+            count = len(state)
+            state.ready.clear()
+            state.delayed.clear()
+            if state.timer:
+                state.timer.cancel()
+                state.timer = None
+            state.stats.pending_messages = 0
+            return count
     
     async def get_dead_letter_messages(self, queue_name: str) -> List[QueueMessage]:
         """Get dead letter messages"""
-        return self.dead_letter.get(queue_name, [])
+        state = self.queues.get(queue_name)
+        return state.dead_letter if state is not None else []
     
     async def requeue_dead_letter(self, queue_name: str, message_id: str) -> bool:
         """Requeue a dead letter message"""
-        async with self._lock:
-            dead_messages = self.dead_letter.get(queue_name, [])
-            for i, message in enumerate(dead_messages):
+        state = self.queues.get(queue_name)
+        if state is None:
+            return False
+        
+        async with state.lock:
+            for i, message in enumerate(state.dead_letter):
                 if message.id == message_id:
                     # Reset message
                     message.status = MessageStatus.PENDING
@@ -327,12 +975,12 @@ class MemoryQueue:
                     message.scheduled_at = None
                     
                     # Move back to queue
-                    self.queues[queue_name].append(message)
-                    del dead_messages[i]
+                    del state.dead_letter[i]
+                    self._push(state, message)
                     
                     # Update stats
-                    self.stats[queue_name].dead_letter_messages -= 1
-                    self.stats[queue_name].pending_messages += 1
+                    state.stats.dead_letter_messages -= 1
+                    state.stats.pending_messages += 1
                     
                     return True
             return False
@@ -343,42 +991,86 @@ class MemoryQueue:
     
     async def start_workers(self, queue_name: str, worker_count: int = 1) -> None:
         """Start worker tasks for queue"""
-        if queue_name not in self.queues:
-            await self.create_queue(queue_name)
+        state = self._get_queue(queue_name)
         
         # Stop existing workers
-        for task in self._workers.get(queue_name, []):
+        for task in state.workers:
             task.cancel()
         
         # Start new workers
-        workers = []
-        for i in range(worker_count):
-            task = asyncio.create_task(self._worker_loop(queue_name, i))
-            workers.append(task)
-        
-        self._workers[queue_name] = workers
+        state.workers = [
+            asyncio.create_task(self._worker_loop(queue_name, i))
+            for i in range(worker_count)
+        ]
         self._running = True
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reaper_loop())
         logger.info(f"Started {worker_count} workers for queue {queue_name}")
     
     async def stop_workers(self, queue_name: str) -> None:
         """Stop worker tasks for queue"""
-        for task in self._workers.get(queue_name, []):
+        state = self.queues.get(queue_name)
+        if state is None:
+            return
+        
+        for task in state.workers:
             task.cancel()
         
-        self._workers[queue_name] = []
+        state.workers = []
+        if self._reaper and not any(other.workers for other in self.queues.values()):
+            self._reaper.cancel()
+            self._reaper = None
         logger.info(f"Stopped workers for queue {queue_name}")
     
+    def get_worker_count(self, queue_name: str) -> int:
+        """Number of live workers for queue"""
+        state = self.queues.get(queue_name)
+        return sum(1 for task in state.workers if not task.done()) if state is not None else 0
+    
+    async def scale_workers(self, queue_name: str, worker_count: int) -> int:
+        """Grow or shrink a queue's workers without interrupting busy ones
+        
+        Only idle workers are stopped, so the pool may stay above the
+        requested size until workers finish. Returns the new worker count.
+        """
+        state = self._get_queue(queue_name)
+        state.workers = [task for task in state.workers if not task.done()]
+        state.workers, started, stopped = _resize_workers(
+            state.workers, worker_count, self._busy_workers,
+            lambda worker_id: self._worker_loop(queue_name, worker_id)
+        )
+        if started:
+            self._running = True
+            if self._reaper is None or self._reaper.done():
+                self._reaper = asyncio.create_task(self._reaper_loop())
+        if started or stopped:
+            logger.info(f"Scaled queue {queue_name} to {len(state.workers)} workers")
+        return len(state.workers)
+    
+    async def get_backlog(self, queue_name: str) -> Tuple[int, float]:
+        """Number of due messages and how long the oldest has waited, in seconds"""
+        state = self.queues.get(queue_name)
+        if state is None:
+            return 0, 0.0
+        
+        now = time.time()
+        waiting_since = [_due_timestamp(message) for message in state.ready.messages()]
+        waiting_since += [due_at for due_at, _, _ in state.delayed if due_at <= now]
+        if not waiting_since:
+            return 0, 0.0
+        return len(waiting_since), max(0.0, now - min(waiting_since))
+    
     async def _worker_loop(self, queue_name: str, worker_id: int) -> None:
         """Worker loop for processing messages"""
         logger.info(f"Worker {worker_id} started for queue {queue_name}")
+        task = asyncio.current_task()
         
         while self._running:
             try:
-                # Get next message
-                message = await self.dequeue(queue_name)
-                if not message:
-                    await asyncio.sleep(0.1)  # Short sleep if no messages
-                    continue
+                # Wait for next message
+                self._busy_workers.discard(task)
+                message = await self.wait_for_message(queue_name)
+                self._busy_workers.add(task)
                 
                 # Get handler
                 handler = self._handlers.get(queue_name)
@@ -387,6 +1079,12 @@ class MemoryQueue:
                     await self.nack_message(message.id, "No handler registered")
                     continue
                 
+                if handler.batch_size > 1:
+                    # Top the batch up with whatever else is already due
+                    messages = [message] + await self.dequeue_batch(queue_name, handler.batch_size - 1)
+                    await _process_batch(self, handler, messages)
+                    continue
+                
                 # Process message with timeout
                 try:
                     success = await asyncio.wait_for(
@@ -414,20 +1112,59 @@ class MemoryQueue:
                 logger.error(f"Worker {worker_id} error: {e}")
                 await asyncio.sleep(1)  # Prevent tight error loop
         
+        self._busy_workers.discard(task)
         logger.info(f"Worker {worker_id} stopped for queue {queue_name}")
 
 
 class RedisQueue:
-    """Redis-based queue implementation"""
+    """Redis-based queue implementation
+    
+    Priority lists hold message ids while message bodies live in a per-queue
+    hash. Claiming a message is a single Lua script that pops the highest
+    priority id and records it in the processing hash, so dequeue is one
+    round-trip and a worker crash never loses a message. Idle workers block
+    on a per-queue wake-up list that every enqueue pushes a token to.
+    
+    Scheduled messages and retries wait in a sorted set scored by due time
+    and cost nothing until the claim script promotes them in batches.
+    
+    A shared index hash maps message ids to queue names, so ack and nack go
+    straight to the owning queue without scanning the keyspace, whichever
+    client claimed or reaped the message.
+    
+    Every claim records a visibility deadline (message timeout plus
+    visibility_grace) in a sorted set; while workers run, a reaper requeues
+    messages past their deadline in batches, so messages held by a crashed
+    worker or process are retried.
+    
+    Ready message ids go to per-fairness-key lists served by deficit
+    round-robin within their priority, fair_quantum messages per key per
+    round; messages without a fairness_key share one more list.
+    """
     
     def __init__(self, redis_url: str = "redis://localhost:6379", 
-                 key_prefix: str = "optrixtrades:queue:"):
+                 key_prefix: str = "optrixtrades:queue:", block_timeout: int = 5,
+                 promote_batch_size: int = 100, visibility_grace: float = 30,
+                 reap_interval: float = 10, reap_batch_size: int = 100,
+                 fair_quantum: int = 1):
         self.redis_url = redis_url
         self.key_prefix = key_prefix
+        self.block_timeout = block_timeout
+        self.promote_batch_size = promote_batch_size
+        self.visibility_grace = visibility_grace
+        self.reap_interval = reap_interval
+        self.reap_batch_size = reap_batch_size
+        self.fair_quantum = fair_quantum
+        self._reaper: Optional[asyncio.Task] = None
         self.redis_client: Optional[redis.Redis] = None
         self.connected = False
+        self._claim_script = None
+        self._ack_script = None
+        self._nack_script = None
+        self._fair_push_script = None
         self._handlers: Dict[str, MessageHandler] = {}
         self._workers: Dict[str, List[asyncio.Task]] = {}
+        self._busy_workers: set = set()  # worker tasks currently handling messages
         self._running = False
     
     async def connect(self) -> bool:
@@ -444,6 +1181,10 @@ class RedisQueue:
             )
             
             await self.redis_client.ping()
+            self._claim_script = self.redis_client.register_script(_CLAIM_SCRIPT)
+            self._ack_script = self.redis_client.register_script(_ACK_SCRIPT)
+            self._nack_script = self.redis_client.register_script(_NACK_SCRIPT)
+            self._fair_push_script = self.redis_client.register_script(_FAIR_PUSH_SCRIPT)
             self.connected = True
             logger.info(f"Connected to Redis queue at {self.redis_url}")
             return True
@@ -461,6 +1202,9 @@ class RedisQueue:
         for tasks in self._workers.values():
             for task in tasks:
                 task.cancel()
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
         
         if self.redis_client:
             await self.redis_client.close()
@@ -474,6 +1218,55 @@ class RedisQueue:
             key += f":{suffix}"
         return key
     
+    @staticmethod
+    def _delayed_member(message: QueueMessage) -> str:
+        """Sorted set member for a delayed message"""
+        if message.fairness_key is not None:
+            return f"{message.priority.value}|{message.id}|{message.fairness_key}"
+        return f"{message.priority.value}|{message.id}"
+    
+    def _index_key(self) -> str:
+        """Key of the message id -> queue name index"""
+        return f"{self.key_prefix}message_index"
+    
+    async def _find_queue(self, message_id: str) -> Optional[str]:
+        """Find the queue a message belongs to"""
+        queue_name = await self.redis_client.hget(self._index_key(), message_id)
+        if isinstance(queue_name, bytes):
+            queue_name = queue_name.decode('utf-8')
+        return queue_name
+    
+    def _priority_keys(self, queue_name: str) -> List[str]:
+        """Plain priority list keys (entries left by older versions), highest priority first"""
+        return [
+            self._make_key(queue_name, f"priority_{priority.value}")
+            for priority in (MessagePriority.CRITICAL, MessagePriority.HIGH,
+                             MessagePriority.NORMAL, MessagePriority.LOW)
+        ]
+    
+    def _fair_ring_keys(self, queue_name: str) -> List[str]:
+        """Fair ring list keys, highest priority first"""
+        return [
+            self._make_key(queue_name, f"fair_{priority.value}")
+            for priority in (MessagePriority.CRITICAL, MessagePriority.HIGH,
+                             MessagePriority.NORMAL, MessagePriority.LOW)
+        ]
+    
+    async def _ready_list_keys(self, queue_name: str) -> List[str]:
+        """Plain priority lists plus every active fair flow list"""
+        ring_keys = self._fair_ring_keys(queue_name)
+        pipe = self.redis_client.pipeline(transaction=False)
+        for ring_key in ring_keys:
+            pipe.lrange(ring_key, 0, -1)
+        
+        list_keys = self._priority_keys(queue_name)
+        for ring_key, fairness_keys in zip(ring_keys, await pipe.execute()):
+            for fairness_key in fairness_keys:
+                if isinstance(fairness_key, bytes):
+                    fairness_key = fairness_key.decode('utf-8')
+                list_keys.append(f"{ring_key}:{fairness_key}")
+        return list_keys
+    
     async def create_queue(self, queue_name: str, max_workers: int = 1) -> None:
         """Create a new queue (Redis lists are created automatically)"""
         if not self.connected:
@@ -489,79 +1282,156 @@ class RedisQueue:
             "completed_messages": 0,
             "failed_messages": 0,
             "dead_letter_messages": 0,
-            "average_processing_time": 0.0
+            "total_processing_time": 0.0
         })
         
         logger.info(f"Created Redis queue: {queue_name}")
     
     async def enqueue(self, message: QueueMessage) -> bool:
         """Add message to queue"""
+        return (await self.enqueue_many([message]))[0]
+    
+    async def enqueue_many(self, messages: List[QueueMessage]) -> List[bool]:
+        """Add several messages in a single transaction
+        
+        Returns one flag per message; the batch is stored entirely or not at all.
+        """
+        if not messages:
+            return []
         if not self.connected or not self.redis_client:
-            return False
+            return [False] * len(messages)
         
         try:
-            # Serialize message
-            message_data = json.dumps(message.to_dict())
+            now = datetime.now()
+            counts: Dict[str, int] = {}
             
-            # Add to appropriate priority queue
-            queue_key = self._make_key(message.queue_name, f"priority_{message.priority.value}")
-            await self.redis_client.lpush(queue_key, message_data)
+            # Store the bodies, queue the ids and wake idle workers atomically
+            pipe = self.redis_client.pipeline(transaction=True)
+            for message in messages:
+                pipe.hset(self._make_key(message.queue_name, "messages"), message.id,
+                          json.dumps(message.to_dict()))
+                pipe.hset(self._index_key(), message.id, message.queue_name)
+                if message.scheduled_at and message.scheduled_at > now:
+                    pipe.zadd(self._make_key(message.queue_name, "delayed"),
+                              {self._delayed_member(message): message.scheduled_at.timestamp()})
+                else:
+                    # Unkeyed messages take turns with the keyed flows as the empty key
+                    ring_key = self._make_key(message.queue_name, f"fair_{message.priority.value}")
+                    await self._fair_push_script(keys=[ring_key], args=[message.fairness_key or "", message.id],
+                                                 client=pipe)
+                counts[message.queue_name] = counts.get(message.queue_name, 0) + 1
             
-            # Update stats
-            stats_key = self._make_key(message.queue_name, "stats")
-            await self.redis_client.hincrby(stats_key, "total_messages", 1)
-            await self.redis_client.hincrby(stats_key, "pending_messages", 1)
+            for queue_name, count in counts.items():
+                stats_key = self._make_key(queue_name, "stats")
+                wakeup_key = self._make_key(queue_name, "wakeup")
+                pipe.hincrby(stats_key, "total_messages", count)
+                pipe.hincrby(stats_key, "pending_messages", count)
+                pipe.lpush(wakeup_key, *([1] * min(count, _WAKEUP_BACKLOG)))
+                pipe.ltrim(wakeup_key, 0, _WAKEUP_BACKLOG - 1)
+            await pipe.execute()
             
-            return True
+            return [True] * len(messages)
             
         except Exception as e:
             logger.error(f"Redis enqueue error: {e}")
-            return False
+            return [False] * len(messages)
     
-    async def dequeue(self, queue_name: str) -> Optional[QueueMessage]:
-        """Get next message from queue (priority order)"""
+    async def _claim(self, queue_name: str, max_messages: int = 1) -> tuple:
+        """Atomically move up to max_messages messages into processing
+        
+        Returns the claimed messages and, when nothing was ready, the time
+        the earliest delayed message becomes due (or None).
+        """
+        claimed_at = time.time()
+        result = await self._claim_script(
+            keys=self._priority_keys(queue_name) + self._fair_ring_keys(queue_name) + [
+                self._make_key(queue_name, "messages"),
+                self._make_key(queue_name, "processing"),
+                self._make_key(queue_name, "stats"),
+                self._make_key(queue_name, "delayed"),
+                self._make_key(queue_name, "deadlines"),
+                self._make_key(queue_name, "fair_deficits"),
+                self._make_key(queue_name, "wakeup"),
+                self._index_key()
+            ],
+            args=[claimed_at, self.promote_batch_size, max_messages, self.visibility_grace,
+                  self.fair_quantum, queue_name] + [
+                priority.value for priority in (MessagePriority.CRITICAL, MessagePriority.HIGH,
+                                                MessagePriority.NORMAL, MessagePriority.LOW)
+            ]
+        )
+        if not result:
+            return [], None
+        if len(result) == 1:
+            return [], float(result[0])
+        
+        messages = []
+        next_due = None
+        for message_data in result[1::2]:
+            message = QueueMessage.from_dict(json.loads(message_data))
+            
+            if message.scheduled_at and message.scheduled_at.timestamp() > claimed_at:
+                # Scheduled entry queued by an older version: move it to the delayed set
+                await self._defer(message)
+                due_at = message.scheduled_at.timestamp()
+                next_due = due_at if next_due is None else min(next_due, due_at)
+                continue
+            
+            message.status = MessageStatus.PROCESSING
+            message.processing_started_at = datetime.fromtimestamp(claimed_at)
+            messages.append(message)
+        
+        return messages, next_due if not messages else None
+    
+    async def _defer(self, message: QueueMessage) -> None:
+        """Move a claimed message that is not yet due to the delayed set"""
+        stats_key = self._make_key(message.queue_name, "stats")
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hdel(self._make_key(message.queue_name, "processing"), message.id)
+        pipe.zadd(self._make_key(message.queue_name, "delayed"),
+                  {self._delayed_member(message): message.scheduled_at.timestamp()})
+        pipe.hincrby(stats_key, "processing_messages", -1)
+        pipe.hincrby(stats_key, "pending_messages", 1)
+        await pipe.execute()
+    
+    async def dequeue(self, queue_name: str, timeout: float = 0) -> Optional[QueueMessage]:
+        """Get next message from queue (priority order)
+        
+        With a timeout, blocks server-side for up to that many seconds
+        waiting for a message instead of returning immediately. The wait
+        is cut short when a delayed message becomes due, and resumes for
+        the rest of the timeout when another worker won the message.
+        """
+        messages = await self.dequeue_batch(queue_name, 1, timeout)
+        return messages[0] if messages else None
+    
+    async def dequeue_batch(self, queue_name: str, max_messages: int,
+                            timeout: float = 0) -> List[QueueMessage]:
+        """Claim up to max_messages messages in priority order in one round-trip
+        
+        Blocks like dequeue when nothing is ready and a timeout is given.
+        """
         if not self.connected or not self.redis_client:
-            return None
+            return []
         
         try:
-            # Check priority queues in order (highest first)
-            for priority in [MessagePriority.CRITICAL, MessagePriority.HIGH, 
-                           MessagePriority.NORMAL, MessagePriority.LOW]:
-                queue_key = self._make_key(queue_name, f"priority_{priority.value}")
-                
-                # Try to get message
-                result = await self.redis_client.brpop(queue_key, timeout=0.1)
-                if result:
-                    _, message_data = result
-                    message_dict = json.loads(message_data.decode('utf-8'))
-                    message = QueueMessage.from_dict(message_dict)
-                    
-                    # Check if scheduled
-                    if message.scheduled_at and datetime.now() < message.scheduled_at:
-                        # Put back and continue
-                        await self.redis_client.lpush(queue_key, message_data)
-                        continue
-                    
-                    # Mark as processing
-                    message.status = MessageStatus.PROCESSING
-                    message.processing_started_at = datetime.now()
-                    
-                    # Store in processing set
-                    processing_key = self._make_key(queue_name, "processing")
-                    await self.redis_client.hset(processing_key, message.id, json.dumps(message.to_dict()))
-                    
-                    # Update stats
-                    stats_key = self._make_key(queue_name, "stats")
-                    await self.redis_client.hincrby(stats_key, "pending_messages", -1)
-                    await self.redis_client.hincrby(stats_key, "processing_messages", 1)
-                    
-                    return message
+            deadline = time.monotonic() + timeout
+            messages, next_due = await self._claim(queue_name, max_messages)
+            while not messages and timeout:
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    break
+                if next_due is not None:
+                    wait = min(wait, max(next_due - time.time(), 0.01))
+                # A single blocking pop on the wake-up list replaces polling
+                await self.redis_client.brpop([self._make_key(queue_name, "wakeup")], timeout=wait)
+                messages, next_due = await self._claim(queue_name, max_messages)
             
-            return None
+            return messages
             
         except Exception as e:
             logger.error(f"Redis dequeue error: {e}")
-            return None
+            return []
     
     async def ack_message(self, message_id: str) -> bool:
         """Acknowledge successful message processing"""
@@ -569,32 +1439,20 @@ class RedisQueue:
             return False
         
         try:
-            # Find message in processing
-            for queue_name in await self._get_queue_names():
-                processing_key = self._make_key(queue_name, "processing")
-                message_data = await self.redis_client.hget(processing_key, message_id)
-                
-                if message_data:
-                    message_dict = json.loads(message_data.decode('utf-8'))
-                    message = QueueMessage.from_dict(message_dict)
-                    
-                    # Remove from processing
-                    await self.redis_client.hdel(processing_key, message_id)
-                    
-                    # Update stats
-                    stats_key = self._make_key(queue_name, "stats")
-                    await self.redis_client.hincrby(stats_key, "processing_messages", -1)
-                    await self.redis_client.hincrby(stats_key, "completed_messages", 1)
-                    
-                    # Update processing time
-                    if message.processing_started_at:
-                        processing_time = (datetime.now() - message.processing_started_at).total_seconds()
-                        # Simple moving average (could be improved)
-                        await self.redis_client.hincrbyfloat(stats_key, "average_processing_time", processing_time)
-                    
-                    return True
+            queue_name = await self._find_queue(message_id)
+            if queue_name is None:
+                return False
             
-            return False
+            return bool(await self._ack_script(
+                keys=[
+                    self._make_key(queue_name, "processing"),
+                    self._make_key(queue_name, "messages"),
+                    self._make_key(queue_name, "stats"),
+                    self._index_key(),
+                    self._make_key(queue_name, "deadlines")
+                ],
+                args=[message_id, time.time()]
+            ))
             
         except Exception as e:
             logger.error(f"Redis ack error: {e}")
@@ -606,56 +1464,103 @@ class RedisQueue:
             return False
         
         try:
-            # Find message in processing
-            for queue_name in await self._get_queue_names():
-                processing_key = self._make_key(queue_name, "processing")
-                message_data = await self.redis_client.hget(processing_key, message_id)
-                
-                if message_data:
-                    message_dict = json.loads(message_data.decode('utf-8'))
-                    message = QueueMessage.from_dict(message_dict)
-                    message.attempts += 1
-                    message.error_message = error_message
-                    
-                    # Remove from processing
-                    await self.redis_client.hdel(processing_key, message_id)
-                    
-                    if message.attempts < message.max_attempts:
-                        # Retry with delay
-                        delay_seconds = min(60 * (2 ** (message.attempts - 1)), 3600)
-                        message.scheduled_at = datetime.now() + timedelta(seconds=delay_seconds)
-                        message.status = MessageStatus.RETRYING
-                        
-                        # Re-queue
-                        queue_key = self._make_key(queue_name, f"priority_{message.priority.value}")
-                        await self.redis_client.lpush(queue_key, json.dumps(message.to_dict()))
-                        
-                        # Update stats
-                        stats_key = self._make_key(queue_name, "stats")
-                        await self.redis_client.hincrby(stats_key, "pending_messages", 1)
-                    else:
-                        # Send to dead letter
-                        message.status = MessageStatus.DEAD_LETTER
-                        dead_letter_key = self._make_key(queue_name, "dead_letter")
-                        await self.redis_client.lpush(dead_letter_key, json.dumps(message.to_dict()))
-                        
-                        # Update stats
-                        stats_key = self._make_key(queue_name, "stats")
-                        await self.redis_client.hincrby(stats_key, "dead_letter_messages", 1)
-                    
-                    # Update stats
-                    stats_key = self._make_key(queue_name, "stats")
-                    await self.redis_client.hincrby(stats_key, "processing_messages", -1)
-                    await self.redis_client.hincrby(stats_key, "failed_messages", 1)
-                    
-                    return True
+            queue_name = await self._find_queue(message_id)
+            if queue_name is None:
+                return False
             
-            return False
+            message_data = await self.redis_client.hget(self._make_key(queue_name, "messages"), message_id)
+            if not message_data:
+                return False
+            
+            # The script only applies if the message is still being processed
+            keys, args = self._nack_arguments(queue_name, message_id, message_data, error_message)
+            return bool(await self._nack_script(keys=keys, args=args))
             
         except Exception as e:
             logger.error(f"Redis nack error: {e}")
             return False
     
+    def _nack_arguments(self, queue_name: str, message_id: str, message_data: bytes,
+                        error_message: str) -> tuple:
+        """Build the nack script keys and arguments for a failed message"""
+        message = QueueMessage.from_dict(json.loads(message_data))
+        message.attempts += 1
+        message.error_message = error_message
+        
+        retry = message.attempts < message.max_attempts
+        if retry:
+            # Retry with delay
+            delay_seconds = min(60 * (2 ** (message.attempts - 1)), 3600)
+            message.scheduled_at = datetime.now() + timedelta(seconds=delay_seconds)
+            message.status = MessageStatus.RETRYING
+            target_key = self._make_key(queue_name, "delayed")
+            due_args = [message.scheduled_at.timestamp(), self._delayed_member(message)]
+        else:
+            # Send to dead letter
+            message.status = MessageStatus.DEAD_LETTER
+            target_key = self._make_key(queue_name, "dead_letter")
+            due_args = [0, ""]
+        
+        keys = [
+            self._make_key(queue_name, "processing"),
+            self._make_key(queue_name, "messages"),
+            self._make_key(queue_name, "stats"),
+            target_key,
+            self._index_key(),
+            self._make_key(queue_name, "deadlines")
+        ]
+        args = [message_id, json.dumps(message.to_dict()), 1 if retry else 0] + due_args
+        return keys, args
+    
+    async def reap_expired(self, queue_name: str) -> int:
+        """Requeue a batch of in-flight messages whose visibility deadline has passed
+        
+        Returns the number of messages reaped.
+        """
+        if not self.connected or not self.redis_client:
+            return 0
+        
+        deadlines_key = self._make_key(queue_name, "deadlines")
+        expired = await self.redis_client.zrangebyscore(
+            deadlines_key, "-inf", time.time(), start=0, num=self.reap_batch_size
+        )
+        if not expired:
+            return 0
+        
+        bodies = await self.redis_client.hmget(self._make_key(queue_name, "messages"), expired)
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        for message_id, message_data in zip(expired, bodies):
+            if isinstance(message_id, bytes):
+                message_id = message_id.decode('utf-8')
+            if message_data:
+                keys, args = self._nack_arguments(queue_name, message_id, message_data,
+                                                  "Visibility timeout expired")
+                await self._nack_script(keys=keys, args=args, client=pipe)
+            else:
+                # Body already gone: just drop the stale deadline
+                pipe.zrem(deadlines_key, message_id)
+        results = await pipe.execute()
+        
+        reaped = sum(1 for message_data, result in zip(bodies, results) if message_data and result)
+        if reaped:
+            logger.warning(f"Requeued {reaped} expired messages in Redis queue {queue_name}")
+        return reaped
+    
+    async def _reaper_loop(self) -> None:
+        """Periodically reap expired in-flight messages of queues with workers here"""
+        while self._running:
+            try:
+                await asyncio.sleep(self.reap_interval)
+                for queue_name in list(self._workers):
+                    # Keep going while full batches come back
+                    while await self.reap_expired(queue_name) >= self.reap_batch_size:
+                        pass
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Redis queue reaper error: {e}")
+    
     async def _get_queue_names(self) -> List[str]:
         """Get list of queue names"""
         if not self.connected or not self.redis_client:
@@ -663,14 +1568,13 @@ class RedisQueue:
         
         try:
             pattern = f"{self.key_prefix}*:stats"
-            keys = await self.redis_client.keys(pattern)
             queue_names = []
             
-            for key in keys:
+            async for key in self.redis_client.scan_iter(match=pattern, count=500):
                 if isinstance(key, bytes):
                     key = key.decode('utf-8')
                 # Extract queue name
-                queue_name = key.replace(self.key_prefix, '').replace(':stats', '')
+                queue_name = key[len(self.key_prefix):-len(':stats')]
                 queue_names.append(queue_name)
             
             return queue_names
@@ -700,24 +1604,122 @@ class RedisQueue:
         
         self._workers[queue_name] = workers
         self._running = True
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reaper_loop())
         logger.info(f"Started {worker_count} Redis workers for queue {queue_name}")
     
+    def get_worker_count(self, queue_name: str) -> int:
+        """Number of live workers for queue"""
+        return sum(1 for task in self._workers.get(queue_name, []) if not task.done())
+    
+    async def scale_workers(self, queue_name: str, worker_count: int) -> int:
+        """Grow or shrink a queue's workers without interrupting busy ones
+        
+        Returns the new worker count.
+        """
+        workers = [task for task in self._workers.get(queue_name, []) if not task.done()]
+        workers, started, stopped = _resize_workers(
+            workers, worker_count, self._busy_workers,
+            lambda worker_id: self._worker_loop(queue_name, worker_id)
+        )
+        self._workers[queue_name] = workers
+        if started:
+            self._running = True
+            if self._reaper is None or self._reaper.done():
+                self._reaper = asyncio.create_task(self._reaper_loop())
+        if started or stopped:
+            logger.info(f"Scaled Redis queue {queue_name} to {len(workers)} workers")
+        return len(workers)
+    
+    async def get_queue_size(self, queue_name: str) -> int:
+        """Get number of waiting messages, including delayed ones"""
+        if not self.connected or not self.redis_client:
+            return 0
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        for queue_key in await self._ready_list_keys(queue_name):
+            pipe.llen(queue_key)
+        pipe.zcard(self._make_key(queue_name, "delayed"))
+        return sum(await pipe.execute())
+    
+    async def get_backlog(self, queue_name: str) -> Tuple[int, float]:
+        """Number of due messages and how long the oldest has waited, in seconds"""
+        if not self.connected or not self.redis_client:
+            return 0, 0.0
+        
+        now = time.time()
+        delayed_key = self._make_key(queue_name, "delayed")
+        queue_keys = await self._ready_list_keys(queue_name)
+        
+        # Lists pop from the right, so the oldest id of each list is at index -1
+        pipe = self.redis_client.pipeline(transaction=False)
+        for queue_key in queue_keys:
+            pipe.llen(queue_key)
+        for queue_key in queue_keys:
+            pipe.lindex(queue_key, -1)
+        pipe.zcount(delayed_key, "-inf", now)
+        pipe.zrange(delayed_key, 0, 0, withscores=True)
+        results = await pipe.execute()
+        
+        lengths = results[:len(queue_keys)]
+        oldest_ids = [message_id for message_id in results[len(queue_keys):2 * len(queue_keys)] if message_id]
+        due_delayed, first_delayed = results[-2], results[-1]
+        
+        waiting_since = []
+        if oldest_ids:
+            bodies = await self.redis_client.hmget(self._make_key(queue_name, "messages"), oldest_ids)
+            for message_data in bodies:
+                if message_data:
+                    waiting_since.append(_due_timestamp(QueueMessage.from_dict(json.loads(message_data))))
+        if due_delayed and first_delayed:
+            waiting_since.append(first_delayed[0][1])
+        
+        depth = sum(lengths) + due_delayed
+        return depth, max(0.0, now - min(waiting_since)) if waiting_since else 0.0
+    
+    async def get_stats(self, queue_name: str) -> QueueStats:
+        """Get queue statistics"""
+        stats = QueueStats()
+        if not self.connected or not self.redis_client:
+            return stats
+        
+        values = {
+            (key.decode('utf-8') if isinstance(key, bytes) else key): value
+            for key, value in (await self.redis_client.hgetall(self._make_key(queue_name, "stats"))).items()
+        }
+        for name in ("total_messages", "pending_messages", "processing_messages",
+                     "completed_messages", "failed_messages", "dead_letter_messages"):
+            setattr(stats, name, int(values.get(name, 0)))
+        if stats.completed_messages:
+            stats.average_processing_time = float(values.get("total_processing_time", 0)) / stats.completed_messages
+        return stats
+    
     async def _worker_loop(self, queue_name: str, worker_id: int) -> None:
         """Worker loop for processing messages"""
         logger.info(f"Redis worker {worker_id} started for queue {queue_name}")
+        task = asyncio.current_task()
         
         while self._running:
             try:
-                message = await self.dequeue(queue_name)
-                if not message:
-                    await asyncio.sleep(0.1)
+                handler = self._handlers.get(queue_name)
+                batch_size = handler.batch_size if handler else 1
+                self._busy_workers.discard(task)
+                messages = await self.dequeue_batch(queue_name, batch_size, timeout=self.block_timeout)
+                if not messages:
                     continue
+                self._busy_workers.add(task)
                 
-                handler = self._handlers.get(queue_name)
                 if not handler:
-                    await self.nack_message(message.id, "No handler registered")
+                    for message in messages:
+                        await self.nack_message(message.id, "No handler registered")
                     continue
                 
+                if batch_size > 1:
+                    await _process_batch(self, handler, messages)
+                    continue
+                
+                message = messages[0]
+                
                 try:
                     success = await asyncio.wait_for(
                         handler.handle(message),
@@ -742,19 +1744,661 @@ class RedisQueue:
                 logger.error(f"Redis worker {worker_id} error: {e}")
                 await asyncio.sleep(1)
         
+        self._busy_workers.discard(task)
         logger.info(f"Redis worker {worker_id} stopped for queue {queue_name}")
 
 
+class SQLiteQueue:
+    """SQLite-backed durable queue implementation
+    
+    Messages live in a WAL-mode table indexed on (queue, priority, due_at),
+    so pending messages and dead letters survive restarts without an extra
+    service. Claiming leases a message by moving its due_at past the
+    visibility timeout (or the message timeout) plus visibility_grace; if
+    the worker dies before acking, the message becomes claimable again when
+    the lease runs out and the expired lease counts as a failed attempt.
+    
+    Each lease is fenced by its claimed_at value, which this client keeps
+    per claimed message until ack or nack, so a late ack or nack from a
+    worker whose lease was taken over cannot touch the new claim.
+    """
+    
+    def __init__(self, db_path: str = "message_queue.db", visibility_timeout: int = 300,
+                 block_timeout: int = 5, visibility_grace: float = 30):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.visibility_grace = visibility_grace
+        self.block_timeout = block_timeout
+        self._leases: Dict[str, Tuple[float, float]] = {}  # message id -> (claimed_at, lease expiry) for claims made here
+        self._prune_at = 0.0
+        self.db = None
+        self.connected = False
+        self._lock = asyncio.Lock()
+        self._conditions: Dict[str, asyncio.Condition] = {}
+        self._handlers: Dict[str, MessageHandler] = {}
+        self._workers: Dict[str, List[asyncio.Task]] = {}
+        self._busy_workers: set = set()  # worker tasks currently handling messages
+        self._running = False
+    
+    async def connect(self) -> bool:
+        """Open the database and create the queue tables"""
+        if not SQLITE_AVAILABLE:
+            logger.warning("aiosqlite not available")
+            return False
+        
+        try:
+            # Transactions are managed explicitly with BEGIN IMMEDIATE
+            self.db = await aiosqlite.connect(self.db_path, isolation_level=None)
+            await self.db.execute("PRAGMA journal_mode=WAL")
+            await self.db.execute("PRAGMA synchronous=NORMAL")
+            await self.db.execute("PRAGMA busy_timeout=5000")
+            
+            await self.db.execute('''
+                CREATE TABLE IF NOT EXISTS queue_messages (
+                    id TEXT PRIMARY KEY,
+                    queue TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    due_at REAL NOT NULL,
+                    claimed_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    timeout_seconds INTEGER NOT NULL,
+                    body TEXT NOT NULL
+                )
+            ''')
+            await self.db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_queue_messages_claim
+                ON queue_messages (queue, priority, due_at)
+            ''')
+            await self.db.execute('''
+                CREATE TABLE IF NOT EXISTS queue_dead_letters (
+                    id TEXT PRIMARY KEY,
+                    queue TEXT NOT NULL,
+                    failed_at REAL NOT NULL,
+                    body TEXT NOT NULL
+                )
+            ''')
+            await self.db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_queue_dead_letters_queue
+                ON queue_dead_letters (queue, failed_at)
+            ''')
+            await self.db.execute('''
+                CREATE TABLE IF NOT EXISTS queue_stats (
+                    queue TEXT PRIMARY KEY,
+                    total_messages INTEGER NOT NULL DEFAULT 0,
+                    completed_messages INTEGER NOT NULL DEFAULT 0,
+                    failed_messages INTEGER NOT NULL DEFAULT 0,
+                    dead_letter_messages INTEGER NOT NULL DEFAULT 0,
+                    total_processing_time REAL NOT NULL DEFAULT 0
+                )
+            ''')
+            
+            self.connected = True
+            logger.info(f"SQLite queue ready: {self.db_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to open SQLite queue: {e}")
+            self.connected = False
+            return False
+    
+    async def disconnect(self) -> None:
+        """Close the database"""
+        self._running = False
+        
+        # Stop all workers before the connection goes away
+        tasks = [task for worker_tasks in self._workers.values() for task in worker_tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+        
+        if self.db:
+            await self.db.close()
+            self.db = None
+            self.connected = False
+            logger.info("Closed SQLite queue")
+    
+    @asynccontextmanager
+    async def _transaction(self):
+        """Run statements in one write transaction on the shared connection"""
+        async with self._lock:
+            await self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                await self.db.rollback()
+                raise
+            else:
+                await self.db.commit()
+    
+    @staticmethod
+    async def _add_stats(db, queue_name: str, **deltas) -> None:
+        """Add to a queue's stored counters"""
+        await db.execute(
+            "INSERT INTO queue_stats (queue) VALUES (?) ON CONFLICT(queue) DO NOTHING",
+            (queue_name,)
+        )
+        columns = ", ".join(f"{name} = {name} + ?" for name in deltas)
+        await db.execute(
+            f"UPDATE queue_stats SET {columns} WHERE queue = ?",
+            (*deltas.values(), queue_name)
+        )
+    
+    def _condition(self, queue_name: str) -> asyncio.Condition:
+        """Condition notified when messages are added to a queue"""
+        condition = self._conditions.get(queue_name)
+        if condition is None:
+            condition = self._conditions.setdefault(queue_name, asyncio.Condition())
+        return condition
+    
+    async def _notify(self, queue_name: str, count: int) -> None:
+        """Wake up to count workers waiting on a queue in this process"""
+        condition = self._condition(queue_name)
+        async with condition:
+            condition.notify(count)
+    
+    async def create_queue(self, queue_name: str, max_workers: int = 1) -> None:
+        """Create a new queue (rows are created on first use)"""
+        if not self.connected:
+            return
+        
+        async with self._transaction() as db:
+            await db.execute(
+                "INSERT INTO queue_stats (queue) VALUES (?) ON CONFLICT(queue) DO NOTHING",
+                (queue_name,)
+            )
+        
+        logger.info(f"Created SQLite queue: {queue_name}")
+    
+    async def delete_queue(self, queue_name: str) -> None:
+        """Delete a queue and all of its messages"""
+        await self.stop_workers(queue_name)
+        if not self.connected:
+            return
+        
+        async with self._transaction() as db:
+            await db.execute("DELETE FROM queue_messages WHERE queue = ?", (queue_name,))
+            await db.execute("DELETE FROM queue_dead_letters WHERE queue = ?", (queue_name,))
+            await db.execute("DELETE FROM queue_stats WHERE queue = ?", (queue_name,))
+        self._handlers.pop(queue_name, None)
+        
+        logger.info(f"Deleted SQLite queue: {queue_name}")
+    
+    async def enqueue(self, message: QueueMessage) -> bool:
+        """Add message to queue"""
+        return (await self.enqueue_many([message]))[0]
+    
+    async def enqueue_many(self, messages: List[QueueMessage]) -> List[bool]:
+        """Add several messages in a single transaction"""
+        if not messages:
+            return []
+        if not self.connected:
+            return [False] * len(messages)
+        
+        try:
+            now = time.time()
+            counts: Dict[str, int] = {}
+            rows = []
+            for message in messages:
+                due_at = message.scheduled_at.timestamp() if message.scheduled_at else now
+                rows.append((
+                    message.id, message.queue_name, message.priority.value, due_at,
+                    message.attempts, message.max_attempts, message.timeout_seconds,
+                    json.dumps(message.to_dict())
+                ))
+                counts[message.queue_name] = counts.get(message.queue_name, 0) + 1
+            
+            async with self._transaction() as db:
+                await db.executemany('''
+                    INSERT INTO queue_messages
+                        (id, queue, priority, due_at, attempts, max_attempts, timeout_seconds, body)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                for queue_name, count in counts.items():
+                    await self._add_stats(db, queue_name, total_messages=count)
+            
+            for queue_name, count in counts.items():
+                await self._notify(queue_name, count)
+            
+            return [True] * len(messages)
+            
+        except Exception as e:
+            logger.error(f"SQLite enqueue error: {e}")
+            return [False] * len(messages)
+    
+    def _prune_leases(self, now: float) -> None:
+        """Forget expired leases whose message was never acked or nacked here"""
+        if now < self._prune_at:
+            return
+        self._prune_at = now + self.visibility_grace
+        for message_id, (_, expires_at) in list(self._leases.items()):
+            if expires_at <= now:
+                del self._leases[message_id]
+    
+    async def _claim(self, queue_name: str, max_messages: int) -> List[QueueMessage]:
+        """Lease up to max_messages due messages in priority order"""
+        now = time.time()
+        self._prune_leases(now)
+        messages = []
+        
+        async with self._transaction() as db:
+            async with db.execute('''
+                SELECT id, claimed_at, attempts, max_attempts, body FROM queue_messages
+                WHERE queue = ? AND due_at <= ?
+                ORDER BY priority DESC, due_at
+                LIMIT ?
+            ''', (queue_name, now, max_messages)) as cursor:
+                rows = await cursor.fetchall()
+            
+            leases = []
+            for message_id, claimed_at, attempts, max_attempts, body in rows:
+                message = QueueMessage.from_dict(json.loads(body))
+                
+                if claimed_at is not None:
+                    # The previous lease expired without an ack
+                    attempts += 1
+                    message.attempts = attempts
+                    message.error_message = "Visibility timeout expired"
+                    if attempts >= max_attempts:
+                        message.status = MessageStatus.DEAD_LETTER
+                        await self._bury(db, message)
+                        await self._add_stats(db, queue_name, failed_messages=1, dead_letter_messages=1)
+                        continue
+                    await self._add_stats(db, queue_name, failed_messages=1)
+                
+                message.attempts = attempts
+                message.status = MessageStatus.PROCESSING
+                message.processing_started_at = datetime.fromtimestamp(now)
+                expires_at = now + max(self.visibility_timeout, message.timeout_seconds) + self.visibility_grace
+                leases.append((now, attempts, expires_at, message_id))
+                messages.append(message)
+            
+            await db.executemany('''
+                UPDATE queue_messages
+                SET claimed_at = ?, attempts = ?, due_at = ?
+                WHERE id = ?
+            ''', leases)
+        
+        # Recorded once the transaction has committed
+        for claimed_at, _, expires_at, message_id in leases:
+            self._leases[message_id] = (claimed_at, expires_at)
+        return messages
+    
+    async def _bury(self, db, message: QueueMessage) -> None:
+        """Move a message to the dead letter table"""
+        await db.execute("DELETE FROM queue_messages WHERE id = ?", (message.id,))
+        await db.execute(
+            "INSERT OR REPLACE INTO queue_dead_letters (id, queue, failed_at, body) VALUES (?, ?, ?, ?)",
+            (message.id, message.queue_name, time.time(), json.dumps(message.to_dict()))
+        )
+    
+    async def _next_due(self, queue_name: str) -> Optional[float]:
+        """Time the earliest message in a queue becomes claimable"""
+        async with self.db.execute(
+            "SELECT MIN(due_at) FROM queue_messages WHERE queue = ?", (queue_name,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else None
+    
+    async def dequeue(self, queue_name: str, timeout: float = 0) -> Optional[QueueMessage]:
+        """Get next message from queue (priority order)"""
+        messages = await self.dequeue_batch(queue_name, 1, timeout)
+        return messages[0] if messages else None
+    
+    async def dequeue_batch(self, queue_name: str, max_messages: int,
+                            timeout: float = 0) -> List[QueueMessage]:
+        """Lease up to max_messages messages in one transaction
+        
+        With a timeout, waits for an enqueue in this process or for the
+        earliest delayed message (or expired lease) to become due, for up
+        to the whole timeout if another worker takes the message first.
+        """
+        if not self.connected:
+            return []
+        
+        try:
+            deadline = time.monotonic() + timeout
+            messages = await self._claim(queue_name, max_messages)
+            while not messages and timeout:
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    break
+                next_due = await self._next_due(queue_name)
+                if next_due is not None:
+                    wait = min(wait, max(next_due - time.time(), 0.01))
+                
+                condition = self._condition(queue_name)
+                try:
+                    async with condition:
+                        await asyncio.wait_for(condition.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                messages = await self._claim(queue_name, max_messages)
+            
+            return messages
+            
+        except Exception as e:
+            logger.error(f"SQLite dequeue error: {e}")
+            return []
+    
+    async def ack_message(self, message_id: str) -> bool:
+        """Acknowledge successful message processing"""
+        if not self.connected:
+            return False
+        
+        lease = self._leases.pop(message_id, None)
+        if lease is None:
+            return False
+        
+        try:
+            async with self._transaction() as db:
+                async with db.execute(
+                    "SELECT queue, claimed_at FROM queue_messages WHERE id = ? AND claimed_at = ?",
+                    (message_id, lease[0])
+                ) as cursor:
+                    row = await cursor.fetchone()
+                if not row:
+                    return False
+                
+                queue_name, claimed_at = row
+                await db.execute("DELETE FROM queue_messages WHERE id = ?", (message_id,))
+                await self._add_stats(db, queue_name, completed_messages=1,
+                                      total_processing_time=time.time() - claimed_at)
+                return True
+            
+        except Exception as e:
+            logger.error(f"SQLite ack error: {e}")
+            return False
+    
+    async def nack_message(self, message_id: str, error_message: str = "") -> bool:
+        """Negative acknowledge - message processing failed"""
+        if not self.connected:
+            return False
+        
+        lease = self._leases.pop(message_id, None)
+        if lease is None:
+            return False
+        
+        try:
+            async with self._transaction() as db:
+                async with db.execute(
+                    "SELECT attempts, body FROM queue_messages WHERE id = ? AND claimed_at = ?",
+                    (message_id, lease[0])
+                ) as cursor:
+                    row = await cursor.fetchone()
+                if not row:
+                    return False
+                
+                attempts, body = row
+                message = QueueMessage.from_dict(json.loads(body))
+                message.attempts = attempts + 1
+                message.error_message = error_message
+                
+                if message.attempts < message.max_attempts:
+                    # Retry with delay
+                    delay_seconds = min(60 * (2 ** (message.attempts - 1)), 3600)
+                    message.scheduled_at = datetime.now() + timedelta(seconds=delay_seconds)
+                    message.status = MessageStatus.RETRYING
+                    await db.execute('''
+                        UPDATE queue_messages
+                        SET claimed_at = NULL, attempts = ?, due_at = ?, body = ?
+                        WHERE id = ?
+                    ''', (message.attempts, message.scheduled_at.timestamp(),
+                          json.dumps(message.to_dict()), message_id))
+                    await self._add_stats(db, message.queue_name, failed_messages=1)
+                else:
+                    # Send to dead letter
+                    message.status = MessageStatus.DEAD_LETTER
+                    await self._bury(db, message)
+                    await self._add_stats(db, message.queue_name, failed_messages=1, dead_letter_messages=1)
+                
+                return True
+            
+        except Exception as e:
+            logger.error(f"SQLite nack error: {e}")
+            return False
+    
+    async def get_queue_size(self, queue_name: str) -> int:
+        """Get number of messages waiting in a queue"""
+        if not self.connected:
+            return 0
+        
+        async with self.db.execute(
+            "SELECT COUNT(*) FROM queue_messages WHERE queue = ? AND claimed_at IS NULL",
+            (queue_name,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return row[0]
+    
+    async def _get_queue_names(self) -> List[str]:
+        """Get list of queue names"""
+        if not self.connected:
+            return []
+        
+        async with self.db.execute("SELECT queue FROM queue_stats") as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+    
+    async def get_stats(self, queue_name: str) -> QueueStats:
+        """Get queue statistics"""
+        stats = QueueStats()
+        if not self.connected:
+            return stats
+        
+        async with self.db.execute('''
+            SELECT COALESCE(SUM(claimed_at IS NULL), 0), COALESCE(SUM(claimed_at IS NOT NULL), 0)
+            FROM queue_messages WHERE queue = ?
+        ''', (queue_name,)) as cursor:
+            stats.pending_messages, stats.processing_messages = await cursor.fetchone()
+        
+        async with self.db.execute('''
+            SELECT total_messages, completed_messages, failed_messages,
+                   dead_letter_messages, total_processing_time
+            FROM queue_stats WHERE queue = ?
+        ''', (queue_name,)) as cursor:
+            row = await cursor.fetchone()
+        
+        if row:
+            (stats.total_messages, stats.completed_messages, stats.failed_messages,
+             stats.dead_letter_messages, total_processing_time) = row
+            if stats.completed_messages:
+                stats.average_processing_time = total_processing_time / stats.completed_messages
+        
+        return stats
+    
+    async def purge_queue(self, queue_name: str) -> int:
+        """Remove all waiting messages from queue"""
+        if not self.connected:
+            return 0
+        
+        async with self._transaction() as db:
+            cursor = await db.execute(
+                "DELETE FROM queue_messages WHERE queue = ? AND claimed_at IS NULL", (queue_name,)
+            )
+            return cursor.rowcount
+    
+    async def get_dead_letter_messages(self, queue_name: str) -> List[QueueMessage]:
+        """Get dead letter messages"""
+        if not self.connected:
+            return []
+        
+        async with self.db.execute(
+            "SELECT body FROM queue_dead_letters WHERE queue = ? ORDER BY failed_at", (queue_name,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [QueueMessage.from_dict(json.loads(body)) for body, in rows]
+    
+    async def requeue_dead_letter(self, queue_name: str, message_id: str) -> bool:
+        """Requeue a dead letter message"""
+        if not self.connected:
+            return False
+        
+        async with self._transaction() as db:
+            async with db.execute(
+                "SELECT body FROM queue_dead_letters WHERE queue = ? AND id = ?", (queue_name, message_id)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if not row:
+                return False
+            
+            # Reset message
+            message = QueueMessage.from_dict(json.loads(row[0]))
+            message.status = MessageStatus.PENDING
+            message.attempts = 0
+            message.error_message = None
+            message.scheduled_at = None
+            
+            await db.execute("DELETE FROM queue_dead_letters WHERE id = ?", (message_id,))
+            await db.execute('''
+                INSERT INTO queue_messages
+                    (id, queue, priority, due_at, attempts, max_attempts, timeout_seconds, body)
+                VALUES (?, ?, ?, ?, 0, ?, ?, ?)
+            ''', (message.id, queue_name, message.priority.value, time.time(),
+                  message.max_attempts, message.timeout_seconds, json.dumps(message.to_dict())))
+            await self._add_stats(db, queue_name, dead_letter_messages=-1)
+        
+        await self._notify(queue_name, 1)
+        return True
+    
+    def register_handler(self, queue_name: str, handler: MessageHandler) -> None:
+        """Register message handler for queue"""
+        self._handlers[queue_name] = handler
+    
+    async def start_workers(self, queue_name: str, worker_count: int = 1) -> None:
+        """Start worker tasks for queue"""
+        # Stop existing workers
+        for task in self._workers.get(queue_name, []):
+            task.cancel()
+        
+        # Start new workers
+        self._workers[queue_name] = [
+            asyncio.create_task(self._worker_loop(queue_name, i))
+            for i in range(worker_count)
+        ]
+        self._running = True
+        logger.info(f"Started {worker_count} SQLite workers for queue {queue_name}")
+    
+    async def stop_workers(self, queue_name: str) -> None:
+        """Stop worker tasks for queue"""
+        for task in self._workers.pop(queue_name, []):
+            task.cancel()
+        logger.info(f"Stopped SQLite workers for queue {queue_name}")
+    
+    def get_worker_count(self, queue_name: str) -> int:
+        """Number of live workers for queue"""
+        return sum(1 for task in self._workers.get(queue_name, []) if not task.done())
+    
+    async def scale_workers(self, queue_name: str, worker_count: int) -> int:
+        """Grow or shrink a queue's workers without interrupting busy ones
+        
+        Returns the new worker count.
+        """
+        workers = [task for task in self._workers.get(queue_name, []) if not task.done()]
+        workers, started, stopped = _resize_workers(
+            workers, worker_count, self._busy_workers,
+            lambda worker_id: self._worker_loop(queue_name, worker_id)
+        )
+        self._workers[queue_name] = workers
+        if started:
+            self._running = True
+        if started or stopped:
+            logger.info(f"Scaled SQLite queue {queue_name} to {len(workers)} workers")
+        return len(workers)
+    
+    async def get_backlog(self, queue_name: str) -> Tuple[int, float]:
+        """Number of claimable messages and how long the oldest has waited, in seconds"""
+        if not self.connected:
+            return 0, 0.0
+        
+        now = time.time()
+        async with self.db.execute(
+            "SELECT COUNT(*), MIN(due_at) FROM queue_messages WHERE queue = ? AND due_at <= ?",
+            (queue_name, now)
+        ) as cursor:
+            depth, oldest_due = await cursor.fetchone()
+        return depth, max(0.0, now - oldest_due) if oldest_due is not None else 0.0
+    
+    async def _worker_loop(self, queue_name: str, worker_id: int) -> None:
+        """Worker loop for processing messages"""
+        logger.info(f"SQLite worker {worker_id} started for queue {queue_name}")
+        task = asyncio.current_task()
+        
+        while self._running:
+            try:
+                handler = self._handlers.get(queue_name)
+                batch_size = handler.batch_size if handler else 1
+                self._busy_workers.discard(task)
+                messages = await self.dequeue_batch(queue_name, batch_size, timeout=self.block_timeout)
+                if not messages:
+                    continue
+                self._busy_workers.add(task)
+                
+                if not handler:
+                    for message in messages:
+                        await self.nack_message(message.id, "No handler registered")
+                    continue
+                
+                if batch_size > 1:
+                    await _process_batch(self, handler, messages)
+                    continue
+                
+                message = messages[0]
+                
+                try:
+                    success = await asyncio.wait_for(
+                        handler.handle(message),
+                        timeout=message.timeout_seconds
+                    )
+                    
+                    if success:
+                        await self.ack_message(message.id)
+                    else:
+                        await self.nack_message(message.id, "Handler returned False")
+                        
+                except asyncio.TimeoutError:
+                    await self.nack_message(message.id, "Processing timeout")
+                    
+                except Exception as e:
+                    await self.nack_message(message.id, str(e))
+                    await handler.on_error(message, e)
+                    
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"SQLite worker {worker_id} error: {e}")
+                await asyncio.sleep(1)
+        
+        self._busy_workers.discard(task)
+        logger.info(f"SQLite worker {worker_id} stopped for queue {queue_name}")
+
+
+@dataclass
+class AutoscalePolicy:
+    """Bounds and target for backlog-driven worker autoscaling"""
+    min_workers: int = 1
+    max_workers: int = 10
+    target_wait_seconds: float = 5.0  # how long a message should wait for a worker
+
+
 class MessageQueue:
     """Main message queue manager"""
     
     def __init__(self, backend: QueueBackend = QueueBackend.MEMORY, 
-                 redis_url: Optional[str] = None):
+                 redis_url: Optional[str] = None, sqlite_path: Optional[str] = None):
         self.backend = backend
         self.redis_url = redis_url or getattr(BotConfig, 'REDIS_URL', 'redis://localhost:6379')
+        self.sqlite_path = sqlite_path or "message_queue.db"
+        self.autoscale_interval = 5.0
+        self._autoscale_policies: Dict[str, AutoscalePolicy] = {}
+        self._autoscaler: Optional[asyncio.Task] = None
+        self._fairness_fields: Dict[str, str] = {}
+        self._cpu_lanes: Dict[str, CPULane] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None  # loop the backend was initialized on
         
         if backend == QueueBackend.REDIS:
             self.queue = RedisQueue(self.redis_url)
+        elif backend == QueueBackend.SQLITE:
+            self.queue = SQLiteQueue(self.sqlite_path)
         elif backend == QueueBackend.MEMORY:
             self.queue = MemoryQueue()
         else:  # HYBRID - fallback to memory if Redis fails
@@ -764,6 +2408,7 @@ class MessageQueue:
     
     async def initialize(self) -> None:
         """Initialize queue manager"""
+        self.loop = asyncio.get_running_loop()
         if self.backend == QueueBackend.HYBRID:
             self.use_redis = await self.queue.connect()
             if not self.use_redis:
@@ -775,14 +2420,22 @@ class MessageQueue:
     
     async def shutdown(self) -> None:
         """Shutdown queue manager"""
+        if self._autoscaler:
+            self._autoscaler.cancel()
+            self._autoscaler = None
+        
         if hasattr(self.queue, 'disconnect'):
             await self.queue.disconnect()
         
         if self.backend == QueueBackend.HYBRID and hasattr(self, 'fallback_queue'):
             # Stop fallback queue workers
-            for queue_name in self.fallback_queue._workers:
+            for queue_name in list(self.fallback_queue.queues):
                 await self.fallback_queue.stop_workers(queue_name)
         
+        for lane in self._cpu_lanes.values():
+            lane.shutdown(wait=False)
+        self._cpu_lanes.clear()
+        
         logger.info("Message queue shutdown")
     
     def _get_active_queue(self):
@@ -791,13 +2444,32 @@ class MessageQueue:
             return self.queue if self.use_redis else self.fallback_queue
         return self.queue
     
+    def enable_fair_queuing(self, queue_name: str, key: str = "user_id") -> None:
+        """Schedule a queue's messages round-robin across values of a payload field
+        
+        A single busy user then can't starve everyone else queued at the same
+        priority. Supported by the memory and Redis backends.
+        """
+        self._fairness_fields[queue_name] = key
+    
+    def _fairness_key(self, queue_name: str, payload: Any) -> Optional[str]:
+        """Fairness key taken from the payload of a fair queue"""
+        field_name = self._fairness_fields.get(queue_name)
+        if field_name is None or not isinstance(payload, dict) or payload.get(field_name) is None:
+            return None
+        return str(payload[field_name])
+    
     async def send_message(self, queue_name: str, payload: Any, 
                           priority: MessagePriority = MessagePriority.NORMAL,
                           scheduled_at: Optional[datetime] = None,
                           max_attempts: int = 3,
                           timeout_seconds: int = 300,
-                          tags: Optional[List[str]] = None) -> str:
+                          tags: Optional[List[str]] = None,
+                          fairness_key: Optional[str] = None) -> str:
         """Send a message to queue"""
+        if fairness_key is None:
+            fairness_key = self._fairness_key(queue_name, payload)
+        
         message = QueueMessage(
             id=str(uuid.uuid4()),
             queue_name=queue_name,
@@ -806,7 +2478,8 @@ class MessageQueue:
             scheduled_at=scheduled_at,
             max_attempts=max_attempts,
             timeout_seconds=timeout_seconds,
-            tags=tags or []
+            tags=tags or [],
+            fairness_key=fairness_key
         )
         
         active_queue = self._get_active_queue()
@@ -817,17 +2490,141 @@ class MessageQueue:
         else:
             raise Exception(f"Failed to enqueue message to {queue_name}")
     
+    async def send_many(self, queue_name: str, payloads: List[Any],
+                        priority: MessagePriority = MessagePriority.NORMAL,
+                        scheduled_at: Optional[datetime] = None,
+                        max_attempts: int = 3,
+                        timeout_seconds: int = 300,
+                        tags: Optional[List[str]] = None,
+                        fairness_key: Optional[str] = None) -> List[str]:
+        """Send several messages to a queue in one batch
+        
+        Returns the ids of the messages that were enqueued.
+        """
+        messages = [
+            QueueMessage(
+                id=str(uuid.uuid4()),
+                queue_name=queue_name,
+                payload=payload,
+                priority=priority,
+                scheduled_at=scheduled_at,
+                max_attempts=max_attempts,
+                timeout_seconds=timeout_seconds,
+                tags=list(tags or []),
+                fairness_key=fairness_key if fairness_key is not None else self._fairness_key(queue_name, payload)
+            )
+            for payload in payloads
+        ]
+        if not messages:
+            return []
+        
+        active_queue = self._get_active_queue()
+        results = await active_queue.enqueue_many(messages)
+        
+        message_ids = [message.id for message, success in zip(messages, results) if success]
+        if not message_ids:
+            raise Exception(f"Failed to enqueue messages to {queue_name}")
+        if len(message_ids) < len(messages):
+            logger.warning(f"Enqueued {len(message_ids)} of {len(messages)} messages to {queue_name}")
+        return message_ids
+    
+    def add_cpu_lane(self, name: str = "cpu", max_workers: Optional[int] = None,
+                     max_concurrency: Optional[int] = None) -> CPULane:
+        """Create a process pool lane for CPU-bound handlers"""
+        if name in self._cpu_lanes:
+            self._cpu_lanes[name].shutdown(wait=False)
+        lane = CPULane(name, max_workers, max_concurrency)
+        self._cpu_lanes[name] = lane
+        return lane
+    
     async def register_handler(self, queue_name: str, handler: MessageHandler, 
-                              worker_count: int = 1) -> None:
-        """Register handler and start workers for queue"""
+                              worker_count: int = 1,
+                              autoscale: Optional[AutoscalePolicy] = None,
+                              cpu_lane: Optional[str] = None) -> None:
+        """Register handler and start workers for queue
+        
+        With an autoscale policy, worker_count is only the starting size and
+        the pool is resized within the policy bounds as the backlog changes.
+        Handlers registered with a cpu_lane run in that lane's process pool
+        (created with default sizes if it doesn't exist yet) so heavy work
+        doesn't block the event loop.
+        """
+        if cpu_lane:
+            lane = self._cpu_lanes.get(cpu_lane) or self.add_cpu_lane(cpu_lane)
+            handler = _CPUBoundHandler(handler, lane)
+        
         active_queue = self._get_active_queue()
         active_queue.register_handler(queue_name, handler)
+        
+        if autoscale:
+            worker_count = min(max(worker_count, autoscale.min_workers), autoscale.max_workers)
+            self._autoscale_policies[queue_name] = autoscale
+            if self._autoscaler is None or self._autoscaler.done():
+                self._autoscaler = asyncio.create_task(self._autoscale_loop())
+        
         await active_queue.start_workers(queue_name, worker_count)
     
+    @staticmethod
+    def _desired_workers(policy: AutoscalePolicy, current: int, depth: int,
+                         oldest_age: float, average_processing_time: float) -> int:
+        """Worker count that drains the backlog within the policy's target wait"""
+        if depth == 0:
+            # Idle: shed one worker per pass
+            desired = current - 1
+        else:
+            if average_processing_time > 0:
+                # Workers needed to finish the current backlog within the target wait
+                desired = math.ceil(depth * average_processing_time / policy.target_wait_seconds)
+            else:
+                desired = current + 1
+            
+            if oldest_age > policy.target_wait_seconds:
+                # Already behind: grow by at least one worker
+                desired = max(desired, current + 1)
+            elif desired < current:
+                # Shrink gradually while there is still work
+                desired = current - 1
+        
+        return min(max(desired, policy.min_workers), policy.max_workers)
+    
+    async def autoscale(self) -> None:
+        """Run one autoscaling pass over queues registered with a policy"""
+        active_queue = self._get_active_queue()
+        for queue_name, policy in list(self._autoscale_policies.items()):
+            try:
+                depth, oldest_age = await active_queue.get_backlog(queue_name)
+                stats = await active_queue.get_stats(queue_name)
+                current = active_queue.get_worker_count(queue_name)
+                
+                desired = self._desired_workers(policy, current, depth, oldest_age,
+                                                stats.average_processing_time)
+                if desired != current:
+                    await active_queue.scale_workers(queue_name, desired)
+                    
+            except Exception as e:
+                logger.error(f"Autoscaling error for queue {queue_name}: {e}")
+    
+    async def _autoscale_loop(self) -> None:
+        """Periodically resize autoscaled worker pools"""
+        while True:
+            try:
+                await asyncio.sleep(self.autoscale_interval)
+                await self.autoscale()
+            except asyncio.CancelledError:
+                break
+    
     async def get_queue_stats(self, queue_name: str) -> QueueStats:
         """Get queue statistics"""
         active_queue = self._get_active_queue()
         return await active_queue.get_stats(queue_name)
+    
+    async def get_all_queue_stats(self) -> Dict[str, QueueStats]:
+        """Get statistics for every known queue"""
+        active_queue = self._get_active_queue()
+        return {
+            queue_name: await active_queue.get_stats(queue_name)
+            for queue_name in await active_queue._get_queue_names()
+        }
 
 
 # Convenience decorators and functions
@@ -867,10 +2664,11 @@ queue_manager: Optional[MessageQueue] = None
 
 
 async def initialize_queue_manager(backend: QueueBackend = QueueBackend.MEMORY, 
-                                  redis_url: Optional[str] = None) -> MessageQueue:
+                                  redis_url: Optional[str] = None,
+                                  sqlite_path: Optional[str] = None) -> MessageQueue:
     """Initialize global queue manager"""
     global queue_manager
-    queue_manager = MessageQueue(backend, redis_url)
+    queue_manager = MessageQueue(backend, redis_url, sqlite_path)
     await queue_manager.initialize()
     return queue_manager
 
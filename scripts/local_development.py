@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import config
 from database import db_manager
+from monitoring.telegram_request import InstrumentedRequest
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -198,7 +199,7 @@ class LocalDevelopmentManager:
         try:
             from telegram import Bot
             
-            bot = Bot(token=config.BOT_TOKEN)
+            bot = Bot(token=config.BOT_TOKEN, request=InstrumentedRequest())
             webhook_url = f"{self.webhook_url}/webhook/{config.BOT_TOKEN}"
             
             result = await bot.set_webhook(
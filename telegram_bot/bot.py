@@ -12,8 +12,11 @@ from telegram.ext import (
     filters,
 )
 
+from cache.cache_manager import CacheBackend, get_cache_manager, initialize_cache_manager, shutdown_cache_manager
 from config import BotConfig
 from database.connection import DatabaseManager
+from monitoring.health_monitor import get_health_monitor, initialize_health_monitor
+from monitoring.telegram_request import InstrumentedRequest
 
 logger = logging.getLogger(__name__)
 
@@ -183,8 +186,19 @@ class TradingBot:
         try:
             await self.initialize()
             
+            # Shared cache for user lookups; Redis-backed when configured
+            if get_cache_manager() is None:
+                await initialize_cache_manager(CacheBackend.HYBRID if BotConfig.REDIS_URL else CacheBackend.MEMORY)
+            
+            # Metrics collector used by handler and Bot API instrumentation
+            if get_health_monitor() is None:
+                initialize_health_monitor(self.db_manager)
+            await get_health_monitor().start_monitoring()
+            
             # Create application
-            self.application = Application.builder().token(self.bot_token).build()
+            self.application = Application.builder().token(self.bot_token).request(
+                InstrumentedRequest(connection_pool_size=256)
+            ).build()
             
             # Store bot instance in application's bot_data for access from handlers
             self.application.bot_data['bot_instance'] = self
@@ -207,6 +221,11 @@ class TradingBot:
         except Exception as e:
             logger.error(f"Error in bot run: {e}")
             raise
+        finally:
+            monitor = get_health_monitor()
+            if monitor and monitor.monitoring_active:
+                await monitor.stop_monitoring()
+            await shutdown_cache_manager()
             
     async def _track_messages(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Track messages for analytics and monitoring"""
@@ -3,6 +3,7 @@
 import logging
 import warnings
 from telegram.ext import (
+    BaseHandler,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
@@ -10,6 +11,8 @@ from telegram.ext import (
     filters
 )
 
+from telegram_bot.utils.decorators import instrument_handler
+
 # Suppress PTB warnings about per_message settings
 warnings.filterwarnings("ignore", message=".*per_message.*CallbackQueryHandler.*", category=UserWarning)
 
@@ -108,6 +111,33 @@ SEARCH_USER = 4
 
 logger = logging.getLogger(__name__)
 
+def _handler_pattern(handler: BaseHandler) -> str:
+    """Command, callback pattern or filter a handler matches, for metric tags"""
+    if isinstance(handler, CommandHandler):
+        return ",".join(f"/{command}" for command in sorted(handler.commands))
+    if isinstance(handler, CallbackQueryHandler):
+        pattern = handler.pattern
+        if pattern is None:
+            return "*"
+        return getattr(pattern, "pattern", None) or getattr(pattern, "__name__", None) or str(pattern)
+    if isinstance(handler, MessageHandler):
+        return str(handler.filters)
+    return type(handler).__name__
+
+def instrument_handlers(handlers):
+    """Wrap the callbacks of the given handlers, including conversation steps, with metrics"""
+    for handler in handlers:
+        if isinstance(handler, ConversationHandler):
+            instrument_handlers(handler.entry_points)
+            for state_handlers in handler.states.values():
+                instrument_handlers(state_handlers)
+            instrument_handlers(handler.fallbacks)
+            continue
+        
+        callback = handler.callback
+        handler_name = getattr(callback, "__name__", type(callback).__name__)
+        handler.callback = instrument_handler(callback, handler_name, _handler_pattern(handler))
+
 def setup_all_handlers(bot):
     """Setup all handlers for the bot"""
     # Add handler to track message history
@@ -242,4 +272,8 @@ def setup_all_handlers(bot):
     
     bot.application.add_error_handler(bot.error_handler)
     
+    # Record latency, errors and in-flight calls for every registered handler
+    for group_handlers in bot.application.handlers.values():
+        instrument_handlers(group_handlers)
+    
     logger.info("All handlers have been set up")
\ No newline at end of file
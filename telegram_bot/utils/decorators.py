@@ -6,9 +6,10 @@ import time
 from typing import Callable, Any, Coroutine, TypeVar, cast, Optional
 
 from telegram import Update
-from telegram.ext import ContextTypes
+from telegram.ext import ApplicationHandlerStop, ContextTypes
 
 from config import BotConfig
+from monitoring.health_monitor import get_health_monitor
 from telegram_bot.utils.logger import StructuredLogger
 
 logger = logging.getLogger(__name__)
@@ -136,6 +137,55 @@ def measure_performance(func: HandlerType) -> HandlerType:
     return cast(HandlerType, wrapped)
 
 
+def instrument_handler(func: HandlerType, handler_name: str, pattern: str = "") -> HandlerType:
+    """Wrap a handler callback to record latency, errors and in-flight calls.
+    
+    Metrics go to the global health monitor's collector, tagged by handler
+    name and callback pattern; when no monitor is running the callback is
+    only timed, not recorded.
+    
+    Args:
+        func: The handler callback to wrap
+        handler_name: Name used for the handler tag
+        pattern: Command, callback pattern or filter the handler matches
+        
+    Returns:
+        The wrapped callback
+    """
+    if getattr(func, "_instrumented", False):
+        return func
+    
+    tags = {"handler": handler_name, "pattern": pattern}
+    in_flight = 0
+    
+    @functools.wraps(func)
+    async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+        nonlocal in_flight
+        monitor = get_health_monitor()
+        collector = monitor.metrics_collector if monitor else None
+        in_flight += 1
+        if collector:
+            collector.set_gauge("handler.in_flight", in_flight, tags)
+        start_time = time.perf_counter()
+        try:
+            return await func(update, context, *args, **kwargs)
+        except ApplicationHandlerStop:
+            raise
+        except Exception as e:
+            if collector:
+                collector.increment_counter("handler.errors_total",
+                                            tags={**tags, "error": type(e).__name__})
+            raise
+        finally:
+            in_flight -= 1
+            if collector:
+                collector.record_timer("handler.duration_ms", (time.perf_counter() - start_time) * 1000, tags)
+                collector.set_gauge("handler.in_flight", in_flight, tags)
+    
+    wrapped._instrumented = True
+    return cast(HandlerType, wrapped)
+
+
 def rate_limit(max_calls: int, time_frame: int) -> Callable[[HandlerType], HandlerType]:
     """Decorator factory to apply rate limiting to handlers.
     
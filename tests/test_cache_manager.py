@@ -0,0 +1,312 @@
+import unittest
+import asyncio
+import json
+import pickle
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+from cache import cache_manager as cache_module
+from cache.cache_manager import (
+    LRUCache, RedisCache, HybridCache, CacheManager, CacheBackend,
+    CacheSerializer, SerializationMethod, CompressionMethod, NEGATIVE_CACHE_ENTRY,
+    cache_result, make_cache_key, initialize_cache_manager, shutdown_cache_manager
+)
+
+
+class TestCacheManager(unittest.IsolatedAsyncioTestCase):
+    """Test suite for the cache manager backends"""
+
+    async def test_lru_delete_many(self):
+        """Test bulk deletion from the LRU cache"""
+        cache = LRUCache()
+        await cache.set("key1", "value1")
+        await cache.set("key2", "value2")
+        await cache.set("key3", "value3")
+
+        deleted = await cache.delete_many(["key1", "key2", "missing"])
+
+        self.assertEqual(deleted, 2)
+        self.assertIsNone(await cache.get("key1"))
+        self.assertEqual(await cache.get("key3"), "value3")
+        self.assertEqual(cache.stats.entry_count, 1)
+
+    async def test_clear_namespace(self):
+        """Test clearing a namespace only removes matching keys"""
+        manager = CacheManager(CacheBackend.MEMORY)
+        await manager.set("user:1", {"id": 1})
+        await manager.set("user:2", {"id": 2})
+        await manager.set("session:1", {"id": 1})
+
+        cleared = await manager.clear_namespace("user:")
+
+        self.assertEqual(cleared, 2)
+        self.assertIsNone(await manager.get("user:1"))
+        self.assertEqual(await manager.get("session:1"), {"id": 1})
+
+    async def test_invalidate_user_cache(self):
+        """Test invalidating all entries for a user"""
+        manager = CacheManager(CacheBackend.MEMORY)
+        await manager.cache_user_data(42, {"id": 42})
+
+        self.assertTrue(await manager.invalidate_user_cache(42))
+        self.assertIsNone(await manager.get_user_data(42))
+        self.assertFalse(await manager.invalidate_user_cache(42))
+
+    async def test_hybrid_applies_remote_invalidations(self):
+        """Test near-cache eviction from another replica's invalidation message"""
+        cache = HybridCache()
+        await cache.memory_cache.set("user:1", {"id": 1})
+        await cache.memory_cache.set("user:2", {"id": 2}, tags=["user_data"])
+        await cache.memory_cache.set("session:1", {"id": 1})
+
+        await cache._apply_invalidation(json.dumps({"origin": "other", "keys": ["user:1"]}))
+        self.assertIsNone(await cache.memory_cache.get("user:1"))
+
+        await cache._apply_invalidation(json.dumps({"origin": "other", "tags": ["user_data"]}))
+        self.assertIsNone(await cache.memory_cache.get("user:2"))
+
+        # Messages published by this replica are ignored
+        await cache._apply_invalidation(json.dumps({"origin": cache.instance_id, "clear": True}))
+        self.assertEqual(await cache.memory_cache.get("session:1"), {"id": 1})
+
+        await cache._apply_invalidation(json.dumps({"origin": "other", "clear": True}))
+        self.assertIsNone(await cache.memory_cache.get("session:1"))
+
+    async def test_negative_caching(self):
+        """Test misses are cached and not recomputed until invalidated"""
+        manager = CacheManager(CacheBackend.MEMORY)
+        calls = []
+
+        async def load_user():
+            calls.append(1)
+            return None
+
+        self.assertIsNone(await manager.get_or_set("user:6", load_user))
+        self.assertIsNone(await manager.get_or_set("user:6", load_user))
+        self.assertEqual(len(calls), 2)
+
+        self.assertIsNone(await manager.get_or_set("user:7", load_user, cache_missing=True))
+        self.assertIsNone(await manager.get_or_set("user:7", load_user, cache_missing=True))
+        self.assertEqual(len(calls), 3)
+        self.assertIsNone(await manager.get("user:7"))
+        self.assertIs(await manager.get("user:7", include_negative=True), NEGATIVE_CACHE_ENTRY)
+        self.assertTrue(await manager.is_user_missing(7))
+
+        await manager.cache_user_data(7, {"id": 7})
+        self.assertEqual(await manager.get_user_data(7), {"id": 7})
+        self.assertFalse(await manager.is_user_missing(7))
+
+        await manager.cache_user_missing(8)
+        self.assertIsNone(await manager.get_user_data(8))
+        self.assertTrue(await manager.invalidate_user_cache(8))
+        self.assertFalse(await manager.is_user_missing(8))
+
+    async def test_create_user_invalidates_only_that_user(self):
+        """Test creating a user clears its negative entry without touching other user ids"""
+        from database import connection
+
+        await initialize_cache_manager(CacheBackend.MEMORY)
+        try:
+            manager = cache_module.get_cache_manager()
+            for user_id in (5, 51, 500):
+                await manager.cache_user_missing(user_id)
+
+            with patch.object(connection.db_manager, "execute", AsyncMock(return_value=None)):
+                self.assertTrue(await connection.create_user(5, "alice", "Alice"))
+
+            self.assertFalse(await manager.is_user_missing(5))
+            self.assertTrue(await manager.is_user_missing(51))
+            self.assertTrue(await manager.is_user_missing(500))
+        finally:
+            await shutdown_cache_manager()
+
+    async def test_cache_result_uses_active_manager(self):
+        """Test decorated functions outside the module are wired on initialization"""
+        calls = []
+
+        @cache_result(ttl_seconds=60, key_prefix="test")
+        async def lookup(user_id, fields=None):
+            calls.append(user_id)
+            return {"id": user_id}
+
+        # Not cached before a manager exists
+        await lookup(1)
+        await lookup(1)
+        self.assertEqual(len(calls), 2)
+
+        await initialize_cache_manager(CacheBackend.MEMORY)
+        try:
+            await lookup(1, fields=["a", "b"])
+            self.assertEqual(await lookup(1, fields=["a", "b"]), {"id": 1})
+            self.assertEqual(len(calls), 3)
+            self.assertEqual(lookup.cache_stats.hits, 1)
+            self.assertEqual(lookup.cache_stats.misses, 1)
+
+            stats = cache_module.get_cache_result_stats()
+            self.assertIn(f"{__name__}.{lookup.__qualname__}", stats)
+        finally:
+            await shutdown_cache_manager()
+
+    def test_make_cache_key_is_canonical(self):
+        """Test equal arguments produce equal keys regardless of dict order"""
+        key1 = make_cache_key("p", "f", ({"a": 1, "b": 2},), {"x": 1, "y": 2})
+        key2 = make_cache_key("p", "f", ({"b": 2, "a": 1},), {"y": 2, "x": 1})
+        key3 = make_cache_key("p", "f", ("1",), {})
+        key4 = make_cache_key("p", "f", (1,), {})
+
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key3, key4)
+        self.assertTrue(key1.startswith("p:f:"))
+
+
+@unittest.skipUnless(cache_module.REDIS_AVAILABLE and fakeredis, "redis or fakeredis not installed")
+class TestRedisCache(unittest.IsolatedAsyncioTestCase):
+    """Test suite for the Redis cache's SCAN and pipelined paths"""
+
+    async def asyncSetUp(self):
+        server = fakeredis.FakeServer()
+        with patch.object(cache_module.redis, "from_url", lambda *args, **kwargs: fakeredis.FakeAsyncRedis(server=server)):
+            self.cache = RedisCache(scan_batch_size=2)
+            self.assertTrue(await self.cache.connect())
+        self.redis = self.cache.redis_client
+        self.scan_calls = 0
+        scan = self.redis.scan
+
+        async def counting_scan(*args, **kwargs):
+            self.scan_calls += 1
+            return await scan(*args, **kwargs)
+
+        self.redis.scan = counting_scan
+
+    async def asyncTearDown(self):
+        await self.cache.disconnect()
+
+    async def test_delete_by_pattern_across_scan_pages(self):
+        """Test pattern deletion walks every SCAN page and leaves other keys alone"""
+        for i in range(7):
+            await self.cache.set(f"user:{i}", {"id": i})
+        await self.cache.set("session:1", {"id": 1})
+        await self.redis.set("other:user:1", b"x")
+
+        deleted = await self.cache.delete_by_pattern("user:*")
+
+        self.assertEqual(deleted, 7)
+        self.assertGreater(self.scan_calls, 1)
+        self.assertEqual(await self.cache.get_keys_by_pattern("*"), ["session:1"])
+        self.assertEqual(await self.redis.get("other:user:1"), b"x")
+
+    async def test_clear_by_tags(self):
+        """Test tag clearing removes tagged entries and the tag sets"""
+        await self.cache.set("user:1", 1, tags=["users"])
+        await self.cache.set("user:2", 2, tags=["users", "admins"])
+        await self.cache.set("config:a", "a", tags=["config"])
+
+        cleared = await self.cache.clear_by_tags(["users", "admins"])
+
+        self.assertEqual(cleared, 2)
+        self.assertIsNone(await self.cache.get("user:1"))
+        self.assertIsNone(await self.cache.get("user:2"))
+        self.assertEqual(await self.cache.get("config:a"), "a")
+        self.assertFalse(await self.redis.exists("optrixtrades:tag:users", "optrixtrades:tag:admins"))
+
+    async def test_entry_count_is_throttled(self):
+        """Test get_stats only rescans the keyspace once per refresh interval"""
+        self.redis.info = AsyncMock(return_value={"used_memory": 1024})
+        for i in range(5):
+            await self.cache.set(f"user:{i}", i)
+
+        self.assertEqual((await self.cache.get_stats()).entry_count, 5)
+        scans = self.scan_calls
+        await self.cache.set("user:5", 5)
+        self.assertEqual((await self.cache.get_stats()).entry_count, 5)
+        self.assertEqual(self.scan_calls, scans)
+
+        self.cache._entry_count_refreshed_at -= self.cache.stats_refresh_seconds
+        self.assertEqual((await self.cache.get_stats()).entry_count, 6)
+        self.assertGreater(self.scan_calls, scans)
+
+    async def test_hybrid_invalidation_over_pubsub(self):
+        """Test a write on one replica evicts another replica's near-cache copy through pub/sub"""
+        server = fakeredis.FakeServer()
+        with patch.object(cache_module.redis, "from_url", lambda *args, **kwargs: fakeredis.FakeAsyncRedis(server=server)):
+            writer = HybridCache(near_cache_ttl_seconds=5)
+            reader = HybridCache(near_cache_ttl_seconds=5)
+            await writer.connect()
+            await reader.connect()
+        try:
+            channel = writer.invalidation_channel
+            for _ in range(100):
+                if (await writer.redis_cache.redis_client.pubsub_numsub(channel))[0][1] == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+            await writer.set("user:1", {"id": 1, "name": "old"}, ttl_seconds=3600)
+            self.assertEqual(await reader.get("user:1"), {"id": 1, "name": "old"})
+            self.assertIsNotNone(await reader.memory_cache.get("user:1"))
+            # The writer's own near-cache copy is bounded by the near-cache TTL
+            self.assertLessEqual(writer.memory_cache.cache["user:1"].expires_at,
+                                 datetime.now() + timedelta(seconds=5))
+
+            await writer.set("user:1", {"id": 1, "name": "new"}, ttl_seconds=3600)
+            for _ in range(100):
+                if await reader.memory_cache.get("user:1") is None:
+                    break
+                await asyncio.sleep(0.01)
+
+            self.assertIsNone(await reader.memory_cache.get("user:1"))
+            self.assertEqual(await reader.get("user:1"), {"id": 1, "name": "new"})
+        finally:
+            await writer.disconnect()
+            await reader.disconnect()
+
+
+class TestCacheSerializer(unittest.TestCase):
+    """Test suite for tagged cache value serialization"""
+
+    def test_round_trip(self):
+        """Test values survive a round trip through the chosen codec"""
+        serializer = CacheSerializer()
+        values = [
+            {"user_id": 1, "name": "test", "verified": True, "score": 1.5, "tags": ["a", None]},
+            "plain string",
+            {"created_at": datetime(2024, 1, 1)},
+            {1: "int keys"},
+            (1, 2),
+            NEGATIVE_CACHE_ENTRY,
+        ]
+        for value in values:
+            self.assertEqual(serializer.loads(serializer.dumps(value)), value)
+        self.assertIs(serializer.loads(serializer.dumps(NEGATIVE_CACHE_ENTRY)), NEGATIVE_CACHE_ENTRY)
+
+    def test_plain_data_avoids_pickle(self):
+        """Test dict-shaped data is not pickled"""
+        serializer = CacheSerializer()
+        data = serializer.dumps({"user_id": 1})
+        self.assertNotEqual(data[0] & 0x0F, 2)
+
+    def test_compression_threshold(self):
+        """Test large payloads are compressed and small ones are not"""
+        serializer = CacheSerializer(method=SerializationMethod.JSON,
+                                     compression=CompressionMethod.ZLIB,
+                                     compression_threshold=100)
+        small = serializer.dumps({"a": 1})
+        large = serializer.dumps({"notes": "x" * 1000})
+
+        self.assertEqual(small[0] >> 4, 0)
+        self.assertEqual(large[0] >> 4, 1)
+        self.assertLess(len(large), 1000)
+        self.assertEqual(serializer.loads(large), {"notes": "x" * 1000})
+
+    def test_legacy_pickle_values(self):
+        """Test untagged values written by older versions still load"""
+        serializer = CacheSerializer()
+        self.assertEqual(serializer.loads(pickle.dumps({"a": 1})), {"a": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from telegram.ext import CallbackQueryHandler, CommandHandler, ConversationHandler
+
+from monitoring import health_monitor as health_module
+from monitoring.health_monitor import MetricsCollector
+from telegram_bot.handlers.setup import instrument_handlers
+
+
+class TestHandlerInstrumentation(unittest.IsolatedAsyncioTestCase):
+    """Test suite for per-handler latency, error and in-flight metrics"""
+
+    async def asyncSetUp(self):
+        self.collector = MetricsCollector()
+        patcher = patch.object(health_module, "health_monitor", SimpleNamespace(metrics_collector=self.collector))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_records_latency_errors_and_in_flight(self):
+        """Test wrapped callbacks report metrics tagged by handler and pattern"""
+        release = asyncio.Event()
+
+        async def approve_callback(update, context):
+            await release.wait()
+            return "done"
+
+        async def broken_command(update, context):
+            raise ValueError("boom")
+
+        approve = CallbackQueryHandler(approve_callback, pattern="^approve_\\d+$")
+        broken = CommandHandler("broken", broken_command)
+        conversation = ConversationHandler(entry_points=[broken], states={0: [approve]}, fallbacks=[])
+        instrument_handlers([conversation])
+        instrument_handlers([conversation])
+
+        approve_tags = {"handler": "approve_callback", "pattern": "^approve_\\d+$"}
+        calls = [asyncio.create_task(approve.callback(None, None)) for _ in range(2)]
+        await asyncio.sleep(0)
+        self.assertEqual(self.collector.get_gauge_value("handler.in_flight", approve_tags), 2)
+
+        release.set()
+        self.assertEqual(await asyncio.gather(*calls), ["done", "done"])
+        with self.assertRaises(ValueError):
+            await broken.callback(None, None)
+
+        self.assertEqual(self.collector.get_gauge_value("handler.in_flight", approve_tags), 0)
+        self.assertEqual(self.collector.get_timer_stats("handler.duration_ms", approve_tags)["count"], 2)
+        self.assertEqual(self.collector.get_counter_value(
+            "handler.errors_total", {"handler": "broken_command", "pattern": "/broken", "error": "ValueError"}), 1)
+        self.assertEqual(self.collector.get_timer_stats("handler.duration_ms")["count"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,259 @@
+import unittest
+import asyncio
+import random
+import threading
+import time
+from unittest.mock import patch
+
+from monitoring import health_monitor as health_module
+from monitoring.health_monitor import (
+    MetricsCollector, QuantileSketch, WindowedSketch, SystemSampler, SystemHealthChecker, HealthStatus, HealthCheck,
+    EventLoopMonitor, AlertManager
+)
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """Test suite for the streaming quantile sketch"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test estimated quantiles stay within the configured relative error"""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(3, 1.5) for _ in range(20000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.9, 0.95, 0.99):
+            expected = ordered[int(q * (len(ordered) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q), expected, delta=expected * 0.011)
+        self.assertEqual(sketch.count, 20000)
+        self.assertLess(len(sketch.positive), 2048)
+
+    def test_merge_matches_single_sketch(self):
+        """Test merged sketches report the same quantiles as one sketch of all values"""
+        combined, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for value in range(-50, 1000):
+            combined.add(value)
+            (first if value % 2 else second).add(value)
+
+        first.merge(second)
+        for q in (0.0, 0.1, 0.5, 0.99, 1.0):
+            self.assertEqual(first.quantile(q), combined.quantile(q))
+        self.assertEqual(first.get_stats()["min"], -50)
+        self.assertEqual(first.get_stats()["max"], 999)
+
+    def test_windowed_sketch_drops_old_slices(self):
+        """Test values older than the window no longer affect the snapshot"""
+        now = [1000.0]
+        with patch.object(health_module.time, "monotonic", lambda: now[0]):
+            sketch = WindowedSketch(window_seconds=60, slices=3)
+            sketch.add(500)
+            now[0] += 30
+            sketch.add(10)
+            self.assertEqual(sketch.snapshot().count, 2)
+
+            now[0] += 45
+            self.assertEqual(sketch.snapshot().count, 1)
+            self.assertEqual(sketch.snapshot().max, 10)
+
+    def test_collector_stats(self):
+        """Test collector timers summarize through the sketch"""
+        collector = MetricsCollector()
+        for duration in range(1, 101):
+            collector.record_timer("request_duration_ms", duration)
+
+        stats = collector.get_timer_stats("request_duration_ms")
+        self.assertEqual(stats["count"], 100)
+        self.assertEqual(stats["mean"], 50.5)
+        self.assertAlmostEqual(stats["p50"], 50, delta=1)
+        self.assertEqual(collector.get_histogram_stats("missing"), {})
+
+
+class TestLabeledMetrics(unittest.TestCase):
+    """Test suite for labeled metric series"""
+
+    def test_series_keyed_by_sorted_labels(self):
+        """Test tags feed per-series values alongside the unlabeled total"""
+        collector = MetricsCollector()
+        collector.increment_counter("requests_total", tags={"endpoint": "/a", "status": "200"})
+        collector.increment_counter("requests_total", tags={"status": "200", "endpoint": "/a"})
+        collector.increment_counter("requests_total", tags={"endpoint": "/b", "status": "500"})
+        collector.record_timer("db_operation_duration_ms", 5, tags={"operation": "select"})
+        collector.record_timer("db_operation_duration_ms", 50, tags={"operation": "insert"})
+
+        self.assertEqual(collector.get_counter_value("requests_total"), 3)
+        self.assertEqual(collector.get_counter_value("requests_total", {"endpoint": "/a", "status": "200"}), 2)
+        self.assertEqual(collector.get_timer_stats("db_operation_duration_ms", {"operation": "insert"})["max"], 50)
+        self.assertEqual(collector.get_timer_stats("db_operation_duration_ms")["count"], 2)
+
+        labeled = collector.get_metrics_summary()["labeled"]
+        self.assertEqual(len(labeled["counters"]["requests_total"]), 2)
+        self.assertEqual(len(labeled["timers"]["db_operation_duration_ms"]), 2)
+
+    def test_cardinality_cap_uses_overflow_series(self):
+        """Test label sets beyond the cap are folded into the overflow series"""
+        collector = MetricsCollector(max_series_per_metric=2)
+        for user_id in range(5):
+            collector.increment_counter("user_interactions_total", tags={"user": str(user_id)})
+
+        self.assertEqual(len(collector.label_sets["user_interactions_total"]), 2)
+        self.assertEqual(collector.get_counter_value("user_interactions_total", {"overflow": "true"}), 3)
+        self.assertEqual(collector.get_counter_value("user_interactions_total", {"user": "1"}), 1)
+        self.assertEqual(collector.get_counter_value("user_interactions_total"), 5)
+
+
+class TestSystemSampler(unittest.IsolatedAsyncioTestCase):
+    """Test suite for off-loop system probes"""
+
+    async def test_probes_run_off_the_event_loop(self):
+        """Test psutil readings are taken on another thread and shared while fresh"""
+        sampler = SystemSampler(max_age_seconds=60)
+        probe = sampler._probe
+        threads = []
+
+        def recording_probe():
+            threads.append(threading.current_thread())
+            return probe()
+
+        sampler._probe = recording_probe
+        first = await sampler.sample()
+        second = await sampler.sample()
+
+        self.assertIs(first, second)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+        self.assertGreater(first.memory_total_bytes, 0)
+
+    async def test_checks_use_sampler(self):
+        """Test resource checks read the shared snapshot"""
+        checker = SystemHealthChecker(sampler=SystemSampler(max_age_seconds=60))
+        resources = await checker.run_check("system_resources")
+        disk = await checker.run_check("disk_space")
+
+        self.assertIn(resources.status, (HealthStatus.HEALTHY, HealthStatus.WARNING, HealthStatus.CRITICAL))
+        self.assertLess(resources.response_time_ms, 900)
+        self.assertIn("free_percent", disk.details)
+
+
+
+class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
+    """Test suite for concurrent health check execution"""
+
+    async def asyncSetUp(self):
+        self.checker = SystemHealthChecker(check_budget_seconds=0.2)
+        self.checker.health_checks.clear()
+        self.calls = []
+
+    def add_check(self, name, delay, interval=60):
+        async def check():
+            self.calls.append(name)
+            await asyncio.sleep(delay)
+            return {"status": HealthStatus.HEALTHY, "message": name}
+
+        self.checker.register_check(HealthCheck(name=name, check_function=check, interval_seconds=interval))
+
+    async def test_checks_run_concurrently_within_budget(self):
+        """Test due checks overlap and a check over budget is recorded as failed"""
+        self.add_check("fast_a", 0.1)
+        self.add_check("fast_b", 0.1)
+        self.add_check("stuck", 10)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await self.checker.run_all_checks()
+
+        self.assertLess(loop.time() - start, 0.5)
+        self.assertEqual(results["fast_a"].status, HealthStatus.HEALTHY)
+        self.assertEqual(results["fast_b"].status, HealthStatus.HEALTHY)
+        self.assertEqual(results["stuck"].status, HealthStatus.WARNING)
+        self.assertIn("budget", results["stuck"].message)
+        self.assertEqual(self.checker._in_flight, {})
+
+    async def test_results_cached_for_interval(self):
+        """Test fresh results are reused and concurrent callers share one run"""
+        self.add_check("db", 0.05)
+
+        first, second = await asyncio.gather(self.checker.run_check("db"), self.checker.run_check("db"))
+        self.assertIs(first, second)
+        self.assertEqual(await self.checker.run_all_checks(), {})
+        self.assertEqual(self.calls, ["db"])
+
+        self.checker.refresh_in_background()
+        summary = self.checker.get_health_summary()
+        self.assertEqual(summary["checks"]["db"]["status"], "healthy")
+
+
+
+async def blocking_handler():
+    """Coroutine that blocks the event loop"""
+    time.sleep(0.3)
+
+
+class TestEventLoopMonitor(unittest.IsolatedAsyncioTestCase):
+    """Test suite for event loop lag and stall reporting"""
+
+    async def test_stall_reports_task_and_stack(self):
+        """Test a blocking coroutine shows up in lag, stall metrics and alerts"""
+        collector = MetricsCollector()
+        alert_manager = AlertManager()
+        monitor = EventLoopMonitor(collector, alert_manager, interval_seconds=0.02, stall_threshold_ms=100)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            await asyncio.create_task(blocking_handler())
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        self.assertGreaterEqual(collector.get_timer_stats("event_loop.lag_ms")["max"], 150)
+        self.assertEqual(monitor.last_stall["task"], "blocking_handler")
+        self.assertIn("time.sleep(0.3)", monitor.last_stall["stack"])
+        self.assertEqual(collector.get_counter_value("event_loop.stalls_total", {"task": "blocking_handler"}), 1)
+        self.assertIn("event_loop_stall", alert_manager.active_alerts)
+
+        # Low p99 lag alone does not clear the stall alert; it expires after stall_alert_seconds
+        alert_manager.check_alert_rules({}, {"timers": {"event_loop.lag_ms": {"p99": 1.0}}})
+        self.assertIn("event_loop_stall", alert_manager.active_alerts)
+        alert_manager.last_stall_at -= alert_manager.stall_alert_seconds
+        alert_manager.check_alert_rules({}, {"timers": {"event_loop.lag_ms": {"p99": 1.0}}})
+        self.assertNotIn("event_loop_stall", alert_manager.active_alerts)
+
+    def test_lag_alert_uses_configured_threshold(self):
+        """Test the p99 lag alert fires above the configured threshold and 0 disables it"""
+        alert_manager = AlertManager(loop_lag_threshold_ms=100)
+        alert_manager.check_alert_rules({}, {"timers": {"event_loop.lag_ms": {"p99": 150.0}}})
+        self.assertIn("event_loop_lag", alert_manager.active_alerts)
+        alert_manager.check_alert_rules({}, {"timers": {"event_loop.lag_ms": {"p99": 50.0}}})
+        self.assertNotIn("event_loop_lag", alert_manager.active_alerts)
+
+        alert_manager = AlertManager(loop_lag_threshold_ms=0)
+        alert_manager.check_alert_rules({}, {"timers": {"event_loop.lag_ms": {"p99": 5000.0}}})
+        self.assertNotIn("event_loop_lag", alert_manager.active_alerts)
+
+    async def test_global_monitor_runs_loop_monitor(self):
+        """Test the global monitor gets the configured threshold and starts the loop monitor"""
+        with patch.object(health_module, "health_monitor", None):
+            monitor = health_module.initialize_health_monitor()
+            self.assertEqual(monitor.loop_monitor.stall_threshold_ms, health_module.BotConfig.LOOP_STALL_THRESHOLD_MS)
+            self.assertEqual(monitor.alert_manager.loop_lag_threshold_ms, health_module.BotConfig.LOOP_STALL_THRESHOLD_MS)
+            self.assertIsNotNone(monitor.loop_monitor.stall_threshold_ms)
+
+            async def idle():
+                await asyncio.Event().wait()
+
+            with patch.object(monitor, "_monitoring_loop", idle):
+                await monitor.start_monitoring()
+                try:
+                    self.assertFalse(monitor.loop_monitor._task.done())
+                    self.assertTrue(monitor.loop_monitor._watchdog.is_alive())
+                finally:
+                    await monitor.stop_monitoring()
+
+            self.assertIsNone(monitor.loop_monitor._task)
+            self.assertEqual(health_module.initialize_health_monitor(loop_stall_threshold_ms=50)
+                             .loop_monitor.stall_threshold_ms, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
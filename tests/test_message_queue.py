@@ -0,0 +1,638 @@
+import unittest
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+# The top-level ``queue`` directory is shadowed by the standard library module,
+# so load the message queue module straight from its file.
+_spec = importlib.util.spec_from_file_location(
+    "message_queue",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "queue", "message_queue.py")
+)
+# Registered (and shared with other test modules) so CPU lane pool processes
+# can unpickle references into the module
+message_queue = sys.modules.setdefault("message_queue", importlib.util.module_from_spec(_spec))
+if not hasattr(message_queue, "MessageQueue"):
+    _spec.loader.exec_module(message_queue)
+
+MemoryQueue = message_queue.MemoryQueue
+QueueMessage = message_queue.QueueMessage
+MessagePriority = message_queue.MessagePriority
+MessageStatus = message_queue.MessageStatus
+MessageHandler = message_queue.MessageHandler
+SQLiteQueue = message_queue.SQLiteQueue
+MessageQueue = message_queue.MessageQueue
+QueueBackend = message_queue.QueueBackend
+AutoscalePolicy = message_queue.AutoscalePolicy
+RedisQueue = message_queue.RedisQueue
+
+
+class RecordingHandler(MessageHandler):
+    """Handler that records payloads and signals when enough have arrived"""
+
+    def __init__(self, expected=1):
+        self.payloads = []
+        self.expected = expected
+        self.done = asyncio.Event()
+
+    async def handle(self, message):
+        self.payloads.append(message.payload)
+        if len(self.payloads) >= self.expected:
+            self.done.set()
+        return True
+
+
+class BatchHandler(MessageHandler):
+    """Handler that records batches and fails odd payloads"""
+
+    batch_size = 10
+
+    def __init__(self):
+        self.batches = []
+        self.done = asyncio.Event()
+
+    async def handle_batch(self, messages):
+        self.batches.append([message.payload for message in messages])
+        self.done.set()
+        return [message.payload % 2 == 0 for message in messages]
+
+
+class ProcessCheckHandler(MessageHandler):
+    """Handler that succeeds only outside the process given in the payload"""
+
+    async def handle(self, message):
+        return os.getpid() != message.payload
+
+
+def make_message(queue_name="test", priority=MessagePriority.NORMAL, scheduled_at=None, payload=None):
+    """Create a queue message for tests"""
+    return QueueMessage(
+        id=f"msg-{time.perf_counter_ns()}",
+        queue_name=queue_name,
+        payload=payload,
+        priority=priority,
+        scheduled_at=scheduled_at
+    )
+
+
+class TestMemoryQueue(unittest.IsolatedAsyncioTestCase):
+    """Test suite for the in-memory queue backend"""
+
+    async def asyncSetUp(self):
+        self.queue = MemoryQueue()
+        await self.queue.create_queue("test")
+
+    async def test_priority_then_fifo_order(self):
+        """Test higher priorities come first and equal priorities stay FIFO"""
+        await self.queue.enqueue(make_message(payload="low", priority=MessagePriority.LOW))
+        await self.queue.enqueue(make_message(payload="normal-1"))
+        await self.queue.enqueue(make_message(payload="critical", priority=MessagePriority.CRITICAL))
+        await self.queue.enqueue(make_message(payload="normal-2"))
+
+        order = []
+        while True:
+            message = await self.queue.dequeue("test")
+            if message is None:
+                break
+            order.append(message.payload)
+
+        self.assertEqual(order, ["critical", "normal-1", "normal-2", "low"])
+
+    async def test_delayed_messages_wait_until_due(self):
+        """Test scheduled messages are held back until their time"""
+        await self.queue.enqueue(make_message(payload="later", scheduled_at=datetime.now() + timedelta(hours=1)))
+        await self.queue.enqueue(make_message(payload="soon", scheduled_at=datetime.now() + timedelta(milliseconds=50)))
+        await self.queue.enqueue(make_message(payload="now"))
+
+        self.assertEqual((await self.queue.dequeue("test")).payload, "now")
+        self.assertIsNone(await self.queue.dequeue("test"))
+        self.assertEqual(await self.queue.get_queue_size("test"), 2)
+
+        time.sleep(0.06)
+        message = await self.queue.dequeue("test")
+        self.assertEqual(message.payload, "soon")
+        self.assertEqual(message.status, MessageStatus.PROCESSING)
+
+    async def test_nack_schedules_retry(self):
+        """Test a failed message is delayed for retry instead of redelivered immediately"""
+        await self.queue.enqueue(make_message(payload="retry"))
+        message = await self.queue.dequeue("test")
+
+        self.assertTrue(await self.queue.nack_message(message.id, "boom"))
+        self.assertEqual(message.status, MessageStatus.RETRYING)
+        self.assertIsNone(await self.queue.dequeue("test"))
+        self.assertEqual(await self.queue.get_queue_size("test"), 1)
+
+    async def test_workers_wake_on_enqueue_and_timer(self):
+        """Test idle workers are woken by new messages and by due delayed messages"""
+        handler = RecordingHandler(expected=2)
+        self.queue.register_handler("test", handler)
+        await self.queue.start_workers("test", worker_count=2)
+        try:
+            await asyncio.sleep(0)
+            await self.queue.enqueue(make_message(payload="delayed", scheduled_at=datetime.now() + timedelta(milliseconds=30)))
+            await self.queue.enqueue(make_message(payload="immediate"))
+
+            await asyncio.wait_for(handler.done.wait(), timeout=1)
+            self.assertEqual(handler.payloads, ["immediate", "delayed"])
+        finally:
+            await self.queue.stop_workers("test")
+
+    async def test_wakeup_that_finds_nothing_keeps_waiting(self):
+        """Test a waiter woken after another consumer took the message blocks again"""
+        waiter = asyncio.create_task(self.queue.wait_for_message("test"))
+        await asyncio.sleep(0)
+
+        await self.queue.enqueue(make_message(payload="taken"))
+        self.assertEqual((await self.queue.dequeue("test")).payload, "taken")
+        await asyncio.sleep(0.05)
+        self.assertFalse(waiter.done())
+
+        await self.queue.enqueue(make_message(payload="next"))
+        self.assertEqual((await asyncio.wait_for(waiter, timeout=1)).payload, "next")
+
+    async def test_stats_while_message_in_flight(self):
+        """Test stats and dead letters are reported while nothing is waiting"""
+        message = make_message(payload="only")
+        message.max_attempts = 1
+        await self.queue.enqueue(message)
+        await self.queue.dequeue("test")
+
+        stats = await self.queue.get_stats("test")
+        self.assertEqual(stats.total_messages, 1)
+        self.assertEqual(stats.processing_messages, 1)
+        self.assertEqual(await self.queue.get_queue_size("test"), 0)
+
+        await self.queue.nack_message(message.id, "boom")
+        self.assertEqual([m.id for m in await self.queue.get_dead_letter_messages("test")], [message.id])
+        self.assertEqual((await self.queue.get_stats("test")).dead_letter_messages, 1)
+
+    async def test_enqueue_creates_missing_queue(self):
+        """Test concurrent first enqueues to a new queue create it once without deadlocking"""
+        messages = [make_message(queue_name="fresh", payload=i) for i in range(5)]
+        results = await asyncio.wait_for(
+            asyncio.gather(*(self.queue.enqueue(message) for message in messages)),
+            timeout=1
+        )
+
+        self.assertTrue(all(results))
+        self.assertEqual(await self.queue.get_queue_size("fresh"), 5)
+        self.assertEqual((await self.queue.get_stats("fresh")).total_messages, 5)
+
+    async def test_queues_do_not_share_locks(self):
+        """Test a held lock on one queue does not block another queue"""
+        await self.queue.create_queue("other")
+        async with self.queue.queues["test"].lock:
+            self.assertTrue(await asyncio.wait_for(
+                self.queue.enqueue(make_message(queue_name="other", payload="x")), timeout=1
+            ))
+            message = await asyncio.wait_for(self.queue.dequeue("other"), timeout=1)
+            self.assertTrue(await asyncio.wait_for(self.queue.ack_message(message.id), timeout=1))
+
+    async def test_reaper_requeues_expired_messages(self):
+        """Test in-flight messages past their deadline are retried and stats recover"""
+        queue = MemoryQueue(visibility_grace=0)
+        message = make_message(payload="stuck")
+        message.timeout_seconds = 0
+        await queue.enqueue(message)
+        await queue.enqueue(make_message(payload="fresh"))
+
+        await queue.dequeue("test")
+        fresh = await queue.dequeue("test")
+        fresh.timeout_seconds = 60
+        time.sleep(0.01)
+
+        self.assertEqual(await queue.reap_expired(), 1)
+        self.assertEqual(message.status, MessageStatus.RETRYING)
+        self.assertFalse(await queue.ack_message(message.id))
+        self.assertTrue(await queue.ack_message(fresh.id))
+        stats = await queue.get_stats("test")
+        self.assertEqual(stats.processing_messages, 0)
+        self.assertEqual(stats.pending_messages, 1)
+
+    async def test_enqueue_many_and_dequeue_batch(self):
+        """Test batch enqueue respects the size limit and batch dequeue keeps priority order"""
+        queue = MemoryQueue(max_size=3)
+        messages = [make_message(payload=i) for i in range(4)]
+        messages[2].priority = MessagePriority.HIGH
+
+        self.assertEqual(await queue.enqueue_many(messages), [True, True, True, False])
+
+        batch = await queue.dequeue_batch("test", 10)
+        self.assertEqual([message.payload for message in batch], [2, 0, 1])
+        self.assertEqual((await queue.get_stats("test")).processing_messages, 3)
+
+    async def test_handle_batch_acks_individually(self):
+        """Test a batch handler's flags ack and nack each message separately"""
+        handler = BatchHandler()
+        self.queue.register_handler("test", handler)
+        await self.queue.enqueue_many([make_message(payload=i) for i in range(4)])
+        await self.queue.start_workers("test")
+        try:
+            await asyncio.wait_for(handler.done.wait(), timeout=1)
+            await asyncio.sleep(0)
+            stats = await self.queue.get_stats("test")
+
+            self.assertEqual(handler.batches, [[0, 1, 2, 3]])
+            self.assertEqual(stats.completed_messages, 2)
+            self.assertEqual(stats.failed_messages, 2)
+            self.assertEqual(stats.pending_messages, 2)
+        finally:
+            await self.queue.stop_workers("test")
+
+    async def test_batches_split_by_timeout(self):
+        """Test messages with different timeouts are handled in separate batches"""
+        handler = BatchHandler()
+        self.queue.register_handler("test", handler)
+        messages = [make_message(payload=i) for i in range(4)]
+        messages[1].timeout_seconds = messages[3].timeout_seconds = 5
+        await self.queue.enqueue_many(messages)
+        await self.queue.start_workers("test")
+        try:
+            await asyncio.wait_for(handler.done.wait(), timeout=1)
+            await asyncio.sleep(0.01)
+
+            self.assertEqual(sorted(handler.batches), [[0, 2], [1, 3]])
+            self.assertEqual((await self.queue.get_stats("test")).completed_messages, 2)
+        finally:
+            await self.queue.stop_workers("test")
+
+    async def test_send_many(self):
+        """Test the manager sends a batch and returns the message ids"""
+        manager = MessageQueue(QueueBackend.MEMORY)
+        message_ids = await manager.send_many("bulk", ["a", "b", "c"])
+
+        self.assertEqual(len(message_ids), 3)
+        self.assertEqual(await manager.queue.get_queue_size("bulk"), 3)
+
+    async def test_fair_queuing_interleaves_keys(self):
+        """Test a busy fairness key can't starve other keys at the same priority"""
+        manager = MessageQueue(QueueBackend.MEMORY)
+        manager.enable_fair_queuing("fair")
+        payloads = [{"user_id": 1, "n": i} for i in range(4)] + [{"user_id": 2, "n": 0}, {"user_id": 3, "n": 0}]
+        await manager.send_many("fair", payloads)
+
+        messages = await manager.queue.dequeue_batch("fair", 6)
+        users = [message.payload["user_id"] for message in messages]
+
+        self.assertEqual(users, [1, 2, 3, 1, 1, 1])
+        self.assertEqual([m.payload["n"] for m in messages if m.payload["user_id"] == 1], [0, 1, 2, 3])
+        self.assertEqual(messages[0].fairness_key, "1")
+
+    async def test_unkeyed_messages_take_a_fair_turn(self):
+        """Test unkeyed messages share the round-robin with keyed flows of the same priority"""
+        queue = MemoryQueue()
+        messages = [make_message(payload="plain")]
+        for key, payload in (("a", "a1"), ("a", "a2"), ("b", "b1"), ("b", "b2")):
+            message = make_message(payload=payload)
+            message.fairness_key = key
+            messages.append(message)
+        messages.append(make_message(payload="plain2"))
+        await queue.enqueue_many(messages)
+
+        order = [message.payload for message in await queue.dequeue_batch("test", 10)]
+        self.assertEqual(order, ["plain", "a1", "b1", "plain2", "a2", "b2"])
+
+    async def test_cpu_lane_runs_handler_in_another_process(self):
+        """Test a handler registered on a CPU lane runs in a pool process"""
+        manager = MessageQueue(QueueBackend.MEMORY)
+        manager.add_cpu_lane("cpu", max_workers=1)
+        await manager.register_handler("heavy", ProcessCheckHandler(), cpu_lane="cpu")
+        try:
+            await manager.send_message("heavy", os.getpid())
+            for _ in range(100):
+                stats = await manager.queue.get_stats("heavy")
+                if stats.completed_messages or stats.failed_messages:
+                    break
+                await asyncio.sleep(0.05)
+
+            self.assertEqual(stats.completed_messages, 1)
+            self.assertEqual(stats.failed_messages, 0)
+        finally:
+            await manager.queue.stop_workers("heavy")
+            await manager.shutdown()
+
+    async def test_cpu_lane_holds_slot_until_timed_out_job_finishes(self):
+        """Test a job the caller gave up on still counts against the concurrency cap"""
+        lane = message_queue.CPULane("cpu", max_workers=2, max_concurrency=1)
+        try:
+            await lane.run(os.getpid)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(lane.run(time.sleep, 0.5), timeout=0.05)
+
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await lane.run(os.getpid)
+            self.assertGreater(loop.time() - start, 0.3)
+        finally:
+            lane.shutdown()
+
+    async def test_autoscaler_follows_backlog(self):
+        """Test worker pools grow with the backlog and shrink back when idle"""
+        manager = MessageQueue(QueueBackend.MEMORY)
+        release = asyncio.Event()
+
+        class SlowHandler(MessageHandler):
+            async def handle(self, message):
+                await release.wait()
+                return True
+
+        policy = AutoscalePolicy(min_workers=1, max_workers=4, target_wait_seconds=1)
+        await manager.register_handler("scaled", SlowHandler(), autoscale=policy)
+        try:
+            await manager.send_many("scaled", list(range(10)))
+            for _ in range(5):
+                await manager.autoscale()
+                await asyncio.sleep(0)
+            self.assertEqual(manager.queue.get_worker_count("scaled"), 4)
+
+            release.set()
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                await manager.autoscale()
+            self.assertEqual(manager.queue.get_worker_count("scaled"), 1)
+        finally:
+            await manager.shutdown()
+            await manager.queue.stop_workers("scaled")
+
+    def test_desired_workers(self):
+        """Test the sizing rule uses backlog, processing time and oldest age"""
+        policy = AutoscalePolicy(min_workers=1, max_workers=10, target_wait_seconds=2)
+        self.assertEqual(MessageQueue._desired_workers(policy, 2, 20, 0.5, 0.5), 5)
+        self.assertEqual(MessageQueue._desired_workers(policy, 5, 2, 0.1, 0.5), 4)
+        self.assertEqual(MessageQueue._desired_workers(policy, 5, 2, 3.0, 0.5), 6)
+        self.assertEqual(MessageQueue._desired_workers(policy, 3, 0, 0.0, 0.5), 2)
+        self.assertEqual(MessageQueue._desired_workers(policy, 1, 0, 0.0, 0.5), 1)
+        self.assertEqual(MessageQueue._desired_workers(policy, 9, 1000, 9.0, 1.0), 10)
+
+
+@unittest.skipUnless(message_queue.SQLITE_AVAILABLE, "aiosqlite not installed")
+class TestSQLiteQueue(unittest.IsolatedAsyncioTestCase):
+    """Test suite for the durable SQLite queue backend"""
+
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "queue.db")
+        self.queue = SQLiteQueue(self.db_path)
+        self.assertTrue(await self.queue.connect())
+
+    async def asyncTearDown(self):
+        await self.queue.disconnect()
+        self.tmpdir.cleanup()
+
+    async def test_messages_survive_restart(self):
+        """Test pending messages are still there after reopening the database"""
+        await self.queue.enqueue_many([
+            make_message(payload="normal"),
+            make_message(payload="high", priority=MessagePriority.HIGH)
+        ])
+        await self.queue.disconnect()
+
+        self.queue = SQLiteQueue(self.db_path)
+        await self.queue.connect()
+        batch = await self.queue.dequeue_batch("test", 10)
+
+        self.assertEqual([message.payload for message in batch], ["high", "normal"])
+        self.assertTrue(await self.queue.ack_message(batch[0].id))
+        stats = await self.queue.get_stats("test")
+        self.assertEqual(stats.total_messages, 2)
+        self.assertEqual(stats.completed_messages, 1)
+        self.assertEqual(stats.processing_messages, 1)
+
+    async def test_expired_lease_is_redelivered(self):
+        """Test a claimed message comes back once its visibility timeout passes"""
+        self.queue.visibility_timeout = 0
+        self.queue.visibility_grace = 0
+        message = make_message(payload="lost")
+        message.timeout_seconds = 0
+        await self.queue.enqueue(message)
+
+        first = await self.queue.dequeue("test")
+        second = await self.queue.dequeue("test")
+
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(second.attempts, 1)
+
+    async def test_lease_outlives_handler_timeout(self):
+        """Test the lease runs past the message timeout by the visibility grace"""
+        self.queue.visibility_timeout = 0
+        message = make_message(payload="slow")
+        message.timeout_seconds = 0
+        await self.queue.enqueue(message)
+
+        self.assertIsNotNone(await self.queue.dequeue("test"))
+        self.assertIsNone(await self.queue.dequeue("test"))
+        self.assertTrue(await self.queue.nack_message(message.id, "Processing timeout"))
+
+    async def test_stale_owner_cannot_settle_taken_over_lease(self):
+        """Test ack and nack from a worker whose lease expired leave the new claim alone"""
+        self.queue.visibility_timeout = 0
+        self.queue.visibility_grace = 0
+        message = make_message(payload="contended")
+        message.timeout_seconds = 0
+        await self.queue.enqueue(message)
+        await self.queue.dequeue("test")
+
+        other = SQLiteQueue(self.db_path, visibility_timeout=60)
+        self.assertTrue(await other.connect())
+        try:
+            self.assertEqual((await other.dequeue("test")).id, message.id)
+            self.assertFalse(await self.queue.ack_message(message.id))
+            self.assertFalse(await self.queue.nack_message(message.id, "late"))
+            self.assertTrue(await other.ack_message(message.id))
+        finally:
+            await other.disconnect()
+
+        stats = await self.queue.get_stats("test")
+        self.assertEqual((stats.completed_messages, stats.failed_messages), (1, 1))
+
+    async def test_nack_to_dead_letter(self):
+        """Test messages out of attempts move to the dead letter table and can be requeued"""
+        message = make_message(payload="bad")
+        message.max_attempts = 1
+        await self.queue.enqueue(message)
+
+        claimed = await self.queue.dequeue("test")
+        self.assertTrue(await self.queue.nack_message(claimed.id, "boom"))
+        self.assertEqual(await self.queue.get_queue_size("test"), 0)
+
+        dead = await self.queue.get_dead_letter_messages("test")
+        self.assertEqual([m.error_message for m in dead], ["boom"])
+        self.assertTrue(await self.queue.requeue_dead_letter("test", claimed.id))
+        self.assertEqual((await self.queue.dequeue("test")).payload, "bad")
+
+
+
+@unittest.skipUnless(message_queue.REDIS_AVAILABLE and fakeredis, "redis or fakeredis not installed")
+class TestRedisQueue(unittest.IsolatedAsyncioTestCase):
+    """Test suite for the Redis queue backend's Lua scripts"""
+
+    async def asyncSetUp(self):
+        server = fakeredis.FakeServer()
+        with patch.object(message_queue.redis, "from_url", lambda *args, **kwargs: fakeredis.FakeAsyncRedis(server=server)):
+            self.queue = RedisQueue()
+            self.assertTrue(await self.queue.connect())
+        self.redis = self.queue.redis_client
+
+    async def asyncTearDown(self):
+        await self.queue.disconnect()
+
+    async def test_claim_order_by_priority_then_fair_keys(self):
+        """Test claims take higher priorities first and alternate between fairness keys"""
+        messages = [make_message(payload="low", priority=MessagePriority.LOW),
+                    make_message(payload="high", priority=MessagePriority.HIGH)]
+        for key, payload in (("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("b", "b2")):
+            message = make_message(payload=payload)
+            message.fairness_key = key
+            messages.append(message)
+        await self.queue.enqueue_many(messages)
+
+        order = [message.payload for message in await self.queue.dequeue_batch("test", 10)]
+        self.assertEqual(order, ["high", "a1", "b1", "a2", "b2", "a3", "low"])
+
+        stats = await self.queue.get_stats("test")
+        self.assertEqual((stats.pending_messages, stats.processing_messages), (0, 7))
+        self.assertEqual(await self.queue.get_queue_size("test"), 0)
+
+    async def test_unkeyed_messages_take_a_fair_turn(self):
+        """Test unkeyed messages share the round-robin with keyed flows of the same priority"""
+        messages = [make_message(payload="plain")]
+        for key, payload in (("a", "a1"), ("a", "a2"), ("b", "b1"), ("b", "b2")):
+            message = make_message(payload=payload)
+            message.fairness_key = key
+            messages.append(message)
+        messages.append(make_message(payload="plain2"))
+        await self.queue.enqueue_many(messages)
+
+        order = [message.payload for message in await self.queue.dequeue_batch("test", 10)]
+        self.assertEqual(order, ["plain", "a1", "b1", "plain2", "a2", "b2"])
+        self.assertEqual(await self.queue.get_queue_size("test"), 0)
+
+    async def test_ack_and_nack_update_stats(self):
+        """Test ack completes a claim once and nack schedules a retry"""
+        await self.queue.enqueue_many([make_message(payload="ok"), make_message(payload="bad")])
+        ok, bad = await self.queue.dequeue_batch("test", 2)
+
+        self.assertTrue(await self.queue.ack_message(ok.id))
+        self.assertFalse(await self.queue.ack_message(ok.id))
+        self.assertTrue(await self.queue.nack_message(bad.id, "boom"))
+        self.assertFalse(await self.queue.nack_message(bad.id, "boom"))
+
+        stats = await self.queue.get_stats("test")
+        self.assertEqual(stats.total_messages, 2)
+        self.assertEqual(stats.completed_messages, 1)
+        self.assertEqual(stats.failed_messages, 1)
+        self.assertEqual(stats.pending_messages, 1)
+        self.assertEqual(stats.processing_messages, 0)
+        self.assertEqual(await self.redis.zcard(self.queue._make_key("test", "delayed")), 1)
+        self.assertEqual(await self.redis.hlen(self.queue._make_key("test", "processing")), 0)
+        self.assertIsNone(await self.queue.dequeue("test"))
+
+    async def test_delayed_messages_promoted_when_due(self):
+        """Test scheduled messages stay in the sorted set until due, then keep their priority"""
+        soon = datetime.now() + timedelta(milliseconds=200)
+        keyed = make_message(payload="keyed", scheduled_at=soon)
+        keyed.fairness_key = "a"
+        await self.queue.enqueue_many([
+            make_message(payload="later", scheduled_at=datetime.now() + timedelta(hours=1)),
+            make_message(payload="soon", scheduled_at=soon),
+            make_message(payload="soon-high", priority=MessagePriority.HIGH, scheduled_at=soon),
+            keyed
+        ])
+        delayed_key = self.queue._make_key("test", "delayed")
+
+        self.assertEqual(await self.queue.dequeue_batch("test", 10), [])
+        self.assertEqual(await self.redis.zcard(delayed_key), 4)
+        self.assertEqual(await self.queue.get_queue_size("test"), 4)
+
+        # A blocking dequeue wakes up when the first delayed message is due
+        first = await self.queue.dequeue("test", timeout=2)
+        rest = await self.queue.dequeue_batch("test", 10)
+        self.assertEqual([first.payload] + [message.payload for message in rest],
+                         ["soon-high", "keyed", "soon"])
+        self.assertEqual(await self.redis.zcard(delayed_key), 1)
+
+    async def test_index_entries_removed_on_ack_and_dead_letter(self):
+        """Test the message index only holds messages that can still be acked"""
+        done, dead = make_message(payload="done"), make_message(payload="dead")
+        dead.max_attempts = 1
+        await self.queue.enqueue_many([done, dead])
+        index_key = self.queue._index_key()
+        self.assertEqual(await self.redis.hlen(index_key), 2)
+
+        await self.queue.dequeue_batch("test", 2)
+        self.assertTrue(await self.queue.ack_message(done.id))
+        self.assertTrue(await self.queue.nack_message(dead.id, "boom"))
+
+        self.assertEqual(await self.redis.hlen(index_key), 0)
+        self.assertEqual(await self.redis.hlen(self.queue._make_key("test", "messages")), 0)
+        self.assertEqual(await self.redis.llen(self.queue._make_key("test", "dead_letter")), 1)
+        self.assertEqual((await self.queue.get_stats("test")).dead_letter_messages, 1)
+
+    async def test_legacy_list_entries_can_be_acked(self):
+        """Test whole-message entries left by older versions are indexed when claimed"""
+        message = make_message(payload="legacy")
+        await self.redis.lpush(self.queue._make_key("test", "priority_2"), json.dumps(message.to_dict()))
+
+        claimed = await self.queue.dequeue("test")
+        self.assertEqual(claimed.id, message.id)
+        self.assertEqual(await self.redis.hget(self.queue._index_key(), message.id), b"test")
+        self.assertTrue(await self.queue.ack_message(message.id))
+        self.assertEqual(await self.redis.hlen(self.queue._make_key("test", "processing")), 0)
+
+    async def test_reaper_requeues_expired_claims(self):
+        """Test claims past their visibility deadline are retried and a late ack is refused"""
+        self.queue.visibility_grace = 0
+        message = make_message(payload="stuck")
+        message.timeout_seconds = 0
+        await self.queue.enqueue(message)
+        await self.queue.dequeue("test")
+
+        self.assertEqual(await self.queue.reap_expired("test"), 1)
+        self.assertFalse(await self.queue.ack_message(message.id))
+
+        stats = await self.queue.get_stats("test")
+        self.assertEqual((stats.processing_messages, stats.pending_messages, stats.failed_messages), (0, 1, 1))
+        self.assertEqual(await self.redis.zcard(self.queue._make_key("test", "deadlines")), 0)
+        self.assertEqual(await self.redis.zcard(self.queue._make_key("test", "delayed")), 1)
+        self.assertEqual(await self.redis.hget(self.queue._index_key(), message.id), b"test")
+
+    async def test_stale_wakeup_tokens_do_not_cut_waits_short(self):
+        """Test an empty queue blocks for the timeout despite tokens left by earlier enqueues"""
+        await self.queue.enqueue_many([make_message(payload=i) for i in range(3)])
+        self.assertEqual(len(await self.queue.dequeue_batch("test", 3)), 3)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.assertIsNone(await self.queue.dequeue("test", timeout=0.5))
+        self.assertGreaterEqual(loop.time() - start, 0.45)
+        self.assertEqual(await self.redis.llen(self.queue._make_key("test", "wakeup")), 0)
+
+    async def test_wait_resumes_after_losing_a_message(self):
+        """Test a wakeup that finds nothing waits out the rest of the timeout"""
+        async def wake_then_enqueue():
+            # A token whose message another worker already claimed
+            await asyncio.sleep(0.1)
+            await self.redis.lpush(self.queue._make_key("test", "wakeup"), 1)
+            await asyncio.sleep(0.2)
+            await self.queue.enqueue(make_message(payload="late"))
+
+        task = asyncio.create_task(wake_then_enqueue())
+        message = await self.queue.dequeue("test", timeout=2)
+        await task
+        self.assertEqual(message.payload, "late")
+
+
+if __name__ == '__main__':
+    unittest.main()
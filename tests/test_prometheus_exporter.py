@@ -0,0 +1,100 @@
+import unittest
+import asyncio
+import importlib.util
+import os
+import sys
+from types import SimpleNamespace
+
+from cache.cache_manager import CacheManager, CacheBackend
+from monitoring.health_monitor import MetricsCollector
+from monitoring.prometheus_exporter import PrometheusExporter
+
+# The top-level ``queue`` directory is shadowed by the standard library module,
+# so load the message queue module straight from its file.
+_spec = importlib.util.spec_from_file_location(
+    "message_queue",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "queue", "message_queue.py")
+)
+message_queue = sys.modules.setdefault("message_queue", importlib.util.module_from_spec(_spec))
+if not hasattr(message_queue, "MessageQueue"):
+    _spec.loader.exec_module(message_queue)
+
+
+class TestPrometheusExporter(unittest.IsolatedAsyncioTestCase):
+    """Test suite for the Prometheus text exporter"""
+
+    async def asyncSetUp(self):
+        self.collector = MetricsCollector()
+        self.exporter = PrometheusExporter(health_monitor=SimpleNamespace(metrics_collector=self.collector),
+                                           resolve_cache_manager=False)
+
+    async def test_renders_labeled_series_and_histograms(self):
+        """Test counters, gauges and timer buckets use the exposition format"""
+        self.collector.increment_counter("requests_total", tags={"endpoint": "/a", "status": "200"})
+        self.collector.increment_counter("requests_total", tags={"endpoint": '/"b"', "status": "500"})
+        self.collector.set_gauge("system.cpu.percent", 12.5)
+        for duration in (3, 30, 300):
+            self.collector.record_timer("request_duration_ms", duration)
+
+        text = await self.exporter.render()
+
+        self.assertIn("# TYPE optrixtrades_requests_total counter", text)
+        self.assertIn('optrixtrades_requests_total{endpoint="/a",status="200"} 1.0', text)
+        self.assertIn('optrixtrades_requests_total{endpoint="/\\"b\\"",status="500"} 1.0', text)
+        self.assertIn("optrixtrades_system_cpu_percent 12.5", text)
+        self.assertIn("# TYPE optrixtrades_request_duration_ms histogram", text)
+        self.assertIn('optrixtrades_request_duration_ms_bucket{le="5.0"} 1', text)
+        self.assertIn('optrixtrades_request_duration_ms_bucket{le="50.0"} 2', text)
+        self.assertIn('optrixtrades_request_duration_ms_bucket{le="+Inf"} 3', text)
+        self.assertIn("optrixtrades_request_duration_ms_count 3", text)
+        self.assertIn("process_resident_memory_bytes", text)
+        self.assertTrue(text.endswith("\n"))
+
+    async def test_histogram_lines_reused_until_updated(self):
+        """Test unchanged histogram series are not re-rendered"""
+        self.collector.record_timer("db_operation_duration_ms", 5, tags={"operation": "select"})
+        first = self.exporter.render_collector(self.collector)
+        cached = self.exporter._histogram_cache[("optrixtrades_db_operation_duration_ms", (("operation", "select"),))]
+
+        self.assertEqual(self.exporter.render_collector(self.collector), first)
+        self.assertIs(self.exporter._histogram_cache[
+            ("optrixtrades_db_operation_duration_ms", (("operation", "select"),))], cached)
+
+        self.collector.record_timer("db_operation_duration_ms", 7, tags={"operation": "select"})
+        self.assertIn('optrixtrades_db_operation_duration_ms_count{operation="select"} 2',
+                      self.exporter.render_collector(self.collector))
+
+    async def test_cache_stats(self):
+        """Test cache statistics are exported per tier"""
+        manager = CacheManager(CacheBackend.MEMORY)
+        await manager.set("key", "value")
+        await manager.get("key")
+        await manager.get("missing")
+
+        text = "\n".join(await self.exporter.render_cache(manager))
+
+        self.assertIn('optrixtrades_cache_hits_total{tier="memory"} 1', text)
+        self.assertIn('optrixtrades_cache_misses_total{tier="memory"} 1', text)
+
+    async def test_queue_stats_from_global_queue_manager(self):
+        """Test queue series are scraped from the live queue manager, also from another loop"""
+        manager = await message_queue.initialize_queue_manager(message_queue.QueueBackend.MEMORY)
+        try:
+            await manager.send_many("jobs", [1, 2])
+            exporter = PrometheusExporter(resolve_cache_manager=False)
+
+            text = await exporter.render()
+            self.assertIn('optrixtrades_queue_pending_messages{queue="jobs"} 2', text)
+            self.assertIn('optrixtrades_queue_messages_total{queue="jobs"} 2', text)
+
+            # Scraped from a separate thread and loop, as the bot runner's health server does
+            text = await asyncio.to_thread(asyncio.run, exporter.render())
+            self.assertIn('optrixtrades_queue_pending_messages{queue="jobs"} 2', text)
+        finally:
+            await message_queue.shutdown_queue_manager()
+
+        self.assertNotIn("optrixtrades_queue_pending_messages{", await exporter.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
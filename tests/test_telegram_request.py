@@ -0,0 +1,62 @@
+import unittest
+import json
+
+import httpx
+from telegram import Bot
+from telegram.error import RetryAfter
+
+from monitoring.health_monitor import MetricsCollector
+from monitoring.telegram_request import InstrumentedRequest
+
+
+class TestInstrumentedRequest(unittest.IsolatedAsyncioTestCase):
+    """Test suite for Bot API request metrics"""
+
+    async def asyncSetUp(self):
+        self.responses = []
+
+        def respond(request):
+            return self.responses.pop(0)
+
+        self.collector = MetricsCollector()
+        self.request = InstrumentedRequest(metrics_collector=self.collector)
+        await self.request._client.aclose()
+        self.request._client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+        self.bot = Bot(token="123:abc", request=self.request)
+
+    async def asyncTearDown(self):
+        await self.request.shutdown()
+
+    async def test_records_latency_status_and_bytes(self):
+        """Test successful calls are timed and sized per method"""
+        message = {"message_id": 1, "date": 0, "chat": {"id": 5, "type": "private"}, "text": "hi"}
+        body = json.dumps({"ok": True, "result": message}).encode()
+        self.responses.append(httpx.Response(200, content=body))
+
+        await self.bot.send_message(chat_id=5, text="hi")
+
+        tags = {"method": "sendMessage"}
+        self.assertEqual(self.collector.get_timer_stats("telegram_api.duration_ms", tags)["count"], 1)
+        self.assertEqual(self.collector.get_counter_value(
+            "telegram_api.responses_total", {"method": "sendMessage", "status": "200"}), 1)
+        self.assertEqual(self.collector.get_counter_value("telegram_api.bytes_received_total", tags), len(body))
+        self.assertGreater(self.collector.get_counter_value("telegram_api.bytes_sent_total", tags), 0)
+
+    async def test_counts_retry_after(self):
+        """Test 429 responses record the requested wait"""
+        body = {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                "parameters": {"retry_after": 7}}
+        self.responses.append(httpx.Response(429, json=body))
+
+        with self.assertRaises(RetryAfter):
+            await self.bot.send_message(chat_id=5, text="hi")
+
+        tags = {"method": "sendMessage"}
+        self.assertEqual(self.collector.get_counter_value("telegram_api.retry_after_total", tags), 1)
+        self.assertEqual(self.collector.get_histogram_stats("telegram_api.retry_after_seconds", tags)["max"], 7)
+        self.assertEqual(self.collector.get_counter_value(
+            "telegram_api.responses_total", {"method": "sendMessage", "status": "429"}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
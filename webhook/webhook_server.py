@@ -8,7 +8,7 @@ import logging
 import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+from fastapi.responses import JSONResponse, HTMLResponse, FileResponse, Response
 from fastapi.templating import Jinja2Templates
 import uvicorn
 from telegram import Update
@@ -16,6 +16,7 @@ from telegram.ext import Application
 import json
 import hmac
 import hashlib
+import time
 from typing import Optional
 
 import sys
@@ -24,6 +25,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
 from telegram_bot.bot import TradingBot
 from database.connection import DatabaseManager
+from cache.cache_manager import CacheBackend, get_cache_manager, initialize_cache_manager, shutdown_cache_manager
+from monitoring.health_monitor import get_health_monitor, initialize_health_monitor
+from monitoring.prometheus_exporter import CONTENT_TYPE as METRICS_CONTENT_TYPE, PrometheusExporter
+from monitoring.telegram_request import InstrumentedRequest
 
 # Configure logging with UTF-8 encoding for Windows compatibility
 logging.basicConfig(
@@ -41,6 +46,7 @@ class WebhookServer:
         self.db_manager = db_manager
         self.bot_instance = TradingBot(db_manager)
         self.application: Optional[Application] = None
+        self.metrics_exporter = PrometheusExporter(db_manager=db_manager)
         # Setup templates
         self.templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "templates"))
         
@@ -149,12 +155,28 @@ class WebhookServer:
         
         @app.get("/health")
         async def health_check():
-            return {
+            response = {
                 "status": "healthy",
                 "service": "optrixtrades-webhook",
                 "bot_token": config.BOT_TOKEN[:10] + "...",
                 "webhook_enabled": True
             }
+            
+            # Serve the last known check results and refresh stale ones in the background
+            health_monitor = get_health_monitor()
+            if health_monitor:
+                health_monitor.health_checker.refresh_in_background()
+                response["checks"] = health_monitor.health_checker.get_health_summary()
+            return response
+        
+        @app.get("/metrics")
+        async def metrics():
+            """Prometheus scrape endpoint"""
+            try:
+                return Response(content=await self.metrics_exporter.render(), media_type=METRICS_CONTENT_TYPE)
+            except Exception as e:
+                logger.error(f"Metrics rendering error: {e}")
+                raise HTTPException(status_code=500, detail="Failed to render metrics")
         
         @app.post(f"/webhook/{config.BOT_TOKEN}")
         async def webhook_handler(request: Request, background_tasks: BackgroundTasks):
@@ -238,7 +260,7 @@ class WebhookServer:
             """Get current webhook information"""
             try:
                 from telegram import Bot
-                bot = Bot(token=config.BOT_TOKEN)
+                bot = Bot(token=config.BOT_TOKEN, request=InstrumentedRequest())
                 webhook_info = await bot.get_webhook_info()
                 
                 return {
@@ -259,7 +281,7 @@ class WebhookServer:
         """Get bot username for Telegram link"""
         try:
             from telegram import Bot
-            bot = Bot(token=config.BOT_TOKEN)
+            bot = Bot(token=config.BOT_TOKEN, request=InstrumentedRequest())
             bot_info = await bot.get_me()
             return bot_info.username or "optrixtrades_bot"
         except Exception as e:
@@ -287,11 +309,18 @@ class WebhookServer:
 
     async def _safe_process_update(self, update_data: dict):
         """Safely process update with complete error isolation"""
+        start_time = time.perf_counter()
+        status_code = 200
         try:
             await self.process_update(update_data)
         except Exception as e:
+            status_code = 500
             logger.error(f"Error in _safe_process_update: {e}")
             # Completely isolate errors to prevent any propagation
+        finally:
+            health_monitor = get_health_monitor()
+            if health_monitor:
+                health_monitor.record_request("webhook_update", (time.perf_counter() - start_time) * 1000, status_code)
 
     async def process_update(self, update_data: dict):
         """Process incoming Telegram update"""
@@ -340,7 +369,9 @@ class WebhookServer:
             await self.bot_instance.initialize()
             
             # Create application
-            self.application = Application.builder().token(config.BOT_TOKEN).build()
+            self.application = Application.builder().token(config.BOT_TOKEN).request(
+                InstrumentedRequest(connection_pool_size=256)
+            ).build()
             
             # Set the application instance in the bot (fix: use correct attribute)
             self.bot_instance.application = self.application
@@ -370,7 +401,7 @@ class WebhookServer:
         """Set webhook URL in Telegram"""
         try:
             from telegram import Bot
-            bot = Bot(token=config.BOT_TOKEN)
+            bot = Bot(token=config.BOT_TOKEN, request=InstrumentedRequest())
             
             # Set webhook
             secret_token = getattr(config, 'WEBHOOK_SECRET_TOKEN', None)
@@ -397,7 +428,7 @@ class WebhookServer:
         """Delete webhook from Telegram"""
         try:
             from telegram import Bot
-            bot = Bot(token=config.BOT_TOKEN)
+            bot = Bot(token=config.BOT_TOKEN, request=InstrumentedRequest())
             
             result = await bot.delete_webhook(drop_pending_updates=True)
             
@@ -433,6 +464,15 @@ class WebhookServer:
             # Don't continue if database fails - this will cause handler errors
             raise RuntimeError(f"Cannot start webhook server without database: {e}")
         
+        # Shared cache for user lookups; Redis-backed when configured
+        if get_cache_manager() is None:
+            await initialize_cache_manager(CacheBackend.HYBRID if config.REDIS_URL else CacheBackend.MEMORY)
+        
+        # Metrics collector backing /metrics
+        if get_health_monitor() is None:
+            initialize_health_monitor(self.db_manager)
+        await get_health_monitor().start_monitoring()
+        
         # Initialize bot application (this will also verify database is ready)
         try:
             await self.initialize_application()
@@ -463,6 +503,12 @@ class WebhookServer:
         """Shutdown tasks"""
         logger.info("[SHUTDOWN] OPTRIXTRADES Webhook Server shutting down...")
         
+        monitor = get_health_monitor()
+        if monitor:
+            await monitor.stop_monitoring()
+        
+        await shutdown_cache_manager()
+        
         # Close database connection
         try:
             await self.db_manager.close()
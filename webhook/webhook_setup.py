@@ -12,8 +12,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from telegram import Bot
-from telegram.request import HTTPXRequest
 from config import config
+from monitoring.telegram_request import InstrumentedRequest
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +29,7 @@ class WebhookManager:
         print(f"🤖 Using bot token: {config.BOT_TOKEN[:10]}...{config.BOT_TOKEN[-10:]}")
         
         # Create request with extended timeout settings for better connectivity
-        request = HTTPXRequest(
+        request = InstrumentedRequest(
             connection_pool_size=8,
             connect_timeout=15.0,  # Increased from 10.0
             read_timeout=45.0,     # Increased from 30.0
@@ -135,7 +135,7 @@ async def test_bot_token():
         print("⏳ This may take up to 30 seconds...")
         
         # Create a temporary bot instance with extended timeouts
-        request = HTTPXRequest(
+        request = InstrumentedRequest(
             connection_pool_size=8,
             connect_timeout=15.0,
             read_timeout=30.0,